@@ -0,0 +1,92 @@
+"""
+Throughput of libot.audiobuf against the pydub path on the test fixtures.
+
+    uv run python benchmarks/bench_audio.py [wav ...]
+
+Without arguments every ``tests/fixtures/*.wav`` is used; if there are none
+a 5 minute 48 kHz stereo tone is generated (the recorder's segment shape).
+"""
+
+import glob
+import math
+import os
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# libot.config refuses to import without a meeting URL
+os.environ.setdefault("MEETING_URL", "https://teams.microsoft.com/l/meetup-join/bench")
+
+import numpy as np
+from pydub import AudioSegment
+
+from libot import audiobuf
+from libot.compress import _ensure_whole_frames
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures")
+WINDOW_MS = 100
+
+
+def _synthetic_wav(seconds: int = 300, rate: int = 48000) -> str:
+    path = os.path.join(tempfile.mkdtemp(), "audio_000.wav")
+    t = np.arange(seconds * rate) / rate
+    left = 8000 * np.sin(2 * np.pi * 440 * t)
+    right = 8000 * np.sin(2 * np.pi * 660 * t)
+    frames = np.stack([left, right], axis=1).astype("<i2").tobytes()
+    with wave.open(path, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(frames)
+    return path
+
+
+def bench_pydub(path: str):
+    audio = _ensure_whole_frames(AudioSegment.from_file(path))
+    audio = audio.set_channels(1).set_frame_rate(16000)
+    levels = [chunk.rms for chunk in audio[::WINDOW_MS]]
+    return len(audio.raw_data) // 2, len(levels)
+
+
+def bench_audiobuf(path: str):
+    buf = audiobuf.open_wav(path)
+    resampler = audiobuf.PolyphaseResampler(buf.rate, 16000)
+    window = 16000 * WINDOW_MS // 1000
+    samples = levels = 0
+    for block in buf.iter_blocks(buf.rate * 10):
+        out = resampler.process(audiobuf.to_mono(block))
+        samples += len(out)
+        levels += len(audiobuf.rms_windows(out, window))
+    samples += len(resampler.flush())
+    return samples, levels
+
+
+def _run(fn, path: str, repeat: int = 3) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(paths):
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(FIXTURES, "*.wav"))) or [_synthetic_wav()]
+
+    print(f"{'file':<28}{'audio s':>9}{'MB':>8}{'pydub':>10}{'audiobuf':>10}{'speedup':>9}")
+    for path in paths:
+        buf = audiobuf.open_wav(path)
+        mb = os.path.getsize(path) / 1e6
+        t_pydub = _run(bench_pydub, path)
+        t_np = _run(bench_audiobuf, path)
+        print(
+            f"{os.path.basename(path):<28}{buf.duration:>9.1f}{mb:>8.1f}"
+            f"{mb / t_pydub:>7.1f}MB/s{mb / t_np:>7.1f}MB/s{t_pydub / t_np:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
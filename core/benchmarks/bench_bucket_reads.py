@@ -0,0 +1,136 @@
+"""
+Reading every object under a prefix one after another (the old
+iter_bucket_files_bytes) against the prefetching reader in libot.gcs, at
+10, 100 and 1000 objects.
+
+    GCS_BUCKET=my-bucket uv run python benchmarks/bench_bucket_reads.py [size_kb] [workers] [latency_ms]
+
+Set STORAGE_EMULATOR_HOST (e.g. http://localhost:4443 for fake-gcs-server)
+to run it without credentials. A local stand-in answers in well under a
+millisecond, so reads are bound by the client's CPU; ``latency_ms`` puts
+a relay in front of it that delays every response by that much, to model
+the round trip each download pays against real GCS.
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# libot.config refuses to import without a meeting URL
+os.environ.setdefault("MEETING_URL", "https://teams.microsoft.com/l/meetup-join/bench")
+
+from libot import clients, gcs
+
+PREFIX = "bench_reads"
+COUNTS = (10, 100, 1000)
+
+
+def _pipe(src: socket.socket, dst: socket.socket, delay: float):
+    try:
+        while data := src.recv(65536):
+            time.sleep(delay)
+            dst.sendall(data)
+    except OSError:
+        pass
+    finally:
+        dst.close()
+
+
+def _latency_relay(upstream: str, latency_ms: float) -> str:
+    """
+    Local TCP relay to ``upstream`` that holds every response chunk for
+    ``latency_ms``. Returns its URL.
+    """
+    target = urllib.parse.urlparse(upstream)
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def accept():
+        while True:
+            client, _ = server.accept()
+            remote = socket.create_connection((target.hostname, target.port))
+            for sock in (client, remote):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=_pipe, args=(client, remote, 0), daemon=True).start()
+            threading.Thread(
+                target=_pipe, args=(remote, client, latency_ms / 1000), daemon=True
+            ).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return f"{target.scheme}://127.0.0.1:{server.getsockname()[1]}"
+
+
+def _seed(bucket_name: str, prefix: str, count: int, size_kb: int):
+    bucket = clients.get_bucket(bucket_name)
+    existing = sum(1 for _ in bucket.list_blobs(prefix=prefix))
+    if existing == count:
+        return
+    payload = os.urandom(size_kb * 1024)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(
+            pool.map(
+                lambda i: bucket.blob(f"{prefix}obj_{i:05d}.bin").upload_from_string(payload),
+                range(count),
+            )
+        )
+
+
+def _sequential(bucket_name: str, prefix: str) -> int:
+    total = 0
+    for blob in clients.get_storage_client().list_blobs(bucket_name, prefix=prefix):
+        total += len(blob.download_as_bytes())
+    return total
+
+
+def _prefetched(bucket_name: str, prefix: str, workers: int) -> int:
+    total = 0
+    for _, data in gcs.iter_bucket_files_bytes(bucket_name, prefix=prefix, workers=workers):
+        total += len(data)
+    return total
+
+
+def _timed(fn, *args) -> tuple[float, int]:
+    start = time.perf_counter()
+    total = fn(*args)
+    return time.perf_counter() - start, total
+
+
+def main():
+    bucket_name = os.environ.get("GCS_BUCKET")
+    if not bucket_name:
+        raise SystemExit("GCS_BUCKET is required")
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else gcs.GCS_READ_WORKERS
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 0
+    if latency_ms:
+        emulator = os.environ.get("STORAGE_EMULATOR_HOST")
+        if not emulator:
+            raise SystemExit("latency_ms needs STORAGE_EMULATOR_HOST")
+        os.environ["STORAGE_EMULATOR_HOST"] = _latency_relay(emulator, latency_ms)
+
+    print(
+        f"objects of {size_kb} KB in gs://{bucket_name}/{PREFIX}/, {workers} workers, "
+        f"+{latency_ms:g} ms per response"
+    )
+    for count in COUNTS:
+        prefix = f"{PREFIX}/{count}/"
+        _seed(bucket_name, prefix, count, size_kb)
+        # Warm-up so both sides pay imports and connections outside the timings
+        _prefetched(bucket_name, f"{PREFIX}/{COUNTS[0]}/", workers)
+
+        seq, seq_bytes = _timed(_sequential, bucket_name, prefix)
+        par, par_bytes = _timed(_prefetched, bucket_name, prefix, workers)
+        assert seq_bytes == par_bytes == count * size_kb * 1024
+        print(
+            f"{count:>5} objects  sequential={seq * 1000:8.1f} ms  "
+            f"prefetched={par * 1000:8.1f} ms  speedup={seq / par:5.1f}x  "
+            f"({count / par:7.0f} obj/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Per-upload latency of a fresh storage.Client per call (the old gcs.py
+behaviour) against the shared, pooled client from libot.clients.
+
+    GCS_BUCKET=my-bucket uv run python benchmarks/bench_clients.py [uploads] [size_kb]
+
+Set STORAGE_EMULATOR_HOST (e.g. http://localhost:4443 for fake-gcs-server)
+to run it without credentials; against real GCS the fresh-client numbers
+also include the credential refresh and TLS handshake on every call.
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# libot.config refuses to import without a meeting URL
+os.environ.setdefault("MEETING_URL", "https://teams.microsoft.com/l/meetup-join/bench")
+
+from google.cloud import storage
+
+from libot import clients
+
+PREFIX = "bench_clients"
+
+
+def _fresh_bucket(bucket_name: str):
+    if os.environ.get("STORAGE_EMULATOR_HOST"):
+        from google.auth.credentials import AnonymousCredentials
+
+        client = storage.Client(project="test", credentials=AnonymousCredentials())
+    else:
+        client = storage.Client()
+    return client.bucket(bucket_name)
+
+
+def _run(label: str, get_bucket, path: str, uploads: int) -> list[float]:
+    times = []
+    for i in range(uploads):
+        start = time.perf_counter()
+        bucket = get_bucket()
+        bucket.blob(f"{PREFIX}/{label}_{i}.bin").upload_from_filename(path)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _report(label: str, times: list[float]):
+    ms = sorted(t * 1000 for t in times)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(
+        f"{label:<14} mean={statistics.mean(ms):7.1f} ms  "
+        f"p50={statistics.median(ms):7.1f} ms  p95={p95:7.1f} ms"
+    )
+
+
+def main():
+    bucket_name = os.environ.get("GCS_BUCKET")
+    if not bucket_name:
+        raise SystemExit("GCS_BUCKET is required")
+    uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    size_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as f:
+        f.write(os.urandom(size_kb * 1024))
+        path = f.name
+
+    try:
+        # Warm-up so both sides pay imports and DNS outside the timings
+        clients.get_bucket(bucket_name).blob(f"{PREFIX}/warmup.bin").upload_from_filename(path)
+
+        fresh = _run("fresh", lambda: _fresh_bucket(bucket_name), path, uploads)
+        shared = _run("shared", lambda: clients.get_bucket(bucket_name), path, uploads)
+    finally:
+        os.remove(path)
+
+    print(f"{uploads} uploads of {size_kb} KB to gs://{bucket_name}/{PREFIX}/")
+    _report("fresh client", fresh)
+    _report("shared client", shared)
+    saved = statistics.mean(fresh) - statistics.mean(shared)
+    print(f"saved per upload: {saved * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
+import os
+
 from libot.logger import _log_end_job, _log_start_job
 from libot.recorder import record_task
 from libot.config import (
     TASK_ID,
+    EXIT_ON_FINISH,
     SEGMENT_SECONDS,
     MEETING_URL,
     DURATION,
@@ -24,6 +27,11 @@ def job_main():
 
     _log_end_job(TASK_ID)
 
+    # Chrome, pactl and upload threads can outlive the recording; the job
+    # is done once the task is, so don't wait for them
+    if EXIT_ON_FINISH:
+        os._exit(0)
+
 
 if __name__ == "__main__":
     job_main()
@@ -0,0 +1,312 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from libot.logger import logger
+from libot.config import (
+    ADMISSION_MAX_CONCURRENT,
+    ADMISSION_QUEUE_SIZE,
+    ADMISSION_TASK_CPU,
+    ADMISSION_TASK_MEMORY_MB,
+)
+from libot.resources import get_allocator
+
+# How often queued tasks are re-checked against the measured headroom
+DISPATCH_INTERVAL_SECONDS = 5.0
+# Finished tasks kept in the registry for GET /tasks/<id>
+REGISTRY_HISTORY = 500
+# CPU usage is averaged between samples and a recording takes a while to
+# ramp up: tasks started this recently are assumed not to show in the
+# measured headroom yet
+WARMUP_SECONDS = 60.0
+# Shorter gaps between CPU samples are too noisy to replace the last reading
+CPU_SAMPLE_SECONDS = 1.0
+
+
+@dataclass
+class TaskRecord:
+    task_id: str
+    url: str
+    start_at: float
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    queue_position: int | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": self.task_id,
+            "status": self.status,
+            "url": self.url,
+            "start_at": self.start_at,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_position": self.queue_position,
+            "error": self.error,
+        }
+
+
+class TaskRegistry:
+    """
+    In-process record of every task the REST service has seen.
+    """
+
+    def __init__(self, history: int = REGISTRY_HISTORY):
+        self.history = history
+        self._lock = threading.Lock()
+        self._records = {}
+
+    def add(self, record: TaskRecord):
+        with self._lock:
+            self._records[record.task_id] = record
+            self._trim()
+
+    def get(self, task_id: str) -> TaskRecord | None:
+        with self._lock:
+            return self._records.get(task_id)
+
+    def _trim(self):
+        done = [
+            r for r in self._records.values() if r.status in ("finished", "failed", "rejected")
+        ]
+        for record in sorted(done, key=lambda r: r.created_at)[: len(done) - self.history]:
+            self._records.pop(record.task_id, None)
+
+
+def _read_int(path: str) -> int | None:
+    try:
+        with open(path) as f:
+            value = f.read().split()[0]
+        return None if value == "max" else int(value)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def cpu_capacity() -> float:
+    """
+    Cores available to this container (cgroup v2 quota, else cpu count).
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    return float(os.cpu_count() or 1)
+
+
+def memory_available_mb() -> float | None:
+    limit = _read_int("/sys/fs/cgroup/memory.max")
+    current = _read_int("/sys/fs/cgroup/memory.current")
+    if limit is not None and current is not None:
+        return (limit - current) / 2**20
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class CpuUsage:
+    """
+    Cores this container used between the last two samples, from the
+    ``usage_usec`` counter in the cgroup's ``cpu.stat``.
+
+    Unlike the load average, the counter only covers this container, so
+    it compares with ``cpu_capacity()`` on a shared node. Returns None
+    when there is no cgroup v2 counter to read.
+    """
+
+    def __init__(self, path: str = "/sys/fs/cgroup/cpu.stat"):
+        self.path = path
+        self._sample = None
+        self._cores = 0.0
+
+    def _read_usage_usec(self) -> int | None:
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    key, _, value = line.partition(" ")
+                    if key == "usage_usec":
+                        return int(value)
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def __call__(self) -> float | None:
+        usage = self._read_usage_usec()
+        if usage is None:
+            return None
+        now = time.monotonic()
+        if self._sample is None:
+            self._sample = (now, usage)
+        elif now - self._sample[0] >= CPU_SAMPLE_SECONDS:
+            last_at, last_usage = self._sample
+            self._cores = max(0.0, (usage - last_usage) / 1e6 / (now - last_at))
+            self._sample = (now, usage)
+        return self._cores
+
+
+_cpu_usage = CpuUsage()
+
+
+def measure_headroom(task_cpu: float, task_memory_mb: float, cpu_usage=_cpu_usage) -> int:
+    """
+    How many more recordings fit in the CPU and memory left right now.
+    """
+    used = cpu_usage()
+    if used is None:
+        # No cgroup counter: outside a container the host load is ours
+        used = os.getloadavg()[0]
+    free_cpu = cpu_capacity() - used
+    fits = int(free_cpu // task_cpu) if task_cpu > 0 else ADMISSION_MAX_CONCURRENT
+    memory = memory_available_mb()
+    if memory is not None and task_memory_mb > 0:
+        fits = min(fits, int(memory // task_memory_mb))
+    return max(0, fits)
+
+
+class AdmissionController:
+    """
+    Starts recordings while there is capacity and queues the rest.
+
+    A task is admitted when fewer than ``max_concurrent`` are running (and
+    free recording slots remain; one at a time without slots) and the
+    measured headroom fits one more. An idle service always admits one.
+    Otherwise it waits in a bounded queue ordered by meeting start time;
+    when the queue is full the request is rejected.
+    """
+
+    def __init__(
+        self,
+        registry: TaskRegistry | None = None,
+        max_concurrent: int = ADMISSION_MAX_CONCURRENT,
+        queue_size: int = ADMISSION_QUEUE_SIZE,
+        headroom=None,
+    ):
+        self.registry = registry or TaskRegistry()
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.headroom = headroom or (
+            lambda: measure_headroom(ADMISSION_TASK_CPU, ADMISSION_TASK_MEMORY_MB)
+        )
+        self._lock = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._recent_starts = deque()
+        self._thread = threading.Thread(
+            target=self._dispatch_loop, name="admission", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, task_id: str, url: str, runner, start_at: float | None = None) -> TaskRecord:
+        """
+        Registers a task and either starts ``runner`` now or queues it.
+        """
+        record = TaskRecord(task_id, url, start_at or time.time())
+        self.registry.add(record)
+        with self._lock:
+            if len(self._queue) >= self.queue_size and not self._can_start():
+                record.status = "rejected"
+                logger.warning(f"[{task_id}] 🚦 Rechazada: cola llena ({self.queue_size})")
+                return record
+            heapq.heappush(self._queue, (record.start_at, next(self._seq), record, runner))
+            self._dispatch()
+        if record.status == "queued":
+            logger.info(
+                f"[{task_id}] 🚦 En cola, posición {record.queue_position} "
+                f"({self._running} en curso)"
+            )
+        return record
+
+    def running(self) -> int:
+        with self._lock:
+            return self._running
+
+    def queued(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def _limit(self) -> int:
+        allocator = get_allocator()
+        if allocator is None:
+            # Without slots every task records the same display and sink
+            return min(self.max_concurrent, 1)
+        return min(self.max_concurrent, allocator.slots)
+
+    def _can_start(self) -> bool:
+        if self._running >= self._limit():
+            return False
+        if self._running == 0:
+            # An idle service always takes one task, however busy the node
+            return True
+        now = time.monotonic()
+        while self._recent_starts and now - self._recent_starts[0] > WARMUP_SECONDS:
+            self._recent_starts.popleft()
+        return self.headroom() - len(self._recent_starts) > 0
+
+    def _dispatch(self):
+        """
+        Starts queued tasks while capacity lasts. Called with the lock held.
+        """
+        while self._queue and self._can_start():
+            _, _, record, runner = heapq.heappop(self._queue)
+            self._running += 1
+            self._recent_starts.append(time.monotonic())
+            record.status = "running"
+            record.started_at = time.time()
+            record.queue_position = None
+            threading.Thread(
+                target=self._run, args=(record, runner), name=f"task-{record.task_id}", daemon=True
+            ).start()
+        for position, (_, _, record, _) in enumerate(sorted(self._queue), start=1):
+            record.queue_position = position
+
+    def _run(self, record: TaskRecord, runner):
+        try:
+            # record_task logs and swallows its own errors, and returns False
+            if runner() is False:
+                record.status = "failed"
+                record.error = "Recording failed, see the task's logs"
+            else:
+                record.status = "finished"
+        except Exception as e:
+            logger.error(f"[{record.task_id}] ❌ Task failed: {e}")
+            record.status = "failed"
+            record.error = str(e)
+        finally:
+            record.finished_at = time.time()
+            with self._lock:
+                self._running -= 1
+                self._dispatch()
+
+    def _dispatch_loop(self):
+        # Headroom can free up without a task finishing (e.g. CPU use drops)
+        while True:
+            with self._lock:
+                self._lock.wait(DISPATCH_INTERVAL_SECONDS)
+                self._dispatch()
+
+
+_controller: AdmissionController | None = None
+_controller_lock = threading.Lock()
+
+
+def get_controller() -> AdmissionController:
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
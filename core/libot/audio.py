@@ -1,4 +1,7 @@
+import os
+import re
 import subprocess
+import threading
 import time
 from libot.logger import logger
 
@@ -45,43 +48,217 @@ def get_monitor_source():
     return "0"
 
 
+PACTL_ENV = {**os.environ, "LC_ALL": "C"}
+
+
+def _pactl(*args, capture: bool = False):
+    return subprocess.run(
+        ["pactl", *args],
+        capture_output=capture,
+        stdout=None if capture else subprocess.DEVNULL,
+        stderr=None if capture else subprocess.DEVNULL,
+        text=True,
+        env=PACTL_ENV,
+    )
+
+
+def parse_sink_inputs(output: str) -> dict:
+    """
+    Parses ``pactl list sink-inputs`` into
+    {stream_id: {"sink": str, "mute": bool, "volumes": [int], "props": {}}}.
+    """
+    streams = {}
+    current = None
+    in_props = False
+    for raw in output.splitlines():
+        line = raw.strip()
+        if line.startswith("Sink Input #"):
+            current = {"sink": None, "mute": False, "volumes": [], "props": {}}
+            streams[line.split("#", 1)[1]] = current
+            in_props = False
+        elif current is None or not line:
+            continue
+        elif line == "Properties:":
+            in_props = True
+        elif in_props and " = " in line:
+            key, _, value = line.partition(" = ")
+            current["props"][key] = value.strip('"')
+        elif line.startswith("Sink:"):
+            current["sink"] = line.split(":", 1)[1].strip()
+        elif line.startswith("Mute:"):
+            current["mute"] = line.split(":", 1)[1].strip() == "yes"
+        elif line.startswith("Volume:"):
+            current["volumes"] = [
+                int(part.strip().rstrip("%"))
+                for part in line.split("/")
+                if part.strip().endswith("%")
+            ]
+        elif ":" in line and not raw.startswith(("\t\t", "        ")):
+            in_props = False
+    return streams
+
+
+_SINK_INPUT_EVENT = re.compile(r"Event '(\w+)' on sink-input #(\d+)")
+
+
+class AudioRouter:
+    """
+    Keeps application streams routed to ``sink`` from a single long-lived
+    ``pactl subscribe``.
+
+    Streams that already exist are fixed from one ``pactl list
+    sink-inputs`` when the subscription starts. After that only 'new'
+    sink-input events trigger work, on the index they carry; the listing
+    is repeated only when ``match_props`` needs the new stream's
+    properties. 'change' events on a stream the router owns (e.g. Chrome
+    or another client moved or muted it) re-check it and undo the drift.
+    ``routed`` is set once a stream is confirmed on the sink, so capture
+    can wait for it.
+    """
+
+    def __init__(self, task_id: str, sink: str = "VirtualSpeaker", match_props=None):
+        self.task_id = task_id
+        self.sink = sink
+        self.match_props = match_props or {}
+        self.routed = threading.Event()
+        self._sink_index = None
+        # Streams this router has tagged as its own, watched for 'change' events
+        self._owned = set()
+        self._stop = threading.Event()
+        self._proc = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"audio-router-{task_id}", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._proc and self._proc.poll() is None:
+            self._proc.terminate()
+        self._thread.join(timeout=5)
+
+    def wait_routed(self, timeout: float) -> bool:
+        return self.routed.wait(timeout)
+
+    def _resolve_sink_index(self):
+        result = _pactl("list", "sinks", "short", capture=True)
+        for line in result.stdout.splitlines():
+            parts = line.split()
+            if len(parts) > 1 and parts[1] == self.sink:
+                return parts[0]
+        return None
+
+    def _matches(self, stream: dict) -> bool:
+        props = stream["props"]
+        return all(props.get(k) == v for k, v in self.match_props.items())
+
+    def _list_streams(self) -> dict:
+        if self._sink_index is None:
+            self._sink_index = self._resolve_sink_index()
+        return parse_sink_inputs(_pactl("list", "sink-inputs", capture=True).stdout)
+
+    def route(self, stream_id: str, stream: dict | None = None) -> bool:
+        """
+        Moves one stream to the sink, unmuted at full volume. With the
+        ``stream`` as listed, settings that are already right are left
+        alone. Returns whether the stream is on the sink.
+        """
+        # Owned even if the move fails, so its next 'change' retries it
+        first = stream_id not in self._owned
+        self._owned.add(stream_id)
+        changed = False
+        on_sink = (
+            stream is not None
+            and self._sink_index is not None
+            and stream["sink"] == self._sink_index
+        )
+        if not on_sink:
+            on_sink = _pactl("move-sink-input", stream_id, self.sink).returncode == 0
+            changed = True
+        if stream is None or stream["mute"]:
+            _pactl("set-sink-input-mute", stream_id, "0")
+            changed = True
+        if stream is None or any(v != 100 for v in stream["volumes"]):
+            _pactl("set-sink-input-volume", stream_id, "100%")
+            changed = True
+
+        if not on_sink:
+            logger.warning(f"[{self.task_id}] ⚠️ Could not move stream #{stream_id} to {self.sink}")
+            return False
+        if changed or first:
+            name = stream["props"].get("application.name", "?") if stream else "?"
+            logger.info(f"[{self.task_id}] 🔊 Stream #{stream_id} ({name}) -> {self.sink}")
+        self.routed.set()
+        return True
+
+    def sync(self):
+        """
+        One pass over the current sink inputs, fixing only what is off.
+        """
+        for stream_id, stream in self._list_streams().items():
+            if self._matches(stream):
+                self.route(stream_id, stream)
+
+    def handle_event(self, line: str):
+        match = _SINK_INPUT_EVENT.search(line)
+        if not match:
+            return
+        event, stream_id = match.groups()
+        if event == "remove":
+            self._owned.discard(stream_id)
+            return
+        if event == "change" and stream_id in self._owned:
+            # Fires for every client-side volume or state update too: only
+            # re-route when the sink, mute or volume actually drifted
+            stream = self._list_streams().get(stream_id)
+            if stream is None:
+                self._owned.discard(stream_id)
+            else:
+                self.route(stream_id, stream)
+            return
+        if event != "new":
+            return
+        if not self.match_props:
+            self.route(stream_id)
+            return
+        stream = self._list_streams().get(stream_id)
+        if stream is not None and self._matches(stream):
+            self.route(stream_id, stream)
+
+    def _run(self):
+        logger.info(f"[{self.task_id}] 👮 Audio router started ({self.sink}).")
+        while not self._stop.is_set():
+            try:
+                self._proc = subprocess.Popen(
+                    ["pactl", "subscribe"],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    env=PACTL_ENV,
+                )
+                # Subscribe first, then sync, so no stream slips in between
+                self.sync()
+                for line in self._proc.stdout:
+                    if self._stop.is_set():
+                        break
+                    self.handle_event(line)
+            except Exception as e:
+                logger.warning(f"[{self.task_id}] Audio router error: {e}")
+            finally:
+                if self._proc and self._proc.poll() is None:
+                    self._proc.terminate()
+            # pactl subscribe died (PulseAudio restart?): resubscribe
+            self._stop.wait(1)
+
+
 def force_audio_routing(task_id, stop_event):
     """
-    Background thread that constantly moves new audio streams (Chrome)
-    to the VirtualSpeaker sink to ensure they are recorded.
+    Background thread that keeps audio streams (Chrome) on the
+    VirtualSpeaker sink until ``stop_event`` is set.
     """
-    logger.info(f"[{task_id}] 👮 Audio Enforcer started.")
-    while not stop_event.is_set():
-        try:
-            # Get list of inputs (applications playing audio)
-            result = subprocess.run(
-                ["pactl", "list", "sink-inputs", "short"],
-                capture_output=True,
-                text=True,
-            )
-            if result.stdout:
-                lines = result.stdout.strip().split("\n")
-                for line in lines:
-                    parts = line.split()
-                    if len(parts) > 0:
-                        stream_id = parts[0]
-                        # Move to VirtualSpeaker
-                        subprocess.run(
-                            ["pactl", "move-sink-input", stream_id, "VirtualSpeaker"],
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.DEVNULL,
-                        )
-                        # Unmute and max volume just in case
-                        subprocess.run(
-                            ["pactl", "set-sink-input-mute", stream_id, "0"],
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.DEVNULL,
-                        )
-                        subprocess.run(
-                            ["pactl", "set-sink-input-volume", stream_id, "100%"],
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.DEVNULL,
-                        )
-        except Exception:
-            pass  # Be silent to not flood logs
-        time.sleep(2)
+    router = AudioRouter(task_id).start()
+    stop_event.wait()
+    router.stop()
@@ -0,0 +1,244 @@
+import math
+import os
+import struct
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+FULL_SCALE = 32768.0
+
+
+class WavBuffer:
+    """
+    Zero-copy view over a 16-bit PCM WAV file.
+
+    ``samples`` is a read-only ``np.memmap`` of shape (frames, channels).
+    Trailing bytes that do not form a whole frame are left out, the same
+    guarantee ``libot.compress._ensure_whole_frames`` gives the pydub path.
+    """
+
+    def __init__(self, path: str, samples: np.ndarray, rate: int):
+        self.path = path
+        self.samples = samples
+        self.rate = rate
+
+    @property
+    def channels(self) -> int:
+        return self.samples.shape[1]
+
+    @property
+    def frames(self) -> int:
+        return self.samples.shape[0]
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.rate if self.rate else 0.0
+
+    def iter_blocks(self, block_frames: int):
+        for start in range(0, self.frames, block_frames):
+            yield self.samples[start : start + block_frames]
+
+
+def _find_chunks(f, file_size: int):
+    """
+    Walks the RIFF chunks and returns (fmt_bytes, data_offset, data_size).
+    """
+    riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+    if riff != b"RIFF" or wave_id != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+
+    fmt = None
+    pos = 12
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        chunk_id, size = struct.unpack("<4sI", f.read(8))
+        if chunk_id == b"fmt ":
+            fmt = f.read(size)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            return fmt, pos + 8, size
+        pos += 8 + size + (size & 1)
+    raise ValueError("No data chunk found")
+
+
+def open_wav(path: str) -> WavBuffer:
+    """
+    Memory-maps a 16-bit PCM WAV as a (frames, channels) int16 array.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        fmt, data_offset, data_size = _find_chunks(f, file_size)
+
+    format_tag, channels, rate = struct.unpack("<HHI", fmt[:8])
+    bits = struct.unpack("<H", fmt[14:16])[0]
+    if format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_EXTENSIBLE) or bits != 16:
+        raise ValueError(f"Unsupported WAV format {format_tag}/{bits} bits in {path}")
+
+    available = file_size - data_offset
+    # ffmpeg leaves the size at 0 (or 0xFFFFFFFF) until the segment is closed
+    if data_size == 0 or data_size > available:
+        data_size = available
+
+    frame_size = 2 * channels
+    frames = data_size // frame_size
+    if frames == 0:
+        samples = np.zeros((0, channels), dtype="<i2")
+    else:
+        samples = np.memmap(
+            path, dtype="<i2", mode="r", offset=data_offset, shape=(frames, channels)
+        )
+    return WavBuffer(path, samples, rate)
+
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    """
+    Averages a (frames, channels) block into float32 mono.
+    """
+    if samples.ndim == 1:
+        return samples.astype(np.float32)
+    channels = samples.shape[1]
+    mono = samples[:, 0].astype(np.float32)
+    for c in range(1, channels):
+        mono += samples[:, c]
+    if channels > 1:
+        mono *= np.float32(1.0 / channels)
+    return mono
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    return np.clip(np.rint(samples), -32768, 32767).astype("<i2").tobytes()
+
+
+def design_lowpass(up: int, down: int, half_taps: int = 10, beta: float = 5.0):
+    """
+    Kaiser-windowed sinc anti-aliasing filter for rational resampling,
+    scaled by ``up`` to make up for the zero stuffing.
+    """
+    factor = max(up, down)
+    num_taps = 2 * half_taps * factor + 1
+    cutoff = 0.5 / factor
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(num_taps, beta)
+    return (h * up / h.sum()).astype(np.float32)
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational resampler (e.g. 48k -> 16k is up=1, down=3).
+
+    Only the output samples that are kept are computed: output ``m`` uses
+    sub-filter ``(m * down) % up`` against the last ``taps_per_phase`` input
+    samples. Filter history is carried between ``process`` calls, so feeding
+    a signal block by block gives the same result as feeding it whole.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, half_taps: int = 10):
+        g = math.gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+        h = design_lowpass(self.up, self.down, half_taps)
+
+        self.taps_per_phase = math.ceil(len(h) / self.up)
+        padded = np.zeros(self.taps_per_phase * self.up, dtype=np.float32)
+        padded[: len(h)] = h
+        # phases[p][j] multiplies x[base - j]; reversed for a dot with a window
+        self._phases = [padded[p :: self.up][::-1].copy() for p in range(self.up)]
+        self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        self._consumed = 0  # input samples seen so far
+        self._next_out = 0  # next output index to produce
+
+    def _base(self, m):
+        return (m * self.down) // self.up
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        block = np.asarray(block, dtype=np.float32)
+        total = self._consumed + len(block)
+        if total == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        # Last output whose newest input sample is already available
+        last = (total * self.up - 1) // self.down
+        outputs = np.arange(self._next_out, last + 1)
+        xpad = np.concatenate([self._history, block])
+
+        result = np.empty(len(outputs), dtype=np.float32)
+        if len(outputs):
+            windows = sliding_window_view(xpad, self.taps_per_phase)
+            if self.up == 1:
+                # Plain decimation: the kept windows are a strided view, no copy
+                first = self._base(self._next_out) - self._consumed
+                result[:] = windows[first :: self.down][: len(outputs)] @ self._phases[0]
+            else:
+                bases = self._base(outputs) - self._consumed
+                phases = (outputs * self.down) % self.up
+                for p in range(self.up):
+                    sel = phases == p
+                    if sel.any():
+                        result[sel] = windows[bases[sel]] @ self._phases[p]
+
+        keep = self.taps_per_phase - 1
+        self._history = xpad[len(xpad) - keep :] if keep else xpad[:0]
+        self._consumed = total
+        self._next_out = last + 1 if len(outputs) else self._next_out
+        return result
+
+    def flush(self) -> np.ndarray:
+        """
+        Emits the tail so the output holds ceil(n * up / down) samples.
+        The resampler must not be fed after flushing.
+        """
+        expected = -(-self._consumed * self.up // self.down)
+        missing = expected - self._next_out
+        if missing <= 0:
+            return np.zeros(0, dtype=np.float32)
+        tail = self.process(
+            np.zeros(missing * self.down // self.up + 1, dtype=np.float32)
+        )
+        return tail[:missing]
+
+
+def resample(
+    samples: np.ndarray, in_rate: int, out_rate: int, block: int = 1 << 16
+) -> np.ndarray:
+    """
+    One-shot polyphase resampling of a mono signal, processed in blocks to
+    bound the temporary window matrix.
+    """
+    if in_rate == out_rate:
+        return np.asarray(samples, dtype=np.float32)
+    resampler = PolyphaseResampler(in_rate, out_rate)
+    parts = [
+        resampler.process(samples[i : i + block]) for i in range(0, len(samples), block)
+    ]
+    parts.append(resampler.flush())
+    return np.concatenate(parts)
+
+
+def _windows(samples: np.ndarray, window: int) -> np.ndarray:
+    n = len(samples) // window
+    return np.asarray(samples[: n * window], dtype=np.float32).reshape(n, window)
+
+
+def rms_windows(samples: np.ndarray, window: int) -> np.ndarray:
+    """
+    RMS of consecutive non-overlapping windows of a mono signal.
+    A trailing partial window is ignored.
+    """
+    w = _windows(samples, window)
+    return np.sqrt(np.mean(np.square(w), axis=1))
+
+
+def peak_windows(samples: np.ndarray, window: int) -> np.ndarray:
+    w = _windows(samples, window)
+    return np.max(np.abs(w), axis=1) if len(w) else np.zeros(0, dtype=np.float32)
+
+
+def to_dbfs(level: np.ndarray) -> np.ndarray:
+    """
+    int16-scale amplitude to dBFS (digital silence is -inf).
+    """
+    with np.errstate(divide="ignore"):
+        return 20 * np.log10(np.asarray(level, dtype=np.float64) / FULL_SCALE)
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from libot.logger import logger
+
+TIMELINE_NAME = "startup_timeline.json"
+
+
+class StartupTimeline:
+    """
+    Per-step timing of a task's startup, relative to when the task began.
+
+    Steps may run on different threads; each one records its start, end and
+    the thread it ran on, so overlapping steps are visible in the output.
+    """
+
+    def __init__(self, task_id: str, task_dir: str):
+        self.task_id = task_id
+        self.path = os.path.join(task_dir, TIMELINE_NAME)
+        self._t0 = time.monotonic()
+        self._started_at = time.time()
+        self._lock = threading.Lock()
+        self._steps = []
+        self._marks = {}
+        self.saved = False
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._t0
+
+    @contextmanager
+    def step(self, name: str):
+        start = self.elapsed()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            end = self.elapsed()
+            with self._lock:
+                self._steps.append(
+                    {
+                        "name": name,
+                        "start": round(start, 3),
+                        "end": round(end, 3),
+                        "duration": round(end - start, 3),
+                        "thread": threading.current_thread().name,
+                        "ok": ok,
+                    }
+                )
+
+    def mark(self, name: str):
+        """
+        Records a point in time (e.g. "joined") without a duration.
+        """
+        with self._lock:
+            self._marks.setdefault(name, round(self.elapsed(), 3))
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "task_id": self.task_id,
+                "started_at": self._started_at,
+                "steps": sorted(self._steps, key=lambda s: s["start"]),
+                "marks": dict(self._marks),
+            }
+
+    def save(self):
+        data = self.to_dict()
+        try:
+            with open(self.path, "w") as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            logger.warning(f"[{self.task_id}] Could not write startup timeline: {e}")
+            return
+        self.saved = True
+        summary = " ".join(f"{s['name']}={s['duration']:.1f}s" for s in data["steps"])
+        logger.info(f"[{self.task_id}] ⏱️ Startup timeline: {summary} {data['marks']}")
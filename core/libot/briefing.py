@@ -1,15 +1,58 @@
-from libot.gcs import fetch_transcriptions_from_gcs
-from libot.gemini import make_briefing
+from libot.gcs import fetch_transcriptions_from_gcs, upload_text_to_gcs
+from libot.gemini import BRIEFING_VERSION, make_briefing, render_briefing
 from libot.logger import logger
 from libot.mailer import send_email
+from libot.transcripts import get_store
 import json
 
-def handle_briefing(task_id):
-    # todo: this function is called
-    transcription = fetch_transcriptions_from_gcs(task_id)
-    briefing_object = make_briefing(task_id, transcript=transcription)
+BRIEFING_NAME = "briefing.json"
+
+
+def load_transcript(task_id):
+    """
+    Meeting transcript from the task's local store; GCS is only used when
+    the store is incomplete (e.g. the process restarted mid-meeting).
+    """
+    store = get_store(task_id)
+    if store.complete():
+        logger.info(f"[{task_id}] 📝 Transcript from local store ({len(store.items())} segments)")
+        return store.transcript()
+
+    logger.warning(
+        f"[{task_id}] 📝 Local transcripts incomplete (missing {store.missing()}), fetching from GCS"
+    )
+    return fetch_transcriptions_from_gcs(task_id)
+
+
+def handle_briefing(task_id, rolling=None):
+    """
+    Sends the meeting briefing. With a RollingBriefing that kept up with the
+    meeting, it is rendered from the compact state; otherwise from the full
+    transcript.
+    """
+    briefing_object = None
+    if rolling is not None and rolling.finish():
+        briefing_object = render_briefing(task_id, rolling.state)
+    if briefing_object is None:
+        transcription = load_transcript(task_id)
+        briefing_object = make_briefing(task_id, transcript=transcription)
+    deliver_briefing(task_id, briefing_object)
+
+
+def deliver_briefing(task_id, briefing_object, send=True):
+    """
+    Keeps a copy of the briefing in GCS (stamped with the briefing version)
+    and emails it.
+    """
     logger.info(briefing_object)
     briefing = json.loads(briefing_object)
     logger.info(briefing)
-    
-    send_email(briefing=briefing["htmlBody"], subject=briefing["subject"] )
+    upload_text_to_gcs(
+        task_id,
+        BRIEFING_NAME,
+        briefing_object,
+        metadata={"briefing_version": BRIEFING_VERSION},
+    )
+
+    if send:
+        send_email(briefing=briefing["htmlBody"], subject=briefing["subject"] )
@@ -7,7 +7,7 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 
 from libot.logger import logger
-from libot.config import OUTPUT_DIR
+from libot.diagnostics import get_ring, failure_reason
 from libot.js_scripts import FIND_AND_CLICK_JS
 
 
@@ -25,7 +25,19 @@ def _wait_dom_ready(driver, timeout=30):
     return False
 
 
-def build_driver(task_id: str, avatar_y4m: str | None, task_dir: str):
+def build_driver(
+    task_id: str,
+    avatar_y4m: str | None,
+    task_dir: str,
+    profile_dir: str | None = None,
+    debug_port: int = 9222,
+    env: dict | None = None,
+):
+    """
+    Launches Chrome through chromedriver. ``debug_port`` 0 lets Chrome pick
+    a free DevTools port, for several browsers in one container. ``env``
+    (DISPLAY, PULSE_SINK, PULSE_PROP) is inherited by Chrome.
+    """
     opts = Options()
     opts.binary_location = "/usr/bin/google-chrome"
 
@@ -33,7 +45,7 @@ def build_driver(task_id: str, avatar_y4m: str | None, task_dir: str):
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-dev-shm-usage")
     opts.add_argument("--disable-gpu")
-    opts.add_argument("--remote-debugging-port=9222")
+    opts.add_argument(f"--remote-debugging-port={debug_port}")
     opts.add_argument("--window-size=1920,1080")
 
     opts.add_argument("--autoplay-policy=no-user-gesture-required")
@@ -47,7 +59,7 @@ def build_driver(task_id: str, avatar_y4m: str | None, task_dir: str):
     if avatar_y4m:
         opts.add_argument(f"--use-file-for-fake-video-capture={avatar_y4m}")
 
-    opts.add_argument(f"--user-data-dir=/tmp/profile_{task_id}")
+    opts.add_argument(f"--user-data-dir={profile_dir or f'/tmp/profile_{task_id}'}")
 
     opts.add_argument("--enable-logging=stderr")
     opts.add_argument("--v=1")
@@ -55,17 +67,26 @@ def build_driver(task_id: str, avatar_y4m: str | None, task_dir: str):
     service = Service(
         "/usr/local/bin/chromedriver",
         log_path=os.path.join(task_dir, "chromedriver.log"),
+        env=env,
     )
 
     return webdriver.Chrome(service=service, options=opts)
 
 
-def take_screenshot(driver, task_id, name):
+def take_screenshot(driver, task_id, name, force: bool = False):
+    """
+    Records a screenshot in the task's in-memory ring buffer.
+    Failure names (login_wall, fail_timeout, ...) always capture and flush
+    the ring to disk/GCS; everything else is rate-capped and stays in memory.
+    """
     try:
-        path = os.path.join(OUTPUT_DIR, task_id, f"{name}.png")
-        driver.save_screenshot(path)
-    except:
-        pass
+        ring = get_ring(task_id)
+        reason = failure_reason(name)
+        ring.capture(driver, name, force=force or reason is not None)
+        if reason:
+            ring.persist(reason)
+    except Exception as e:
+        logger.debug(f"[{task_id}] Screenshot failed: {e}")
 
 
 def safe_click(driver, tag_type, text_options, task_id):
@@ -0,0 +1,237 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from libot.logger import logger
+from libot.config import (
+    BROWSER_POOL_SIZE,
+    BROWSER_POOL_WARM_URL,
+    BROWSER_POOL_MAX_USES,
+)
+from libot.avatar import ensure_avatar_y4m
+from libot.browser import build_driver, _wait_dom_ready
+
+POOL_DIR = "/tmp/chrome_pool"
+POOL_STREAM_TAG = "scribe.browser"
+# Origins whose storage a reused browser must not carry into the next meeting
+MEETING_ORIGINS = (
+    "https://teams.microsoft.com",
+    "https://teams.live.com",
+    "https://login.microsoftonline.com",
+    "https://login.live.com",
+)
+
+
+def _origin(url: str) -> str | None:
+    parts = urlsplit(url or "")
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class WarmBrowser:
+    """
+    A launched Chrome with its own profile, primed by loading the warm URL.
+    """
+
+    def __init__(self, driver, profile_dir: str, stream_props: dict | None = None):
+        self.driver = driver
+        self.profile_dir = profile_dir
+        # Pulse properties on this browser's streams, to route them to a task
+        self.stream_props = stream_props or {}
+        self.created_at = time.time()
+        self.uses = 0
+
+    def alive(self) -> bool:
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class BrowserPool:
+    """
+    Keeps ``size`` Chrome instances launched and primed for the REST API.
+
+    ``acquire`` hands out an idle browser without waiting (None if the pool
+    is empty, and the caller cold-starts as before). ``release`` reuses the
+    browser if it has uses left, otherwise it quits it, and a background
+    thread launches the replacement.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        warm_url: str = BROWSER_POOL_WARM_URL,
+        max_uses: int = BROWSER_POOL_MAX_USES,
+        pool_dir: str = POOL_DIR,
+    ):
+        self.size = size
+        self.warm_url = warm_url
+        self.max_uses = max(1, max_uses)
+        self.pool_dir = pool_dir
+        self._idle = []
+        self._launching = 0
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = threading.Thread(
+            target=self._fill, name="browser-pool", daemon=True
+        )
+
+    def start(self):
+        os.makedirs(self.pool_dir, exist_ok=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for browser in idle:
+            browser.close()
+
+    def idle(self) -> int:
+        with self._cond:
+            return len(self._idle)
+
+    def acquire(self) -> WarmBrowser | None:
+        while True:
+            with self._cond:
+                if not self._idle:
+                    return None
+                browser = self._idle.pop(0)
+                self._cond.notify_all()
+            if browser.alive():
+                browser.uses += 1
+                return browser
+            logger.warning("♨️ Pooled browser died while idle, discarding")
+            browser.close()
+
+    def release(self, browser: WarmBrowser):
+        """
+        Gives a browser back after a task. Resetting and closing run on
+        their own thread so the task's teardown is not held up.
+        """
+        threading.Thread(
+            target=self._recycle, args=(browser,), name="browser-recycle", daemon=True
+        ).start()
+
+    def _recycle(self, browser: WarmBrowser):
+        if browser.uses < self.max_uses and not self._stop and self._reset(browser):
+            with self._cond:
+                if len(self._idle) + self._launching < self.size:
+                    self._idle.append(browser)
+                    self._cond.notify_all()
+                    return
+        browser.close()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _reset(self, browser: WarmBrowser) -> bool:
+        """
+        Leaves a used browser as the next task would find a fresh one:
+        extra windows closed, and cookies and site storage (localStorage,
+        IndexedDB, service workers, cache) cleared through DevTools for the
+        meeting origins, the warm URL's and the page it was left on.
+        """
+        try:
+            driver = browser.driver
+            origins = set(MEETING_ORIGINS)
+            for url in (self.warm_url, driver.current_url):
+                if _origin(url):
+                    origins.add(_origin(url))
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.get("about:blank")
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            for origin in sorted(origins):
+                driver.execute_cdp_cmd(
+                    "Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"}
+                )
+            return True
+        except Exception as e:
+            logger.warning(f"♨️ Could not reset pooled browser: {e}")
+            return False
+
+    def _launch(self) -> WarmBrowser:
+        slot = uuid.uuid4().hex[:8]
+        slot_dir = os.path.join(self.pool_dir, slot)
+        os.makedirs(slot_dir, exist_ok=True)
+        start = time.monotonic()
+        stream_props = {POOL_STREAM_TAG: slot}
+        env = os.environ.copy()
+        env["PULSE_PROP"] = f"{POOL_STREAM_TAG}={slot}"
+        driver = build_driver(
+            f"pool_{slot}",
+            ensure_avatar_y4m(),
+            slot_dir,
+            profile_dir=os.path.join(slot_dir, "profile"),
+            debug_port=0,
+            env=env,
+        )
+        browser = WarmBrowser(driver, slot_dir, stream_props)
+        if self.warm_url:
+            try:
+                driver.get(self.warm_url)
+                _wait_dom_ready(driver, timeout=30)
+                driver.get("about:blank")
+            except Exception as e:
+                logger.warning(f"♨️ Warm-up load failed ({self.warm_url}): {e}")
+        logger.info(f"♨️ Pooled browser {slot} ready in {time.monotonic() - start:.1f}s")
+        return browser
+
+    def _fill(self):
+        while True:
+            with self._cond:
+                while not self._stop and len(self._idle) + self._launching >= self.size:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                self._launching += 1
+            browser = None
+            try:
+                browser = self._launch()
+            except Exception as e:
+                logger.error(f"♨️ Could not launch pooled browser: {e}")
+                time.sleep(5)
+            with self._cond:
+                self._launching -= 1
+                if browser and not self._stop:
+                    self._idle.append(browser)
+                    browser = None
+                self._cond.notify_all()
+            if browser:
+                browser.close()
+
+
+_pool: BrowserPool | None = None
+
+
+def init_pool(size: int = BROWSER_POOL_SIZE) -> BrowserPool | None:
+    """
+    Starts the process-wide pool (REST API mode). A size of 0 disables it.
+    """
+    global _pool
+    if size > 0 and _pool is None:
+        _pool = BrowserPool(size=size).start()
+        logger.info(f"♨️ Browser pool started (size={size})")
+    return _pool
+
+
+def get_pool() -> BrowserPool | None:
+    return _pool
@@ -0,0 +1,115 @@
+import os
+import threading
+
+import httpx
+import requests
+from google import genai
+from google.genai import types
+from google.cloud import storage
+
+from libot.logger import logger
+from libot.config import (
+    HTTP_POOL_SIZE,
+    HTTP_KEEPALIVE_SECONDS,
+    GEMINI_REQUEST_TIMEOUT,
+    GEMINI_BASE_URL,
+)
+
+_lock = threading.Lock()
+_gemini = None
+_storage = None
+_buckets = {}
+
+
+def get_gemini_client() -> genai.Client | None:
+    """
+    Process-wide Gemini client, created on first use. Its httpx pool keeps
+    connections alive across segments and threads. None without an API key.
+    """
+    global _gemini
+    if _gemini is not None:
+        return _gemini
+
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        logger.error("GEMINI_API_KEY not set. Skipping Gemini upload.")
+        return None
+
+    with _lock:
+        if _gemini is None:
+            limits = httpx.Limits(
+                max_connections=HTTP_POOL_SIZE,
+                max_keepalive_connections=HTTP_POOL_SIZE,
+                keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+            )
+            # Retries are left to libot.scheduler
+            _gemini = genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(
+                    client_args={"limits": limits},
+                    timeout=int(GEMINI_REQUEST_TIMEOUT * 1000),
+                    base_url=GEMINI_BASE_URL,
+                ),
+            )
+        return _gemini
+
+
+def _mount_pool(session: requests.Session):
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=3,
+        pool_block=True,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def get_storage_client() -> storage.Client:
+    """
+    Process-wide GCS client. Credentials are resolved once and its
+    requests session is sized so every pipeline worker reuses a pooled
+    connection. Honours STORAGE_EMULATOR_HOST (e.g. fake-gcs-server).
+    """
+    global _storage
+    if _storage is not None:
+        return _storage
+
+    with _lock:
+        if _storage is None:
+            if os.environ.get("STORAGE_EMULATOR_HOST"):
+                from google.auth.credentials import AnonymousCredentials
+
+                client = storage.Client(
+                    project=os.environ.get("GOOGLE_CLOUD_PROJECT", "test"),
+                    credentials=AnonymousCredentials(),
+                )
+            else:
+                client = storage.Client()
+            _mount_pool(client._http)
+            auth_request = getattr(client._http, "_auth_request", None)
+            if auth_request is not None and hasattr(auth_request, "session"):
+                _mount_pool(auth_request.session)
+            _storage = client
+        return _storage
+
+
+def get_bucket(name: str) -> storage.Bucket:
+    with _lock:
+        bucket = _buckets.get(name)
+    if bucket is None:
+        bucket = get_storage_client().bucket(name)
+        with _lock:
+            bucket = _buckets.setdefault(name, bucket)
+    return bucket
+
+
+def reset_clients():
+    """
+    Drops the cached clients (tests, or after a fork).
+    """
+    global _gemini, _storage
+    with _lock:
+        _gemini = None
+        _storage = None
+        _buckets.clear()
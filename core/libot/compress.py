@@ -1,4 +1,33 @@
+import os
+import audioop
+import subprocess
+import wave
 from pydub import AudioSegment
+from pydub.exceptions import CouldntEncodeError
+
+from libot import audiobuf
+from libot.config import COMPRESS_FRONTEND
+
+# Formats Gemini accepts as-is: codec, container extension, default bitrate
+TRANSCRIPTION_FORMATS = {
+    "mp3": ("libmp3lame", "mp3", "128k"),
+    "opus": ("libopus", "ogg", "24k"),
+}
+TRANSCRIPTION_SAMPLE_RATE = 16000
+TRANSCRIPTION_CHANNELS = 1
+
+# Frames read per block by the streaming path (~1 s at 48 kHz, ~192 KB stereo)
+STREAM_BLOCK_FRAMES = 48000
+
+
+def is_transcription_ready(path: str) -> bool:
+    """
+    True when the file is already a compressed 16 kHz mono capture
+    and does not need to go through compress_audio.
+    """
+    ext = os.path.splitext(path)[1].lstrip(".").lower()
+    return any(ext == container for _, container, _ in TRANSCRIPTION_FORMATS.values())
+
 
 def _ensure_whole_frames(audio: AudioSegment) -> AudioSegment:
     """
@@ -18,9 +47,144 @@ def _ensure_whole_frames(audio: AudioSegment) -> AudioSegment:
     return audio
 
 
-def compress_audio(input_path: str, output_path: str, bitrate: str = "128k") -> None:
+def _open_streamable_wav(input_path: str):
+    """
+    Opens a PCM WAV for the streaming path, or returns None when the file
+    needs the pydub fallback (not WAV, >2 channels, bogus header size).
+    """
+    try:
+        wav = wave.open(input_path, "rb")
+    except (wave.Error, EOFError):
+        return None
+
+    frame_size = wav.getsampwidth() * wav.getnchannels()
+    data_bytes = wav.getnframes() * frame_size
+    # ffmpeg only patches the data size on a clean close; a killed capture
+    # leaves it at 0 while the file still holds audio.
+    truncated_header = data_bytes == 0 and os.path.getsize(input_path) > 1024
+    if wav.getnchannels() > 2 or frame_size == 0 or truncated_header:
+        wav.close()
+        return None
+    return wav
+
+
+def _stream_pcm(wav, sink, block_frames: int = STREAM_BLOCK_FRAMES) -> None:
+    """
+    Reads ``wav`` in frame-aligned blocks and writes 16 kHz mono s16le to
+    ``sink``. ratecv state is carried across blocks, so the result matches
+    resampling the whole buffer at once.
+    """
+    width = wav.getsampwidth()
+    channels = wav.getnchannels()
+    rate = wav.getframerate()
+    frame_size = width * channels
+    state = None
+
+    while True:
+        data = wav.readframes(block_frames)
+        if not data:
+            break
+        remainder = len(data) % frame_size
+        if remainder:
+            data = data[:-remainder]  # same guarantee as _ensure_whole_frames
+
+        if width == 1:
+            data = audioop.bias(data, 1, -128)  # 8-bit WAV is unsigned
+        if width != 2:
+            data = audioop.lin2lin(data, width, 2)
+        if channels == 2:
+            data = audioop.tomono(data, 2, 0.5, 0.5)
+        if rate != TRANSCRIPTION_SAMPLE_RATE:
+            data, state = audioop.ratecv(
+                data, 2, 1, rate, TRANSCRIPTION_SAMPLE_RATE, state
+            )
+        sink.write(data)
+
+
+def _stream_pcm_numpy(
+    input_path: str, sink, block_frames: int = STREAM_BLOCK_FRAMES
+) -> None:
+    """
+    Same contract as _stream_pcm, using the memory-mapped NumPy front end.
+    """
+    buf = audiobuf.open_wav(input_path)
+    resampler = None
+    if buf.rate != TRANSCRIPTION_SAMPLE_RATE:
+        resampler = audiobuf.PolyphaseResampler(buf.rate, TRANSCRIPTION_SAMPLE_RATE)
+
+    for block in buf.iter_blocks(block_frames):
+        mono = audiobuf.to_mono(block)
+        if resampler:
+            mono = resampler.process(mono)
+        sink.write(audiobuf.to_pcm16(mono))
+    if resampler:
+        sink.write(audiobuf.to_pcm16(resampler.flush()))
+
+
+def _compress_streaming(wav, input_path: str, output_path: str, bitrate: str) -> None:
+    cmd = [
+        AudioSegment.converter,
+        "-y",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "s16le",
+        "-ar",
+        str(TRANSCRIPTION_SAMPLE_RATE),
+        "-ac",
+        str(TRANSCRIPTION_CHANNELS),
+        "-i",
+        "pipe:0",
+        "-b:a",
+        bitrate,
+        "-f",
+        "mp3",
+        output_path,
+    ]
+    encoder = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        if COMPRESS_FRONTEND == "numpy" and wav.getsampwidth() == 2:
+            _stream_pcm_numpy(input_path, encoder.stdin)
+        else:
+            _stream_pcm(wav, encoder.stdin)
+    finally:
+        encoder.stdin.close()
+        stderr = encoder.stderr.read()
+        encoder.wait()
+
+    if encoder.returncode != 0:
+        raise CouldntEncodeError(
+            f"Encoding failed. ffmpeg returned error code: {encoder.returncode}\n\n"
+            f"Output from ffmpeg:\n\n{stderr.decode(errors='ignore')}"
+        )
+
+
+def _compress_pydub(input_path: str, output_path: str, bitrate: str) -> None:
     audio = AudioSegment.from_file(input_path)
     audio = _ensure_whole_frames(audio)
-    audio = audio.set_channels(1)  # mono
-    audio = audio.set_frame_rate(16000)  # 16 kHz
+    audio = audio.set_channels(TRANSCRIPTION_CHANNELS)  # mono
+    audio = audio.set_frame_rate(TRANSCRIPTION_SAMPLE_RATE)  # 16 kHz
     audio.export(output_path, format="mp3", bitrate=bitrate)
+
+
+def compress_audio(input_path: str, output_path: str, bitrate: str = "128k") -> None:
+    """
+    Compresses a recording to a 16 kHz mono MP3.
+
+    PCM WAV input is streamed block by block through audioop (or the NumPy
+    front end, see COMPRESS_FRONTEND) into an ffmpeg encoder pipe, so memory
+    stays flat whatever the segment length. Anything else goes through pydub.
+    """
+    wav = _open_streamable_wav(input_path)
+    if wav is None:
+        _compress_pydub(input_path, output_path, bitrate)
+        return
+
+    with wav:
+        _compress_streaming(wav, input_path, output_path, bitrate)
@@ -26,6 +26,7 @@ if not TASK_ID:
 
 AVATAR_IMAGE = os.environ.get("AVATAR_IMAGE", "/app/assets/scribe.png")
 AVATAR_Y4M = os.environ.get("AVATAR_Y4M", "/app/assets/scribe.mjpeg")
+# Only job_main.py exits; the REST service runs several tasks per process
 EXIT_ON_FINISH = env_bool("EXIT_ON_FINISH", True)
 
 GCS_BUCKET = os.environ.get("GCS_BUCKET")
@@ -44,3 +45,115 @@ if not os.path.exists(OUTPUT_DIR):
 DURATION = int(os.environ.get("DURATION", "7200"))
 RECORD_AUDIO = env_bool("RECORD_AUDIO", True)
 RECORD_VIDEO = env_bool("RECORD_VIDEO", False)
+
+# Segment pipeline sizing (see libot.pipeline)
+PIPELINE_QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", "4"))
+PIPELINE_COMPRESS_WORKERS = int(os.environ.get("PIPELINE_COMPRESS_WORKERS", "1"))
+PIPELINE_UPLOAD_WORKERS = int(os.environ.get("PIPELINE_UPLOAD_WORKERS", "2"))
+PIPELINE_TRANSCRIBE_WORKERS = int(os.environ.get("PIPELINE_TRANSCRIBE_WORKERS", "2"))
+
+# Audio capture: "wav" (48 kHz stereo, compressed later), "mp3" or "opus"
+# (16 kHz mono written directly by the ffmpeg segmenter).
+CAPTURE_FORMAT = os.environ.get("CAPTURE_FORMAT", "wav").lower()
+CAPTURE_BITRATE = os.environ.get("CAPTURE_BITRATE")
+# Keep a lossless 48 kHz WAV copy next to the compressed capture
+CAPTURE_ARCHIVE = env_bool("CAPTURE_ARCHIVE", False)
+# Compression front end for WAV segments (see libot.compress): "audioop"
+# (bit-exact with the pydub path) or "numpy" (libot.audiobuf)
+COMPRESS_FRONTEND = os.environ.get("COMPRESS_FRONTEND", "audioop").lower()
+
+# Voice-activity gating before transcription (see libot.vad)
+VAD_ENABLED = env_bool("VAD_ENABLED", True)
+VAD_THRESHOLD_DBFS = float(os.environ.get("VAD_THRESHOLD_DBFS", "-50"))
+VAD_MIN_SILENCE_SECONDS = float(os.environ.get("VAD_MIN_SILENCE_SECONDS", "2.0"))
+VAD_PADDING_SECONDS = float(os.environ.get("VAD_PADDING_SECONDS", "0.5"))
+VAD_MIN_SPEECH_SECONDS = float(os.environ.get("VAD_MIN_SPEECH_SECONDS", "1.0"))
+
+# Segmenting: "fixed" (ffmpeg -segment_time) or "adaptive" (cut at pauses,
+# see libot.segmenter). Windows are "min-max" seconds.
+SEGMENT_MODE = os.environ.get("SEGMENT_MODE", "fixed").lower()
+SEGMENT_WINDOW = os.environ.get("SEGMENT_WINDOW", "240-330")
+SEGMENT_EARLY_WINDOW = os.environ.get("SEGMENT_EARLY_WINDOW", "45-90")
+SEGMENT_EARLY_COUNT = int(os.environ.get("SEGMENT_EARLY_COUNT", "2"))
+SEGMENT_PAUSE_DBFS = float(os.environ.get("SEGMENT_PAUSE_DBFS", "-40"))
+SEGMENT_PAUSE_SECONDS = float(os.environ.get("SEGMENT_PAUSE_SECONDS", "0.4"))
+
+# Diagnostics screenshots (see libot.diagnostics)
+SCREENSHOT_RING_SIZE = int(os.environ.get("SCREENSHOT_RING_SIZE", "20"))
+SCREENSHOT_MIN_INTERVAL = float(os.environ.get("SCREENSHOT_MIN_INTERVAL", "2.0"))
+SCREENSHOT_SCALE = float(os.environ.get("SCREENSHOT_SCALE", "0.5"))
+SCREENSHOT_UPLOAD = env_bool("SCREENSHOT_UPLOAD", True)
+
+# Audio routing (see libot.audio.AudioRouter): how long capture waits for
+# the browser's stream to be confirmed on the virtual sink.
+AUDIO_ROUTING_TIMEOUT = float(os.environ.get("AUDIO_ROUTING_TIMEOUT", "10"))
+
+# Warm Chrome pool for the REST API service (see libot.browser_pool).
+# Not used by the Cloud Run job. Pooled browsers run on the container's
+# display and their audio is routed to each task's sink, so with per-task
+# isolation (TASK_SLOTS > 0) they serve audio-only tasks; tasks recording
+# video cold-start Chrome on their own display.
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "1"))
+BROWSER_POOL_WARM_URL = os.environ.get("BROWSER_POOL_WARM_URL", "https://teams.microsoft.com/")
+# Meetings a pooled browser serves before it is replaced (1 = never reused)
+BROWSER_POOL_MAX_USES = int(os.environ.get("BROWSER_POOL_MAX_USES", "1"))
+
+# Per-task isolation in REST API mode (see libot.resources): concurrent
+# recordings, each with its own Xvfb display, null sink and DevTools port.
+TASK_SLOTS = int(os.environ.get("TASK_SLOTS", "4"))
+TASK_DISPLAY_BASE = int(os.environ.get("TASK_DISPLAY_BASE", "100"))
+TASK_DEBUG_PORT_BASE = int(os.environ.get("TASK_DEBUG_PORT_BASE", "9300"))
+
+# Admission control for the REST API (see libot.admission). Each recording
+# is budgeted ADMISSION_TASK_CPU cores and ADMISSION_TASK_MEMORY_MB of RAM.
+# With TASK_SLOTS=0 recordings share one display and sink, so one at a time.
+ADMISSION_MAX_CONCURRENT = int(os.environ.get("ADMISSION_MAX_CONCURRENT", "4"))
+ADMISSION_QUEUE_SIZE = int(os.environ.get("ADMISSION_QUEUE_SIZE", "20"))
+ADMISSION_TASK_CPU = float(os.environ.get("ADMISSION_TASK_CPU", "1.0"))
+ADMISSION_TASK_MEMORY_MB = float(os.environ.get("ADMISSION_TASK_MEMORY_MB", "1024"))
+
+# Shared HTTP pools for the Gemini and GCS clients (see libot.clients)
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "16"))
+HTTP_KEEPALIVE_SECONDS = float(os.environ.get("HTTP_KEEPALIVE_SECONDS", "60"))
+
+# Parallel composite upload for large files (see libot.gcs_upload)
+UPLOAD_PARALLEL_THRESHOLD_MB = int(os.environ.get("UPLOAD_PARALLEL_THRESHOLD_MB", "64"))
+UPLOAD_PART_SIZE_MB = int(os.environ.get("UPLOAD_PART_SIZE_MB", "32"))
+UPLOAD_WORKERS = int(os.environ.get("UPLOAD_WORKERS", "4"))
+UPLOAD_RETRIES = int(os.environ.get("UPLOAD_RETRIES", "3"))
+
+# Concurrent bucket reads (see libot.gcs.iter_bucket_files_bytes): blobs are
+# prefetched by GCS_READ_WORKERS threads; larger objects are streamed instead.
+GCS_READ_WORKERS = int(os.environ.get("GCS_READ_WORKERS", "8"))
+GCS_STREAM_THRESHOLD_MB = int(os.environ.get("GCS_STREAM_THRESHOLD_MB", "32"))
+
+# Rolling briefing (see libot.rolling): the meeting state is summarised as
+# segment transcripts arrive, so only a short render is left for the end.
+ROLLING_BRIEFING = env_bool("ROLLING_BRIEFING", True)
+# How long the end of the meeting waits for the last segments to be folded
+ROLLING_BRIEFING_TIMEOUT = float(os.environ.get("ROLLING_BRIEFING_TIMEOUT", "120"))
+
+# Gemini request scheduling (see libot.scheduler), shared by every task of
+# the process: rate limit, concurrent requests, and the per-segment retry
+# budget (attempts and deadline) for 429/5xx/timeout failures.
+GEMINI_RATE_PER_MINUTE = float(os.environ.get("GEMINI_RATE_PER_MINUTE", "60"))
+GEMINI_BURST = int(os.environ.get("GEMINI_BURST", "5"))
+GEMINI_MAX_CONCURRENT = int(os.environ.get("GEMINI_MAX_CONCURRENT", "8"))
+GEMINI_MAX_ATTEMPTS = int(os.environ.get("GEMINI_MAX_ATTEMPTS", "6"))
+GEMINI_BACKOFF_BASE = float(os.environ.get("GEMINI_BACKOFF_BASE", "2"))
+GEMINI_BACKOFF_MAX = float(os.environ.get("GEMINI_BACKOFF_MAX", "60"))
+GEMINI_DEADLINE_SECONDS = float(os.environ.get("GEMINI_DEADLINE_SECONDS", "900"))
+GEMINI_REQUEST_TIMEOUT = float(os.environ.get("GEMINI_REQUEST_TIMEOUT", "300"))
+# Alternative endpoint, e.g. a local fake for tests (tests/fake_gemini.py)
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL")
+
+# Transcription cache (see libot.transcription_cache): transcripts keyed by
+# the compressed segment's hash, model and prompt/schema. The local tier is
+# capped at TRANSCRIPTION_CACHE_MAX_MB; the shared tier uses GCS_BUCKET.
+TRANSCRIPTION_CACHE = env_bool("TRANSCRIPTION_CACHE", True)
+TRANSCRIPTION_CACHE_MAX_MB = int(os.environ.get("TRANSCRIPTION_CACHE_MAX_MB", "256"))
+TRANSCRIPTION_CACHE_SHARED = env_bool("TRANSCRIPTION_CACHE_SHARED", True)
+
+# Per-task manifest (see libot.manifest) mirrored to GCS this often, so a
+# crashed task can be finished by resume_main.py
+MANIFEST_MIRROR_SECONDS = float(os.environ.get("MANIFEST_MIRROR_SECONDS", "30"))
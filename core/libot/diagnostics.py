@@ -0,0 +1,141 @@
+import base64
+import os
+import threading
+import time
+from collections import deque
+
+from libot.logger import logger
+from libot.config import (
+    OUTPUT_DIR,
+    SCREENSHOT_RING_SIZE,
+    SCREENSHOT_MIN_INTERVAL,
+    SCREENSHOT_SCALE,
+    SCREENSHOT_UPLOAD,
+)
+from libot.gcs import upload_recordings_to_gcs
+
+# Screenshot names that flush the ring to disk (and GCS)
+FAILURE_REASONS = ("login_wall", "fail_timeout", "controls_lost", "critical_error")
+JPEG_QUALITY = 70
+
+
+def failure_reason(name: str) -> str | None:
+    for reason in FAILURE_REASONS:
+        if name.endswith(reason):
+            return reason
+    return None
+
+
+class ScreenshotRing:
+    """
+    Keeps the last ``size`` screenshots of a task in memory.
+
+    Captures are downscaled JPEGs taken through the DevTools protocol when
+    available, and rate-capped to one per ``min_interval`` seconds unless
+    forced. Nothing touches the disk until ``persist`` is called from a
+    failure path.
+    """
+
+    def __init__(
+        self,
+        task_id: str,
+        size: int = SCREENSHOT_RING_SIZE,
+        min_interval: float = SCREENSHOT_MIN_INTERVAL,
+        scale: float = SCREENSHOT_SCALE,
+    ):
+        self.task_id = task_id
+        self.min_interval = min_interval
+        self.scale = scale
+        self._frames = deque(maxlen=max(1, size))
+        self._lock = threading.Lock()
+        self._last_capture = 0.0
+        self._viewport = None
+        self._cdp = True
+
+    def _grab(self, driver) -> tuple[bytes, str]:
+        if self._cdp and self.scale < 1:
+            try:
+                if self._viewport is None:
+                    self._viewport = driver.execute_script(
+                        "return [window.innerWidth, window.innerHeight];"
+                    )
+                width, height = self._viewport
+                shot = driver.execute_cdp_cmd(
+                    "Page.captureScreenshot",
+                    {
+                        "format": "jpeg",
+                        "quality": JPEG_QUALITY,
+                        "clip": {
+                            "x": 0,
+                            "y": 0,
+                            "width": width,
+                            "height": height,
+                            "scale": self.scale,
+                        },
+                    },
+                )
+                return base64.b64decode(shot["data"]), "jpg"
+            except Exception:
+                self._cdp = False
+        return driver.get_screenshot_as_png(), "png"
+
+    def capture(self, driver, name: str, force: bool = False) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_capture < self.min_interval:
+                return False
+            self._last_capture = now
+        try:
+            data, ext = self._grab(driver)
+        except Exception:
+            return False
+        with self._lock:
+            self._frames.append((time.time(), name, data, ext))
+        return True
+
+    def persist(self, reason: str, upload: bool = SCREENSHOT_UPLOAD) -> list:
+        """
+        Writes the buffered screenshots to OUTPUT_DIR/<task>/diagnostics/<reason>/
+        and optionally uploads them next to the recordings.
+        """
+        with self._lock:
+            frames = list(self._frames)
+            self._frames.clear()
+
+        out_dir = os.path.join(OUTPUT_DIR, self.task_id, "diagnostics", reason)
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for i, (ts, name, data, ext) in enumerate(frames):
+            path = os.path.join(out_dir, f"{i:02d}_{int(ts)}_{name}.{ext}")
+            with open(path, "wb") as f:
+                f.write(data)
+            paths.append(path)
+
+        logger.info(
+            f"[{self.task_id}] 📸 {len(paths)} capturas guardadas en {out_dir} ({reason})"
+        )
+        if upload:
+            for path in paths:
+                upload_recordings_to_gcs(
+                    self.task_id,
+                    path,
+                    f"diagnostics/{reason}/{os.path.basename(path)}",
+                )
+        return paths
+
+
+_rings = {}
+_rings_lock = threading.Lock()
+
+
+def get_ring(task_id: str) -> ScreenshotRing:
+    with _rings_lock:
+        ring = _rings.get(task_id)
+        if ring is None:
+            ring = _rings[task_id] = ScreenshotRing(task_id)
+        return ring
+
+
+def release_ring(task_id: str):
+    with _rings_lock:
+        _rings.pop(task_id, None)
@@ -1,94 +1,236 @@
 import os
-from google.cloud import storage
-from libot.config import GCS_BUCKET, GCS_PREFIX
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from libot.clients import get_bucket
+from libot.config import (
+    GCS_BUCKET,
+    GCS_PREFIX,
+    GCS_READ_WORKERS,
+    GCS_STREAM_THRESHOLD_MB,
+    UPLOAD_PARALLEL_THRESHOLD_MB,
+)
+from libot.gcs_upload import parallel_upload
 from libot.logger import logger
-from typing import Iterable, Iterator, Optional, Tuple
+from libot.transcript_merge import merge_transcript, transcript_index
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple, Union
  
 def upload_recordings_to_gcs(task_id, path, file_name="recording.mp4"):
     """
     Uploads the resulting video to Google Cloud Storage.
+    Returns True once the file is stored.
     """
     if not GCS_BUCKET:
         logger.warning("No GCS_BUCKET defined. Skipping upload.")
-        return
+        return False
 
     try:
-        client = storage.Client()
-        bucket = client.bucket(GCS_BUCKET)
+        bucket = get_bucket(GCS_BUCKET)
         base = f"{GCS_PREFIX}/{task_id}" if GCS_PREFIX else task_id
 
         if path and os.path.exists(path):
-            blob = bucket.blob(f"{base}/{file_name}")
-            blob.upload_from_filename(path)
+            if os.path.getsize(path) >= UPLOAD_PARALLEL_THRESHOLD_MB * 2**20:
+                parallel_upload(bucket, path, f"{base}/{file_name}")
+            else:
+                blob = bucket.blob(f"{base}/{file_name}")
+                blob.upload_from_filename(path)
             logger.info(f"✅ Uploaded file: gs://{GCS_BUCKET}/{base}/{file_name}")
-        else:
-            logger.error(f"❌ File not found for upload: {path}")
+            return True
+        logger.error(f"❌ File not found for upload: {path}")
 
     except Exception as e:
         logger.error(f"❌ GCS Upload failed: {e}")
+    return False
+
+
+def download_from_gcs(task_id, file_name, path) -> bool:
+    """
+    Downloads ``file_name`` from the task's GCS folder to ``path``.
+    Returns False when it does not exist or cannot be read.
+    """
+    if not GCS_BUCKET:
+        return False
 
+    try:
+        bucket = get_bucket(GCS_BUCKET)
+        base = f"{GCS_PREFIX}/{task_id}" if GCS_PREFIX else task_id
+        blob = bucket.blob(f"{base}/{file_name}")
+        if not blob.exists():
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        blob.download_to_filename(path)
+        logger.info(f"✅ Downloaded gs://{GCS_BUCKET}/{base}/{file_name}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ GCS download failed for {file_name}: {e}")
+        return False
 
-def upload_transcriptions_to_gcs(task_id, transcription_file):
+
+def upload_transcriptions_to_gcs(task_id, transcription_file, metadata=None):
+    """
+    ``metadata`` is stored on the object (e.g. the transcript version).
+    """
     if not GCS_BUCKET:
         logger.warning("No GCS_BUCKET defined. Skipping upload.")
-        return
+        return False
 
     try:
-        client = storage.Client()
-        bucket = client.bucket(GCS_BUCKET)
+        bucket = get_bucket(GCS_BUCKET)
         base = f"{GCS_PREFIX}/{task_id}" if GCS_PREFIX else task_id
 
         if transcription_file and os.path.exists(transcription_file):
             blob = bucket.blob(
                 f"{base}/transcriptions/{os.path.basename(transcription_file)}"
             )
+            if metadata:
+                blob.metadata = metadata
             blob.upload_from_filename(transcription_file)
             logger.info(
                 f"✅ Uploaded file: gs://{GCS_BUCKET}/{base}/transcriptions/{os.path.basename(transcription_file)}"
             )
-        else:
-            logger.error(f"❌ File not found for upload: {transcription_file}")
+            return True
+        logger.error(f"❌ File not found for upload: {transcription_file}")
 
     except Exception as e:
         logger.error(f"❌ GCS Upload failed: {e}")
+    return False
 
 
-def iter_bucket_files_bytes(
+def upload_text_to_gcs(task_id, file_name, text, metadata=None, content_type="application/json"):
+    if not GCS_BUCKET:
+        logger.warning("No GCS_BUCKET defined. Skipping upload.")
+        return False
+
+    try:
+        bucket = get_bucket(GCS_BUCKET)
+        base = f"{GCS_PREFIX}/{task_id}" if GCS_PREFIX else task_id
+        blob = bucket.blob(f"{base}/{file_name}")
+        if metadata:
+            blob.metadata = metadata
+        blob.upload_from_string(text, content_type=content_type)
+        logger.info(f"✅ Uploaded file: gs://{GCS_BUCKET}/{base}/{file_name}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ GCS Upload failed: {e}")
+        return False
+
+
+def list_bucket_files(
     bucket_name: str,
     *,
     prefix: Optional[str] = None,
-) -> Iterator[Tuple[str, bytes]]:
-    client = storage.Client()
-    # list_blobs handles pagination internally :contentReference[oaicite:2]{index=2}
-    for blob in client.list_blobs(bucket_name, prefix=prefix):
+    suffixes: Union[str, Tuple[str, ...], None] = None,
+    min_generation: Optional[int] = None,
+    key: Optional[Callable] = None,
+) -> list:
+    """
+    Blobs under ``prefix`` ending in one of ``suffixes`` and written at or
+    after ``min_generation``, sorted by name or by ``key(name)``. Blobs for
+    which ``key`` returns None are left out.
+    """
+    blobs = []
+    for blob in get_bucket(bucket_name).list_blobs(prefix=prefix):
         # Skip "directory marker" objects if present
         if blob.name.endswith("/"):
             continue
-        text = blob.download_as_text(encoding="utf-8")
-        logger.info(text)
-        yield blob.name, text
+        if suffixes and not blob.name.endswith(suffixes):
+            continue
+        if min_generation is not None and (blob.generation or 0) < min_generation:
+            continue
+        order = key(blob.name) if key else blob.name
+        if order is not None:
+            blobs.append((order, blob.name, blob))
+    blobs.sort(key=lambda item: item[:2])
+    return [blob for _, _, blob in blobs]
+
+
+def iter_bucket_files_bytes(
+    bucket_name: str,
+    *,
+    prefix: Optional[str] = None,
+    suffixes: Union[str, Tuple[str, ...], None] = None,
+    min_generation: Optional[int] = None,
+    key: Optional[Callable] = None,
+    workers: int = GCS_READ_WORKERS,
+    stream_threshold: Optional[int] = GCS_STREAM_THRESHOLD_MB * 2**20,
+) -> Iterator[Tuple[str, Union[bytes, BinaryIO]]]:
+    """
+    Yields ``(name, data)`` for the blobs picked by ``list_bucket_files``,
+    in that order, while up to ``workers`` downloads run ahead of the
+    reader (at most ``2 * workers`` objects are held in memory).
+
+    ``data`` is the object's bytes, or an open binary stream (to be closed
+    by the caller) for objects larger than ``stream_threshold``; None
+    never streams. Downloads are pinned to the listed generation. A failed
+    download is raised when its object's turn comes.
+    """
+    blobs = list_bucket_files(
+        bucket_name, prefix=prefix, suffixes=suffixes, min_generation=min_generation, key=key
+    )
+    start = time.monotonic()
+    total = 0
+    workers = max(1, workers)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gcs-read")
+    ahead = deque()
+    pending = iter(blobs)
+    try:
+        while True:
+            while len(ahead) < 2 * workers:
+                blob = next(pending, None)
+                if blob is None:
+                    break
+                if stream_threshold is not None and (blob.size or 0) > stream_threshold:
+                    ahead.append((blob, None))
+                else:
+                    ahead.append((blob, pool.submit(blob.download_as_bytes)))
+            if not ahead:
+                break
+            blob, future = ahead.popleft()
+            if future is None:
+                total += blob.size or 0
+                yield blob.name, blob.open("rb")
+            else:
+                data = future.result()
+                total += len(data)
+                yield blob.name, data
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    logger.info(
+        f"📥 Read {len(blobs)} objects ({total / 2**20:.1f} MB) from gs://{bucket_name}/"
+        f"{prefix or ''} in {time.monotonic() - start:.2f}s"
+    )
+
+
+def _segment_index(name: str) -> Optional[int]:
+    try:
+        return transcript_index(name)
+    except (IndexError, ValueError):
+        return None
 
 
 def fetch_transcriptions_from_gcs(task_id: str):
+    """
+    Meeting transcript rebuilt from the segment transcripts in GCS, in
+    segment order. Files are downloaded and merged one at a time.
+    """
     if not GCS_BUCKET:
-        logger.warning("No GCS_BUCKET defined. Skipping upload.")
+        logger.warning("No GCS_BUCKET defined. Skipping download.")
         return
 
     try:
-        client = storage.Client()
-        bucket = client.bucket(GCS_BUCKET)
-        base = f"{task_id}/transcriptions" 
-
-        transcript = []
-        for name, data in iter_bucket_files_bytes(bucket, prefix=base):
-
-            print(name, len(data))
-            transcript.append(data)
-
-        full_transcript = "".join(transcript)
-        logger.info(full_transcript)
+        base = f"{GCS_PREFIX}/{task_id}" if GCS_PREFIX else task_id
+        files = iter_bucket_files_bytes(
+            GCS_BUCKET,
+            prefix=f"{base}/transcriptions/",
+            suffixes=".json",
+            key=_segment_index,
+            stream_threshold=None,
+        )
+        documents = ((transcript_index(name), data) for name, data in files)
+        full_transcript = merge_transcript(documents)
+        logger.info(f"[{task_id}] 📝 Transcript from GCS: {len(full_transcript)} chars")
         return full_transcript
 
-
     except Exception as e:
-        logger.error(f"❌ GCS Upload failed: {e}")
+        logger.error(f"❌ GCS download failed: {e}")
@@ -0,0 +1,217 @@
+import base64
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import google_crc32c
+
+from libot.logger import logger
+from libot.config import (
+    UPLOAD_PART_SIZE_MB,
+    UPLOAD_WORKERS,
+    UPLOAD_RETRIES,
+)
+
+# GCS compose accepts at most 32 source objects per call
+COMPOSE_MAX_SOURCES = 32
+READ_BLOCK = 8 * 2**20
+
+
+def plan_parts(size: int, part_size: int) -> list[tuple[int, int]]:
+    """
+    (offset, length) of every part; the last one may be shorter.
+    """
+    return [(offset, min(part_size, size - offset)) for offset in range(0, size, part_size)]
+
+
+def file_crc32c(path: str) -> str:
+    """
+    Base64 CRC32C of a file, in the format GCS reports for objects.
+    """
+    checksum = google_crc32c.Checksum()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK), b""):
+            checksum.update(block)
+    return base64.b64encode(checksum.digest()).decode()
+
+
+class _FileRange:
+    """
+    Read-only file object over ``length`` bytes starting at ``offset``, so a
+    part can be streamed (and rewound on retry) without loading it in memory.
+    """
+
+    def __init__(self, path: str, offset: int, length: int):
+        self._f = open(path, "rb")
+        self._offset = offset
+        self._length = length
+        self._f.seek(offset)
+
+    def tell(self) -> int:
+        return self._f.tell() - self._offset
+
+    def seek(self, pos: int, whence: int = 0) -> int:
+        if whence == 1:
+            pos += self.tell()
+        elif whence == 2:
+            pos += self._length
+        self._f.seek(self._offset + max(0, min(pos, self._length)))
+        return self.tell()
+
+    def read(self, n: int = -1) -> bytes:
+        left = self._length - self.tell()
+        if n is None or n < 0 or n > left:
+            n = left
+        return self._f.read(n)
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Progress:
+    def __init__(self, name: str, total: int, callback=None):
+        self.name = name
+        self.total = total
+        self.callback = callback
+        self.done = 0
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+    def add(self, n: int):
+        with self._lock:
+            self.done += n
+            done = self.done
+        elapsed = max(time.monotonic() - self._start, 1e-6)
+        logger.info(
+            f"📤 {self.name}: {done / 2**20:.0f}/{self.total / 2**20:.0f} MB "
+            f"({done * 100 / max(self.total, 1):.0f}%, {done / 2**20 / elapsed:.1f} MB/s)"
+        )
+        if self.callback:
+            self.callback(done, self.total)
+
+
+def _upload_part(bucket, path, name, offset, length, retries, progress):
+    blob = bucket.blob(name)
+    for attempt in range(retries + 1):
+        try:
+            with _FileRange(path, offset, length) as part:
+                # checksum="crc32c" makes the library verify the stored part
+                blob.upload_from_file(part, size=length, checksum="crc32c")
+            progress.add(length)
+            return blob
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = 2**attempt
+            logger.warning(f"📤 Part {name} failed ({e}), retrying in {delay}s")
+            time.sleep(delay)
+
+
+def _compose(bucket, sources, dest_name, content_type, temp_prefix, temporaries):
+    """
+    Composes any number of parts, in rounds of COMPOSE_MAX_SOURCES.
+    """
+    level = 0
+    while len(sources) > COMPOSE_MAX_SOURCES:
+        grouped = []
+        for i in range(0, len(sources), COMPOSE_MAX_SOURCES):
+            blob = bucket.blob(f"{temp_prefix}/c{level}_{i // COMPOSE_MAX_SOURCES:05d}")
+            blob.compose(sources[i : i + COMPOSE_MAX_SOURCES])
+            temporaries.append(blob)
+            grouped.append(blob)
+        sources = grouped
+        level += 1
+
+    dest = bucket.blob(dest_name)
+    dest.content_type = content_type
+    dest.compose(sources)
+    return dest
+
+
+def parallel_upload(
+    bucket,
+    path: str,
+    blob_name: str,
+    part_size: int = UPLOAD_PART_SIZE_MB * 2**20,
+    workers: int = UPLOAD_WORKERS,
+    retries: int = UPLOAD_RETRIES,
+    progress=None,
+):
+    """
+    Uploads a large file as parallel composite parts.
+
+    The file is cut into ``part_size`` ranges that are uploaded
+    concurrently as temporary objects, each retried on its own and checked
+    against its CRC32C. The parts are then composed into ``blob_name``,
+    the final object's CRC32C is compared with the local file's, and the
+    temporary objects are deleted. ``progress(done_bytes, total_bytes)``
+    is called as parts finish.
+    """
+    size = os.path.getsize(path)
+    parts = plan_parts(size, part_size)
+    if len(parts) < 2:
+        blob = bucket.blob(blob_name)
+        blob.upload_from_filename(path, checksum="crc32c")
+        return blob
+
+    temp_prefix = f"{blob_name}.parts/{int(time.time())}"
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    tracker = _Progress(os.path.basename(path), size, progress)
+    temporaries = []
+
+    logger.info(
+        f"📤 Uploading {path} ({size / 2**20:.0f} MB) in {len(parts)} parts "
+        f"with {workers} workers"
+    )
+    start = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gcs-part") as pool:
+            futures = [
+                pool.submit(
+                    _upload_part,
+                    bucket,
+                    path,
+                    f"{temp_prefix}/p{i:05d}",
+                    offset,
+                    length,
+                    retries,
+                    tracker,
+                )
+                for i, (offset, length) in enumerate(parts)
+            ]
+            # The whole-file checksum is computed while the parts upload
+            expected = file_crc32c(path)
+            sources, errors = [], []
+            for future in futures:
+                try:
+                    sources.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+        temporaries.extend(sources)
+        if errors:
+            raise errors[0]
+
+        dest = _compose(bucket, sources, blob_name, content_type, temp_prefix, temporaries)
+        dest.reload()
+        if dest.crc32c != expected:
+            raise ValueError(
+                f"CRC32C mismatch for {blob_name}: local {expected}, remote {dest.crc32c}"
+            )
+    finally:
+        if temporaries:
+            bucket.delete_blobs(temporaries, on_error=lambda blob: None)
+
+    elapsed = time.monotonic() - start
+    logger.info(
+        f"📤 {blob_name} uploaded and verified in {elapsed:.1f}s "
+        f"({size / 2**20 / max(elapsed, 1e-6):.1f} MB/s)"
+    )
+    return dest
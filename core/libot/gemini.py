@@ -3,8 +3,12 @@ import json
 from google import genai
 from google.genai import types
 from libot.logger import logger
-from libot.config import OUTPUT_DIR
+from libot.config import OUTPUT_DIR, TRANSCRIPTION_CACHE
 from libot.gcs import upload_transcriptions_to_gcs
+from libot.clients import get_gemini_client
+from libot.transcripts import get_store
+from libot.scheduler import RetryBudget, get_scheduler
+from libot.transcription_cache import cache_namespace, file_key, get_cache
 
 MODEL_ID = "gemini-flash-latest"
 
@@ -26,6 +30,10 @@ generate_content_config = types.GenerateContentConfig(
                         "text": genai.types.Schema(
                             type=genai.types.Type.STRING,
                         ),
+                        "start": genai.types.Schema(
+                            type=genai.types.Type.NUMBER,
+                            description="Seconds from the beginning of the audio",
+                        ),
                     },
                 ),
             ),
@@ -53,6 +61,60 @@ generate_content_config_briefing = types.GenerateContentConfig(
         })
     )
 
+generate_content_config_state = types.GenerateContentConfig(
+    system_instruction="""Tu tiens à jour l'état d'une réunion en cours.
+    On te donne l'état actuel et la transcription du segment suivant.
+    Rends l'état complet mis à jour, sans rien perdre de ce qui est encore valable.
+    """,
+    response_mime_type="application/json",
+    response_schema=genai.types.Schema(
+        type=genai.types.Type.OBJECT,
+        required=["summary", "decisions", "action_items"],
+        properties={
+            "summary": genai.types.Schema(
+                type=genai.types.Type.STRING,
+                description="Résumé de la réunion jusqu'ici",
+            ),
+            "decisions": genai.types.Schema(
+                type=genai.types.Type.ARRAY,
+                items=genai.types.Schema(type=genai.types.Type.STRING),
+            ),
+            "action_items": genai.types.Schema(
+                type=genai.types.Type.ARRAY,
+                items=genai.types.Schema(
+                    type=genai.types.Type.OBJECT,
+                    required=["owner", "task"],
+                    properties={
+                        "owner": genai.types.Schema(type=genai.types.Type.STRING),
+                        "task": genai.types.Schema(type=genai.types.Type.STRING),
+                    },
+                ),
+            ),
+            "open_questions": genai.types.Schema(
+                type=genai.types.Type.ARRAY,
+                items=genai.types.Schema(type=genai.types.Type.STRING),
+            ),
+        },
+    ),
+)
+
+BRIEFING_PROMPT = """
+Fait un compte rendu detaillé en pur HTML du transcript partagé.
+Ton output doit etre directement le html car ce sera inseré directement dans un mail
+Sections :
+- Contenu de la reunion
+- Prochaines étapes:
+  - Responsable action: Tache
+- Autres actions
+
+"""
+
+BRIEFING_VERSION = cache_namespace(
+    MODEL_ID,
+    BRIEFING_PROMPT,
+    generate_content_config_briefing.model_dump_json(exclude_none=True),
+)
+
 
 def persist_transcription(task_id, transcription, idx):
     task_dir = os.path.join(OUTPUT_DIR, task_id, "transcriptions")
@@ -62,65 +124,174 @@ def persist_transcription(task_id, transcription, idx):
     with open(transcription_file, "w") as f:
         f.write(json.dumps(transcription))
         logger.info(f"✅ Transcription saved to {transcription_file}")
-    upload_transcriptions_to_gcs(task_id, transcription_file)
+    upload_transcriptions_to_gcs(
+        task_id, transcription_file, metadata={"transcript_version": CACHE_NAMESPACE}
+    )
 
 
-def gemini_transcription(file_name, task_id, idx):
+TRANSCRIPTION_PROMPT = (
+    "Extract a complete transcript labeling the different speakers. "
+    "Give the start time of each turn in seconds from the beginning of the audio."
+)
+
+
+# Transcripts cached under another model, prompt or schema are not reused.
+# Also stamped on uploaded transcripts as their version.
+CACHE_NAMESPACE = cache_namespace(
+    MODEL_ID,
+    TRANSCRIPTION_PROMPT,
+    generate_content_config.response_schema.model_dump_json(exclude_none=True),
+)
+
+
+def remap_turn_times(transcript: str, offset_map) -> str:
+    """
+    Moves turn start times from a VAD-trimmed file back onto the original
+    segment timeline.
+    """
+    try:
+        data = json.loads(transcript)
+    except (TypeError, ValueError):
+        return transcript
+
+    for turn in data.get("conversation", []):
+        if isinstance(turn.get("start"), (int, float)):
+            turn["start"] = round(offset_map.to_original(turn["start"]), 2)
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _generate(client, label, budget=None, **kwargs):
+    return get_scheduler().call(
+        lambda: client.models.generate_content(**kwargs), budget, label
+    )
+
+
+def gemini_transcription(file_name, task_id, idx, offset_map=None, use_cache=True):
     """
     Transcribes an audio file using Gemini.
+    ``offset_map`` (libot.vad.OffsetMap) is applied when the file had its
+    silences trimmed. With ``use_cache`` False the model is always called
+    and its transcript replaces the cached one.
     """
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        logger.error("GEMINI_API_KEY not set. Skipping Gemini upload.")
+    cache = get_cache(CACHE_NAMESPACE) if TRANSCRIPTION_CACHE else None
+    key = file_key(file_name) if cache else None
+    response_json = cache.get(key) if cache and use_cache else None
+    if response_json is not None:
+        logger.info(f"[{task_id}] 🗃️ Seg {idx} transcript from cache ({key[:12]})")
+    else:
+        response_json = _transcribe(file_name, task_id, idx)
+        if response_json is None:
+            return
+        if cache and _is_transcript(response_json):
+            cache.put(key, response_json)
+
+    if offset_map is not None:
+        response_json = remap_turn_times(response_json, offset_map)
+    persist_transcription(task_id, response_json, idx)
+    get_store(task_id).add(idx, response_json)
+
+    return response_json
+
+
+def _is_transcript(text) -> bool:
+    try:
+        return isinstance(json.loads(text).get("conversation"), list)
+    except (TypeError, ValueError, AttributeError):
+        return False
+
+
+def _transcribe(file_name, task_id, idx):
+    client = get_gemini_client()
+    if client is None:
         return
 
-    client = genai.Client(api_key=api_key)
-    sample_file = client.files.upload(
-        file=file_name,
+    # One retry budget covers both requests of the segment
+    budget = RetryBudget()
+    sample_file = get_scheduler().call(
+        lambda: client.files.upload(file=file_name),
+        budget,
+        f"[{task_id}] Seg {idx} upload",
     )
 
-    response = client.models.generate_content(
+    response = _generate(
+        client,
+        f"[{task_id}] Seg {idx} transcription",
+        budget,
         model=MODEL_ID,
         contents=[
             sample_file,
-            "Extract a complete transcript labeling the different speakers.",
+            TRANSCRIPTION_PROMPT,
         ],
         config=generate_content_config,
     )
-
-    response_json = response.text
-    persist_transcription(task_id, response_json, idx)
-
     return response.text
 
 
 
 def make_briefing(task_id: str, transcript: str):
     logger.info(f'Using gemini for get a briefing from {task_id}')
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        logger.error("GEMINI_API_KEY not set. Skipping Gemini upload.")
+    client = get_gemini_client()
+    if client is None:
         return
-
-    client = genai.Client(api_key=api_key)
   
   
-    response = client.models.generate_content(
+    response = _generate(
+        client,
+        f"[{task_id}] briefing",
         model=MODEL_ID,
         contents=[
             types.Part.from_text(text=transcript),
-            types.Part.from_text(text="""
-Fait un compte rendu detaillé en pur HTML du transcript partagé.
-Ton output doit etre directement le html car ce sera inseré directement dans un mail
-Sections :
-- Contenu de la reunion
-- Prochaines étapes:
-  - Responsable action: Tache
-- Autres actions
-
-""")
+            types.Part.from_text(text=BRIEFING_PROMPT)
         ],
         config=generate_content_config_briefing,
     )
     
-    return response.text
\ No newline at end of file
+    return response.text
+
+
+def update_meeting_state(task_id: str, state: dict, segment_transcript: str) -> dict:
+    """
+    Folds one segment transcript into the rolling meeting state.
+    """
+    client = get_gemini_client()
+    if client is None:
+        raise RuntimeError("Gemini client unavailable")
+
+    response = _generate(
+        client,
+        f"[{task_id}] rolling briefing",
+        model=MODEL_ID,
+        contents=[
+            types.Part.from_text(
+                text="État actuel :\n" + json.dumps(state, ensure_ascii=False)
+            ),
+            types.Part.from_text(text="Segment suivant :\n" + segment_transcript),
+        ],
+        config=generate_content_config_state,
+    )
+    return json.loads(response.text)
+
+
+def render_briefing(task_id: str, state: dict):
+    """
+    Renders the briefing (subject and htmlBody) from the rolling meeting
+    state instead of the whole transcript.
+    """
+    logger.info(f"[{task_id}] Rendering briefing from the rolling meeting state")
+    client = get_gemini_client()
+    if client is None:
+        return
+
+    response = _generate(
+        client,
+        f"[{task_id}] briefing",
+        model=MODEL_ID,
+        contents=[
+            types.Part.from_text(
+                text="État de la réunion :\n" + json.dumps(state, ensure_ascii=False)
+            ),
+            types.Part.from_text(text=BRIEFING_PROMPT),
+        ],
+        config=generate_content_config_briefing,
+    )
+    return response.text
@@ -130,3 +130,196 @@ CHECK_TEXT_PRESENCE_JS = """
 
     return searchInDocument(document);
 """
+
+MEETING_MONITOR_JS = """
+    var exitPhrases = arguments[0] || [];
+    var controlTerms = arguments[1] || [];
+    var THROTTLE_MS = 500;
+
+    var mon = window.__scribeMonitor;
+    if (!mon) {
+        mon = window.__scribeMonitor = {
+            state: { exitPhrase: null, controlsVisible: false, updatedAt: 0, checks: 0 },
+            dirty: true,
+            timer: null,
+            observed: []
+        };
+
+        var lowerPhrases = exitPhrases.map(function(p) { return (p || "").toLowerCase(); });
+        var lowerTerms = controlTerms.map(function(t) { return (t || "").toLowerCase(); });
+
+        function isVisible(elem) {
+            return !!( elem.offsetWidth || elem.offsetHeight || elem.getClientRects().length );
+        }
+
+        function eachDocument(fn) {
+            var stack = [document];
+            while (stack.length) {
+                var doc = stack.pop();
+                if (!doc || !doc.body) continue;
+                if (fn(doc)) return true;
+                var iframes = doc.querySelectorAll('iframe');
+                for (var i = 0; i < iframes.length; i++) {
+                    try {
+                        stack.push(iframes[i].contentDocument || iframes[i].contentWindow.document);
+                    } catch(e) {}
+                }
+            }
+            return false;
+        }
+
+        function findExitPhrase() {
+            var found = null;
+            eachDocument(function(doc) {
+                var text = (doc.body.innerText || "").toLowerCase();
+                for (var i = 0; i < lowerPhrases.length; i++) {
+                    if (text.indexOf(lowerPhrases[i]) !== -1) {
+                        found = exitPhrases[i];
+                        return true;
+                    }
+                }
+                return false;
+            });
+            return found;
+        }
+
+        function controlsVisible() {
+            return eachDocument(function(doc) {
+                var hangup = doc.querySelector("#hangup-button, [data-tid='call-hangup']");
+                if (hangup && isVisible(hangup)) return true;
+                var buttons = doc.querySelectorAll('button');
+                for (var i = 0; i < buttons.length; i++) {
+                    var el = buttons[i];
+                    var aria = (el.getAttribute('aria-label') || "").toLowerCase();
+                    var text = (el.textContent || "").toLowerCase();
+                    for (var j = 0; j < lowerTerms.length; j++) {
+                        if ((aria.indexOf(lowerTerms[j]) !== -1 || text.indexOf(lowerTerms[j]) !== -1)
+                                && isVisible(el)) {
+                            return true;
+                        }
+                    }
+                }
+                return false;
+            });
+        }
+
+        function observe() {
+            eachDocument(function(doc) {
+                if (mon.observed.indexOf(doc) !== -1) return false;
+                mon.observed.push(doc);
+                new MutationObserver(schedule).observe(doc.body, {
+                    childList: true, subtree: true, characterData: true, attributes: true,
+                    attributeFilter: ['aria-label', 'hidden', 'style', 'class']
+                });
+                return false;
+            });
+        }
+
+        function recompute() {
+            mon.timer = null;
+            mon.dirty = false;
+            observe();
+            mon.state = {
+                exitPhrase: findExitPhrase(),
+                controlsVisible: controlsVisible(),
+                updatedAt: Date.now(),
+                checks: mon.state.checks + 1
+            };
+        }
+
+        function schedule() {
+            mon.dirty = true;
+            if (mon.timer === null) mon.timer = setTimeout(recompute, THROTTLE_MS);
+        }
+
+        mon.recompute = recompute;
+        recompute();
+    } else if (mon.dirty && Date.now() - mon.state.updatedAt > 4 * THROTTLE_MS) {
+        // Timers are throttled in background tabs: catch up on read
+        mon.recompute();
+    }
+    return mon.state;
+"""
+
+PREJOIN_PROBE_JS = """
+    var groups = arguments[0] || {};
+    var nameTerms = (arguments[1] || []).map(function(t) { return (t || "").toLowerCase(); });
+    var meetingTerms = (arguments[2] || []).map(function(t) { return (t || "").toLowerCase(); });
+
+    function isVisible(elem) {
+        return !!( elem.offsetWidth || elem.offsetHeight || elem.getClientRects().length );
+    }
+
+    function matches(el, lowerOptions) {
+        var text = (el.innerText || el.textContent || "").toLowerCase().trim();
+        var aria = (el.getAttribute('aria-label') || "").toLowerCase();
+        for (var j = 0; j < lowerOptions.length; j++) {
+            if (text.includes(lowerOptions[j]) || aria.includes(lowerOptions[j])) return true;
+        }
+        return false;
+    }
+
+    var docs = [];
+    (function collect(doc) {
+        if (!doc) return;
+        docs.push(doc);
+        var iframes = doc.querySelectorAll('iframe');
+        for (var i = 0; i < iframes.length; i++) {
+            try {
+                collect(iframes[i].contentDocument || iframes[i].contentWindow.document);
+            } catch(e) {}
+        }
+    })(document);
+
+    function findTag(tags, options) {
+        var lower = options.map(function(o) { return (o || "").toLowerCase(); });
+        for (var t = 0; t < tags.length; t++) {
+            for (var d = 0; d < docs.length; d++) {
+                var elements = docs[d].querySelectorAll(tags[t]);
+                for (var i = 0; i < elements.length; i++) {
+                    if (isVisible(elements[i]) && matches(elements[i], lower)) return tags[t];
+                }
+            }
+        }
+        return null;
+    }
+
+    var buttons = {};
+    for (var name in groups) {
+        buttons[name] = findTag(groups[name].tags, groups[name].texts);
+    }
+
+    var nameField = false;
+    for (var d = 0; d < docs.length && !nameField; d++) {
+        var inputs = docs[d].querySelectorAll('input');
+        for (var i = 0; i < inputs.length; i++) {
+            var el = inputs[i];
+            var hay = [(el.placeholder || ""), (el.getAttribute('aria-label') || ""),
+                       (el.getAttribute('name') || "")].join(" ").toLowerCase();
+            if (nameTerms.some(function(term) { return hay.indexOf(term) !== -1; })) {
+                nameField = true;
+                break;
+            }
+        }
+    }
+
+    var callControls = false;
+    for (var d = 0; d < docs.length && !callControls; d++) {
+        if (docs[d].querySelector("#hangup-button, [data-tid='call-hangup'], [data-tid='call-controls-panel']")) {
+            callControls = true;
+        }
+    }
+    var inMeeting = callControls;
+    if (!inMeeting && meetingTerms.length) {
+        inMeeting = findTag(['button'], meetingTerms) !== null;
+    }
+
+    return {
+        url: window.location.href,
+        loginWall: window.location.href.indexOf("login.microsoft") !== -1,
+        buttons: buttons,
+        nameField: nameField,
+        callControls: callControls,
+        inMeeting: inMeeting
+    };
+"""
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from libot.logger import logger
+from libot.config import MANIFEST_MIRROR_SECONDS
+from libot.gcs import download_from_gcs, upload_recordings_to_gcs
+
+MANIFEST_NAME = "manifest.jsonl"
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class TaskManifest:
+    """
+    Append-only record of what happened to each segment of a task.
+
+    Every entry is one JSON line (``stage``, optional ``seg`` and details
+    such as checksums) flushed and fsync'd before ``record`` returns, so a
+    crash loses at most the entry being written. The file is mirrored to
+    the task's GCS folder every ``mirror_interval`` seconds and on close.
+    """
+
+    def __init__(self, task_id: str, task_dir: str, mirror_interval: float = MANIFEST_MIRROR_SECONDS):
+        self.task_id = task_id
+        self.path = os.path.join(task_dir, MANIFEST_NAME)
+        self.mirror_interval = mirror_interval
+        os.makedirs(task_dir, exist_ok=True)
+        self._f = open(self.path, "a", encoding="utf-8")
+        if self._f.tell() and not _ends_with_newline(self.path):
+            # Close a line torn by a crash so the next entry stays readable
+            self._f.write("\n")
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._closed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._mirror_loop, name=f"manifest-{task_id}", daemon=True
+        )
+        self._thread.start()
+
+    def record(self, stage: str, seg: int | None = None, **details):
+        entry = {"ts": round(time.time(), 3), "stage": stage}
+        if seg is not None:
+            entry["seg"] = seg
+        entry.update(details)
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._f.closed:
+                return
+            self._f.write(line)
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._dirty = True
+
+    def mirror(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+        if not upload_recordings_to_gcs(self.task_id, self.path, MANIFEST_NAME):
+            logger.warning(f"[{self.task_id}] ⚠️ Manifest mirror failed, retrying on the next pass")
+            with self._lock:
+                self._dirty = True
+
+    def _mirror_loop(self):
+        while not self._closed.wait(self.mirror_interval):
+            self.mirror()
+
+    def close(self):
+        self._closed.set()
+        self._thread.join(timeout=5)
+        self.mirror()
+        with self._lock:
+            self._f.close()
+
+
+@dataclass
+class SegmentState:
+    index: int
+    stages: dict = field(default_factory=dict)
+
+    def has(self, stage: str) -> bool:
+        return stage in self.stages
+
+    def get(self, stage: str, key: str, default=None):
+        return self.stages.get(stage, {}).get(key, default)
+
+
+@dataclass
+class ManifestState:
+    segments: dict = field(default_factory=dict)
+    events: dict = field(default_factory=dict)
+
+    def segment(self, index: int) -> SegmentState:
+        if index not in self.segments:
+            self.segments[index] = SegmentState(index)
+        return self.segments[index]
+
+
+def replay(lines: Iterable[str]) -> ManifestState:
+    """
+    Latest entry of every stage per segment. A torn last line (crash while
+    writing) is ignored.
+    """
+    state = ManifestState()
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(entry, dict) or "stage" not in entry:
+            continue
+        if entry.get("seg") is None:
+            state.events[entry["stage"]] = entry
+        else:
+            state.segment(int(entry["seg"])).stages[entry["stage"]] = entry
+    return state
+
+
+def load_manifest(task_id: str, task_dir: str) -> ManifestState | None:
+    """
+    Reads the task's manifest, fetching the GCS mirror when the local file
+    is gone (e.g. the job restarted on another instance).
+    """
+    path = os.path.join(task_dir, MANIFEST_NAME)
+    if not os.path.exists(path) and not download_from_gcs(task_id, MANIFEST_NAME, path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return replay(f)
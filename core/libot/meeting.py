@@ -1,49 +1,108 @@
 # meeting.py
 
 import time
-from selenium.webdriver.common.by import By
 
 from libot.logger import logger
 from libot.browser import safe_click, take_screenshot
-from libot.js_scripts import FILL_INPUT_JS, FIND_AND_CLICK_JS
+from libot.js_scripts import FILL_INPUT_JS, PREJOIN_PROBE_JS
+
+
+BUTTON_TAGS = ["button", "div[role='button']", "span[role='button']", "a"]
+
+IN_MEETING_INDICATORS = [
+    "Raise",
+    "Levantar",
+    "Chat",
+    "Conversación",
+    "React",
+    "Reaccionar",
+    "Leave",
+    "Salir",
+    "People",
+    "Personas",
+]
+CONTINUE_ON_BROWSER = ["Continue on this browser", "Continuar en este explorador"]
+JOIN_BUTTONS = [
+    "Join now",
+    "Unirse ahora",
+    "Rejoindre maintenant",
+    "Jetzt teilnehmen",
+]
+NO_AUDIO_BTNS = [
+    "Continue without audio or video",
+    "Continue without audio",
+    "No usar audio",
+    "Continuar sin audio",
+]
+COMPUTER_AUDIO = [
+    "Computer audio",
+    "Audio del equipo",
+    "Audio de l'ordinateur",
+]
+NAME_FIELDS = [
+    "name",
+    "nombre",
+    "nom",
+    "Name",
+    "type your name",
+    "escriba su nombre",
+]
+DISMISS_BTNS = ["Dismiss", "Got it", "Close", "Cerrar"]
+
+# Button groups the probe looks for, with the tags to try in order
+PROBE_GROUPS = {
+    "continue_browser": {"texts": CONTINUE_ON_BROWSER, "tags": BUTTON_TAGS},
+    "no_audio": {"texts": NO_AUDIO_BTNS, "tags": BUTTON_TAGS},
+    "dismiss": {"texts": DISMISS_BTNS, "tags": BUTTON_TAGS},
+    "computer_audio": {
+        "texts": COMPUTER_AUDIO,
+        "tags": ["div", "span", "button", "label"],
+    },
+    "join": {"texts": JOIN_BUTTONS, "tags": BUTTON_TAGS},
+}
+
+
+def probe_prejoin(driver) -> dict | None:
+    """
+    Whole pre-join page state in a single WebDriver call:
+    login wall, visible button groups (with the tag that matched),
+    name field presence and whether we are already in the meeting
+    (``callControls`` for the hangup/call-controls selectors alone,
+    ``inMeeting`` also for the generic button labels).
+    """
+    try:
+        return driver.execute_script(
+            PREJOIN_PROBE_JS, PROBE_GROUPS, NAME_FIELDS, IN_MEETING_INDICATORS
+        )
+    except Exception as e:
+        logger.debug(f"Pre-join probe failed: {e}")
+        return None
 
 
 def _is_in_meeting(driver) -> bool:
     """
     Heurística para saber si ya estamos dentro de una reunión de Teams.
     """
-    in_meeting_indicators = [
-        "Raise",
-        "Levantar",
-        "Chat",
-        "Conversación",
-        "React",
-        "Reaccionar",
-        "Leave",
-        "Salir",
-        "People",
-        "Personas",
-    ]
-    # 1) Buscar por texto en los botones (sin hacer click)
-    for text in in_meeting_indicators:
-        try:
-            res = driver.execute_script(FIND_AND_CLICK_JS, [text], "button", False)
-            if res == "found":
-                return True
-        except Exception:
-            pass
+    probe = probe_prejoin(driver)
+    return bool(probe and probe.get("inMeeting"))
 
-    # 2) IDs / data-tid típicos de controles de llamada
-    try:
-        if driver.find_elements(By.ID, "hangup-button"):
-            return True
-        if driver.find_elements(By.CSS_SELECTOR, "[data-tid='call-hangup']"):
-            return True
-        if driver.find_elements(By.CSS_SELECTOR, "[data-tid='call-controls-panel']"):
-            return True
-    except Exception:
-        pass
 
+def _click_probed(driver, probe, group, task_id) -> bool:
+    """
+    Clicks a group the probe saw, using only the tag that matched.
+    """
+    tag = (probe.get("buttons") or {}).get(group)
+    if not tag:
+        return False
+    return safe_click(driver, tag, PROBE_GROUPS[group]["texts"], task_id)
+
+
+def _wait_in_meeting(driver, timeout: float, interval: float = 0.5) -> bool:
+    end = time.time() + timeout
+    while time.time() < end:
+        if _is_in_meeting(driver):
+            return True
+        time.sleep(interval)
     return False
 
 
@@ -52,76 +111,51 @@ def join_meeting(driver, task_id, max_wait: int = 120) -> bool:
     logger.info(f"[{task_id}] 🚀 Intentando unirse a la reunión...")
     take_screenshot(driver, task_id, f"{int(time.time())}_pre_join")
 
-    JOIN_BUTTONS = [
-        "Join now",
-        "Unirse ahora",
-        "Rejoindre maintenant",
-        "Jetzt teilnehmen",
-    ]
-    NO_AUDIO_BTNS = [
-        "Continue without audio or video",
-        "Continue without audio",
-        "No usar audio",
-        "Continuar sin audio",
-    ]
-    COMPUTER_AUDIO = [
-        "Computer audio",
-        "Audio del equipo",
-        "Audio de l'ordinateur",
-    ]
-    NAME_FIELDS = [
-        "name",
-        "nombre",
-        "nom",
-        "Name",
-        "type your name",
-        "escriba su nombre",
-    ]
-    DISMISS_BTNS = ["Dismiss", "Got it", "Close", "Cerrar"]
-
     deadline = time.time() + max_wait
     name_filled = False
     audio_selected = False
     join_clicked = False
 
     while time.time() < deadline:
-        url = ""
-        try:
-            url = driver.current_url
-        except Exception:
-            logger.error(f"[{task_id}] ⛔ Error al obtener URL.")
-            pass
+        probe = probe_prejoin(driver)
+        if probe is None:
+            logger.error(f"[{task_id}] ⛔ Error al leer el estado del pre-join.")
+            time.sleep(1)
+            continue
 
         take_screenshot(driver, task_id, f"{int(time.time())}_loop")
 
         # 1. Login wall
-        if "login.microsoft" in (url or ""):
+        if probe.get("loginWall"):
             logger.error(f"[{task_id}] ⛔ Login wall detectado (requiere cuenta).")
             take_screenshot(driver, task_id, f"{int(time.time())}_login_wall")
             return False
 
-        # 2. "Continue on this browser"
-        if safe_click(
-            driver,
-            "button",
-            ["Continue on this browser", "Continuar en este explorador"],
-            task_id,
-        ):
+        # 2. Ya dentro de la reunión. Before "Join now" only the call
+        # controls count: the pre-join screen has its own "Chat" or
+        # "People" buttons that match the generic labels
+        if probe.get("inMeeting" if join_clicked else "callControls"):
+            logger.info(f"[{task_id}] ✅ Reunión unida correctamente.")
+            take_screenshot(driver, task_id, f"{int(time.time())}_joined_success")
+            return True
+
+        # 3. "Continue on this browser"
+        if _click_probed(driver, probe, "continue_browser", task_id):
             logger.info(f"[{task_id}] Click en 'Continue on this browser'.")
             take_screenshot(driver, task_id, f"{int(time.time())}_continue_on_browser")
-            time.sleep(3)
+            time.sleep(1)
             continue
 
-        # 3. Popups iniciales (no audio / no vídeo)
-        safe_click(driver, "button", NO_AUDIO_BTNS, task_id)
-        take_screenshot(driver, task_id, f"{int(time.time())}_no_audio")
+        # 4. Popups iniciales (no audio / no vídeo)
+        if _click_probed(driver, probe, "no_audio", task_id):
+            take_screenshot(driver, task_id, f"{int(time.time())}_no_audio")
 
-        # 4. Tooltips genéricos que estorban
-        safe_click(driver, "button", DISMISS_BTNS, task_id)
-        take_screenshot(driver, task_id, f"{int(time.time())}_dismiss")
+        # 5. Tooltips genéricos que estorban
+        if _click_probed(driver, probe, "dismiss", task_id):
+            take_screenshot(driver, task_id, f"{int(time.time())}_dismiss")
 
-        # 5. Rellenar nombre (una sola vez)
-        if not name_filled:
+        # 6. Rellenar nombre (una sola vez)
+        if not name_filled and probe.get("nameField"):
             try:
                 filled = driver.execute_script(FILL_INPUT_JS, bot_name, NAME_FIELDS)
                 if filled:
@@ -131,60 +165,26 @@ def join_meeting(driver, task_id, max_wait: int = 120) -> bool:
             except Exception:
                 pass
 
-        # 6. Seleccionar audio de equipo (una sola vez)
-        if not audio_selected:
-            # Intento via botones
-            clicked_audio = (
-                safe_click(driver, "div", COMPUTER_AUDIO, task_id)
-                or safe_click(driver, "span", COMPUTER_AUDIO, task_id)
-                or safe_click(driver, "button", COMPUTER_AUDIO, task_id)
-            )
-            if clicked_audio:
-                logger.info(f"[{task_id}] Fuente 'Computer audio' seleccionada.")
-                audio_selected = True
-                time.sleep(0.5)
-                take_screenshot(driver, task_id, f"{int(time.time())}_audio_selected")
-            else:
-                # Fallback JS
-                try:
-                    driver.execute_script(
-                        """
-                        var labels = document.querySelectorAll(
-                            'label, div[role="radio"], div[role="checkbox"]'
-                        );
-                        for (var i=0; i<labels.length; i++) {
-                            var txt = (labels[i].innerText || '').toLowerCase();
-                            if (txt.includes('computer audio') ||
-                                txt.includes('audio del equipo') ||
-                                txt.includes('audio de l\\'ordinateur')) {
-                                labels[i].click();
-                                break;
-                            }
-                        }
-                    """
-                    )
-                except Exception:
-                    pass
-
-        # 7. Click en "Join now" (una sola vez)
-        if not join_clicked:
-            if safe_click(driver, "button", JOIN_BUTTONS, task_id):
-                join_clicked = True
-                logger.info(f"[{task_id}] 🤞 Click en 'Join now'.")
-                take_screenshot(driver, task_id, f"{int(time.time())}_clicked_join")
-                # Tiempo para que cargue la reunión
-                time.sleep(5)
-
-        # 8. Verificar si ya estamos dentro de la reunión
-        try:
-            if _is_in_meeting(driver):
+        # 7. Seleccionar audio de equipo (una sola vez)
+        if not audio_selected and _click_probed(
+            driver, probe, "computer_audio", task_id
+        ):
+            logger.info(f"[{task_id}] Fuente 'Computer audio' seleccionada.")
+            audio_selected = True
+            take_screenshot(driver, task_id, f"{int(time.time())}_audio_selected")
+
+        # 8. Click en "Join now" (una sola vez)
+        if not join_clicked and _click_probed(driver, probe, "join", task_id):
+            join_clicked = True
+            logger.info(f"[{task_id}] 🤞 Click en 'Join now'.")
+            take_screenshot(driver, task_id, f"{int(time.time())}_clicked_join")
+            # Esperar a que cargue la reunión, sin un sleep fijo
+            if _wait_in_meeting(driver, timeout=min(10, max(0, deadline - time.time()))):
                 logger.info(f"[{task_id}] ✅ Reunión unida correctamente.")
                 take_screenshot(driver, task_id, f"{int(time.time())}_joined_success")
                 return True
-        except Exception:
-            pass
 
-        time.sleep(2)
+        time.sleep(1)
 
     logger.error(f"[{task_id}] ❌ Timeout intentando unirse (>{max_wait}s).")
     take_screenshot(driver, task_id, f"{int(time.time())}_fail_timeout")
@@ -0,0 +1,104 @@
+import time
+
+from selenium.webdriver.common.by import By
+
+from libot.logger import logger
+from libot.js_scripts import (
+    CHECK_TEXT_PRESENCE_JS,
+    FIND_AND_CLICK_JS,
+    MEETING_MONITOR_JS,
+)
+
+EXIT_PHRASES = [
+    "you were removed",
+    "se le ha eliminado",
+    "meeting ended",
+    "finalizó la reunión",
+    "thank you for attending",
+]
+CONTROL_TERMS = ["Raise", "Levantar", "Chat", "Leave", "Salir"]
+
+
+class MeetingMonitor:
+    """
+    Reads meeting state from an in-page MutationObserver monitor.
+
+    The monitor is injected on the first read (and again after a
+    navigation wipes it) and keeps ``{exitPhrase, controlsVisible}`` up to
+    date inside the page, so each poll is a single cheap WebDriver call
+    instead of a DOM walk per phrase and per control. It also tracks how
+    long the call controls have been missing, on the monotonic clock.
+    """
+
+    def __init__(
+        self, driver, task_id, exit_phrases=EXIT_PHRASES, control_terms=CONTROL_TERMS
+    ):
+        self.driver = driver
+        self.task_id = task_id
+        self.exit_phrases = exit_phrases
+        self.control_terms = control_terms
+        self._failures = 0
+        self._controls_seen_at = time.monotonic()
+
+    def read(self) -> dict:
+        """
+        Returns ``{"exit_phrase": str | None, "controls_visible": bool}``.
+        Falls back to the legacy per-term probes if the monitor can't run.
+        """
+        state = self._monitor_read() or self._legacy_read()
+        if state["controls_visible"]:
+            self._controls_seen_at = time.monotonic()
+        return state
+
+    def controls_missing_for(self) -> float:
+        """
+        Seconds since a read last saw the call controls (or since the
+        monitor was created).
+        """
+        return time.monotonic() - self._controls_seen_at
+
+    def _monitor_read(self) -> dict | None:
+        try:
+            state = self.driver.execute_script(
+                MEETING_MONITOR_JS, self.exit_phrases, self.control_terms
+            )
+            if state:
+                self._failures = 0
+                return {
+                    "exit_phrase": state.get("exitPhrase"),
+                    "controls_visible": bool(state.get("controlsVisible")),
+                }
+        except Exception as e:
+            self._failures += 1
+            if self._failures == 1:
+                logger.warning(f"[{self.task_id}] Monitor no disponible: {e}")
+        return None
+
+    def _legacy_read(self) -> dict:
+        try:
+            found_phrase = self.driver.execute_script(
+                CHECK_TEXT_PRESENCE_JS, self.exit_phrases
+            )
+        except Exception:
+            found_phrase = None
+
+        controls_visible = False
+        for text in self.control_terms:
+            try:
+                if (
+                    self.driver.execute_script(FIND_AND_CLICK_JS, [text], "button", False)
+                    == "found"
+                ):
+                    controls_visible = True
+                    break
+            except Exception:
+                pass
+
+        if not controls_visible:
+            try:
+                if self.driver.find_elements(By.ID, "hangup-button"):
+                    controls_visible = True
+            except Exception:
+                pass
+
+        return {"exit_phrase": found_phrase, "controls_visible": controls_visible}
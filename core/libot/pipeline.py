@@ -0,0 +1,464 @@
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+from libot.logger import logger
+from libot.config import (
+    GCS_BUCKET,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_COMPRESS_WORKERS,
+    PIPELINE_UPLOAD_WORKERS,
+    PIPELINE_TRANSCRIBE_WORKERS,
+    VAD_ENABLED,
+)
+from libot.compress import compress_audio, is_transcription_ready
+from libot.vad import gate_segment
+from libot.gcs import upload_recordings_to_gcs
+from libot.gemini import gemini_transcription
+from libot.transcripts import get_store
+from libot.transcription_cache import file_key
+
+_STOP = object()
+
+
+@dataclass
+class Segment:
+    """
+    A completed audio segment travelling through the pipeline.
+    """
+
+    task_id: str
+    index: int
+    source_path: str
+    task_dir: str
+    audio_path: str | None = None
+    start: float | None = None
+    end: float | None = None
+    offset_map: object | None = None
+    dropped: bool = False
+    submitted_at: float = field(default_factory=time.monotonic)
+    timings: dict = field(default_factory=dict)
+    pending: int = 0
+
+    @property
+    def base_name(self) -> str:
+        return os.path.splitext(os.path.basename(self.source_path))[0]
+
+    @property
+    def remote_name(self) -> str:
+        return os.path.basename(self.audio_path)
+
+
+def vad_segment(segment: Segment) -> str:
+    """
+    Voice-activity gate. Marks fully silent segments as dropped and, when
+    long silences were cut out, returns the trimmed WAV to compress instead
+    of the source (with ``segment.offset_map`` pointing back to it).
+    """
+    trimmed_path = os.path.join(segment.task_dir, segment.base_name + "_vad.wav")
+    try:
+        result = gate_segment(segment.source_path, trimmed_path)
+    except Exception as e:
+        logger.warning(
+            f"  [{segment.task_id}] 🎙️ [Seg {segment.index}] VAD failed, sending as is: {e}"
+        )
+        return segment.source_path
+
+    if result.silent:
+        logger.info(
+            f"  [{segment.task_id}] 🔇 [Seg {segment.index}] Silent segment "
+            f"({result.duration:.0f}s), dropping"
+        )
+        segment.dropped = True
+        return segment.source_path
+
+    if result.trimmed_path:
+        logger.info(
+            f"  [{segment.task_id}] ✂️ [Seg {segment.index}] Trimmed silence: "
+            f"{result.duration:.0f}s -> {result.speech_seconds:.0f}s"
+        )
+        segment.offset_map = result.offset_map
+        with open(
+            os.path.join(segment.task_dir, segment.base_name + ".offsets.json"), "w"
+        ) as f:
+            f.write(result.offset_map.to_json())
+        return result.trimmed_path
+    return segment.source_path
+
+
+def compress_segment(segment: Segment) -> str | None:
+    """
+    Gate and compress a raw segment into the transcription-ready MP3.
+    Segments captured directly in a compressed format are passed through
+    unless VAD trimmed them. Returns the compressed path, or None when the
+    segment failed or was dropped as silent.
+    """
+    source = vad_segment(segment) if VAD_ENABLED else segment.source_path
+    if segment.dropped:
+        return None
+
+    if is_transcription_ready(source):
+        logger.info(
+            f"  [{segment.task_id}] 🎙️ [Seg {segment.index}] Already compressed, skipping"
+        )
+        return source
+
+    mp3_path = os.path.join(segment.task_dir, segment.base_name + ".mp3")
+    if mp3_path == segment.source_path:
+        mp3_path = os.path.join(segment.task_dir, segment.base_name + "_vad.mp3")
+
+    logger.info(
+        f"  [{segment.task_id}] 🎙️ [Seg {segment.index}] Compressing {source}..."
+    )
+    compress_audio(source, mp3_path)
+    if not os.path.exists(mp3_path):
+        return None
+    return mp3_path
+
+
+def upload_segment(segment: Segment) -> bool:
+    logger.info(
+        f"  [{segment.task_id}] 🎙️ [Seg {segment.index}] Uploading {segment.remote_name}..."
+    )
+    return upload_recordings_to_gcs(segment.task_id, segment.audio_path, segment.remote_name)
+
+
+def transcribe_segment(segment: Segment) -> str | None:
+    logger.info(
+        f"  [{segment.task_id}] 🎙️ [Seg {segment.index}] Transcribing with Gemini..."
+    )
+    transcript = gemini_transcription(
+        segment.audio_path, segment.task_id, segment.index, segment.offset_map
+    )
+    logger.info(
+        f"  [{segment.task_id}] 🎙️ [Seg {segment.index}] Transcript result: {len(transcript or '')}"
+    )
+    return transcript
+
+
+def record_compressed(manifest, segment: Segment):
+    """
+    Manifest entry for a compressed segment, with what resuming needs to
+    verify the file and map trimmed times back.
+    """
+    details = {
+        "audio": os.path.basename(segment.audio_path),
+        "sha256": file_key(segment.audio_path),
+        "size": os.path.getsize(segment.audio_path),
+    }
+    if segment.offset_map is not None:
+        details["offsets"] = segment.offset_map.to_json()
+    manifest.record("compressed", segment.index, **details)
+
+
+class _Stage:
+    """
+    Fixed-size pool of worker threads draining a bounded queue.
+    A full queue blocks producers, which propagates backpressure upstream.
+    """
+
+    def __init__(self, name: str, workers: int, maxsize: int, handler):
+        self.name = name
+        self.handler = handler
+        self.queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_seconds = 0.0
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def put(self, item, timeout=None):
+        self.queue.put(item, timeout=timeout)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                start = time.monotonic()
+                ok = self.handler(item)
+                elapsed = time.monotonic() - start
+                with self._lock:
+                    self.processed += 1
+                    if not ok:
+                        self.failed += 1
+                    self.busy_seconds += elapsed
+                    self.max_seconds = max(self.max_seconds, elapsed)
+            finally:
+                self.queue.task_done()
+
+    def stop(self, deadline: float) -> bool:
+        """
+        Lets the workers finish what is queued and exit. Returns False if
+        any of them is still running at ``deadline``.
+        """
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for t in self._threads:
+            t.join(timeout=max(0.0, deadline - time.monotonic()))
+        return not any(t.is_alive() for t in self._threads)
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg = self.busy_seconds / self.processed if self.processed else 0.0
+            return {
+                "queued": self.queue.qsize(),
+                "processed": self.processed,
+                "failed": self.failed,
+                "avg_s": round(avg, 2),
+                "max_s": round(self.max_seconds, 2),
+            }
+
+
+class SegmentPipeline:
+    """
+    Bounded segment pipeline for a recording task.
+
+    compress -> (upload || transcribe)
+
+    Each stage owns a fixed worker pool and a bounded queue. Upload and
+    transcription only need the compressed file, so both are fed from the
+    compress stage and run concurrently.
+    """
+
+    def __init__(
+        self,
+        task_id: str,
+        task_dir: str,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        compress_workers: int = PIPELINE_COMPRESS_WORKERS,
+        upload_workers: int = PIPELINE_UPLOAD_WORKERS,
+        transcribe_workers: int = PIPELINE_TRANSCRIBE_WORKERS,
+        manifest=None,
+    ):
+        self.task_id = task_id
+        self.manifest = manifest
+        self.task_dir = task_dir
+        self._lock = threading.Lock()
+        self._submitted = set()
+        self._done = 0
+        self._closed = False
+        self._cancelled = threading.Event()
+        self.transcripts = get_store(task_id)
+
+        self.compress = _Stage("compress", compress_workers, queue_size, self._compress)
+        self.upload = _Stage("upload", upload_workers, queue_size, self._upload)
+        self.transcribe = _Stage(
+            "transcribe", transcribe_workers, queue_size, self._transcribe
+        )
+
+    # -- producer side -------------------------------------------------------
+
+    def submit(
+        self,
+        source_path: str,
+        index: int,
+        start: float | None = None,
+        end: float | None = None,
+        block_warn_s: float = 10.0,
+    ) -> bool:
+        """
+        Enqueue a completed segment. Blocks while the pipeline is saturated.
+        Returns False if this index was already submitted.
+        """
+        with self._lock:
+            if self._closed or index in self._submitted:
+                return False
+            self._submitted.add(index)
+
+        segment = Segment(
+            self.task_id, index, source_path, self.task_dir, start=start, end=end
+        )
+        self.transcripts.expect(index, start)
+        self._record(
+            "captured", index, source=os.path.basename(source_path), start=start, end=end
+        )
+        while True:
+            try:
+                self.compress.put(segment, timeout=block_warn_s)
+                break
+            except queue.Full:
+                logger.warning(
+                    f"[{self.task_id}] ⏳ Pipeline saturado, esperando para encolar Seg {index} "
+                    f"({self.depth()})"
+                )
+        logger.info(f"[{self.task_id}] 📥 Seg {index} encolado ({self.depth()})")
+        return True
+
+    def is_submitted(self, index: int) -> bool:
+        with self._lock:
+            return index in self._submitted
+
+    # -- stage handlers ------------------------------------------------------
+
+    def _compress(self, segment: Segment) -> bool:
+        if self._cancelled.is_set():
+            self._finish(segment)
+            return True
+        start = time.monotonic()
+        segment.timings["wait"] = start - segment.submitted_at
+        try:
+            segment.audio_path = compress_segment(segment)
+        except Exception as e:
+            logger.error(
+                f" [{self.task_id}] ❌ Error processing segment {segment.index}: {e}"
+            )
+            segment.audio_path = None
+        segment.timings["compress"] = time.monotonic() - start
+
+        if segment.dropped:
+            self._record("dropped", segment.index)
+            self._finish(segment)
+            return True
+
+        if not segment.audio_path:
+            logger.error(
+                f" [{self.task_id}] ❌ Failed to compress segment {segment.index}"
+            )
+            self._record("failed", segment.index, step="compress")
+            self._finish(segment)
+            return False
+
+        if self.manifest:
+            try:
+                record_compressed(self.manifest, segment)
+            except OSError as e:
+                logger.warning(f"[{self.task_id}] Manifest entry for Seg {segment.index} failed: {e}")
+
+        segment.pending = 2
+        self.upload.put(segment)
+        self.transcribe.put(segment)
+        return True
+
+    def _upload(self, segment: Segment) -> bool:
+        if self._cancelled.is_set():
+            self._settle(segment)
+            return True
+        if not GCS_BUCKET:
+            # Local runs have nowhere to upload to: not a failure
+            self._record("skipped", segment.index, step="upload")
+            self._settle(segment)
+            return True
+        return self._run_branch(segment, "upload", upload_segment)
+
+    def _transcribe(self, segment: Segment) -> bool:
+        if self._cancelled.is_set():
+            self._settle(segment)
+            return True
+        return self._run_branch(segment, "transcribe", transcribe_segment)
+
+    def _run_branch(self, segment: Segment, name: str, fn) -> bool:
+        start = time.monotonic()
+        ok = True
+        try:
+            result = fn(segment)
+        except Exception as e:
+            ok = False
+            result = None
+            logger.error(
+                f" [{self.task_id}] ❌ Error in {name} for segment {segment.index}: {e}"
+            )
+        segment.timings[name] = time.monotonic() - start
+
+        ok = ok and bool(result)
+        if name == "upload" and result:
+            self._record("uploaded", segment.index, remote=segment.remote_name)
+        elif name == "transcribe" and result:
+            self._record("transcribed", segment.index, chars=len(result))
+        else:
+            self._record("failed", segment.index, step=name)
+
+        self._settle(segment)
+        return ok
+
+    def _settle(self, segment: Segment):
+        # The segment is finished once both branches are done with it
+        with self._lock:
+            segment.pending -= 1
+            last = segment.pending == 0
+        if last:
+            self._finish(segment)
+
+    def _finish(self, segment: Segment):
+        # Whether or not it produced a transcript, this segment is settled
+        self.transcripts.resolve(segment.index)
+        with self._lock:
+            self._done += 1
+        timings = " ".join(f"{k}={v:.1f}s" for k, v in segment.timings.items())
+        total = time.monotonic() - segment.submitted_at
+        logger.info(
+            f"[{self.task_id}] ✅ Seg {segment.index} terminado en {total:.1f}s ({timings})"
+        )
+
+    def _record(self, stage: str, index: int, **details):
+        if self.manifest:
+            self.manifest.record(stage, index, **details)
+
+    # -- observability -------------------------------------------------------
+
+    def depth(self) -> str:
+        return (
+            f"compress={self.compress.queue.qsize()} "
+            f"upload={self.upload.queue.qsize()} "
+            f"transcribe={self.transcribe.queue.qsize()}"
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            submitted, done = len(self._submitted), self._done
+        return {
+            "submitted": submitted,
+            "done": done,
+            "compress": self.compress.stats(),
+            "upload": self.upload.stats(),
+            "transcribe": self.transcribe.stats(),
+        }
+
+    # -- shutdown ------------------------------------------------------------
+
+    def drain(self, timeout: float = 600.0) -> bool:
+        """
+        Stop accepting new segments and wait for in-flight work to finish.
+        Returns True when every stage has exited and everything submitted
+        has been processed.
+        """
+        with self._lock:
+            self._closed = True
+        deadline = time.monotonic() + timeout
+
+        # Upload and transcribe are only stopped once compress has exited:
+        # anything it emitted after their stop markers would never be read.
+        stopped = self.compress.stop(deadline)
+        if stopped:
+            uploaded = self.upload.stop(deadline)
+            transcribed = self.transcribe.stop(deadline)
+            stopped = uploaded and transcribed
+
+        stats = self.stats()
+        logger.info(f"[{self.task_id}] 📊 Pipeline stats: {stats}")
+        unfinished = stats["submitted"] - stats["done"]
+        if not stopped or unfinished:
+            logger.error(
+                f"[{self.task_id}] ❌ Pipeline drain timed out after {timeout:.0f}s: "
+                f"{unfinished} segments lost ({self.depth()})"
+            )
+        return stopped and unfinished == 0
+
+    def cancel(self, timeout: float = 30.0) -> bool:
+        """
+        Stop accepting segments and discard the ones not yet processed
+        (e.g. the join failed and they only hold lobby audio). Work already
+        running is left to finish.
+        """
+        self._cancelled.set()
+        logger.info(f"[{self.task_id}] 🗑️ Descartando segmentos pendientes ({self.depth()})")
+        return self.drain(timeout)
@@ -1,72 +1,95 @@
 import os
 import time
-import threading
 import subprocess
 import signal
-import shutil
 import glob
+from concurrent.futures import ThreadPoolExecutor
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
 
 from libot.logger import logger
-from libot.config import OUTPUT_DIR, DISPLAY_NUM, EXIT_ON_FINISH
-from libot.js_scripts import CHECK_TEXT_PRESENCE_JS, FIND_AND_CLICK_JS
-from libot.audio import get_monitor_source, force_audio_routing
+from libot.config import (
+    OUTPUT_DIR,
+    CAPTURE_FORMAT,
+    CAPTURE_BITRATE,
+    CAPTURE_ARCHIVE,
+    SEGMENT_MODE,
+    AUDIO_ROUTING_TIMEOUT,
+    ROLLING_BRIEFING,
+)
+from libot.audio import get_monitor_source, AudioRouter
 from libot.avatar import ensure_avatar_y4m
+from libot.bootstrap import StartupTimeline
+from libot.browser_pool import get_pool
+from libot.resources import allocate_resources, release_resources, shared_resources
 from libot.browser import take_screenshot, safe_click, build_driver, _wait_dom_ready
+from libot.diagnostics import release_ring
 from libot.meeting import join_meeting
+from libot.monitor import MeetingMonitor
+from libot.segments import SegmentWatcher, SEGMENT_LIST_NAME, segment_index
+from libot.segmenter import AdaptiveSegmenter
 from libot.gcs import upload_recordings_to_gcs
-from libot.gemini import gemini_transcription
-from libot.compress import compress_audio
+from libot.compress import (
+    TRANSCRIPTION_FORMATS,
+    TRANSCRIPTION_SAMPLE_RATE,
+    TRANSCRIPTION_CHANNELS,
+)
 from libot.briefing import handle_briefing
+from libot.transcripts import release_store
+from libot.rolling import RollingBriefing
+from libot.manifest import TaskManifest
+from libot.pipeline import SegmentPipeline
 
-EXIT_PHRASES = [
-    "you were removed",
-    "se le ha eliminado",
-    "meeting ended",
-    "finalizó la reunión",
-    "thank you for attending",
-]
+MONITOR_INTERVAL_SECONDS = 1.0
+CONTROLS_LOST_SECONDS = 20
 
 
-def process_audio_segment(task_id, wav_path, task_dir, segment_index):
-    """
-    Helper function to Compress -> Upload -> Transcribe a single completed segment.
-    Designed to run in a thread.
-    """
-    try:
-        base_name = os.path.splitext(os.path.basename(wav_path))[0]  # e.g., audio_000
-        mp3_path = os.path.join(task_dir, base_name + ".mp3")
-        remote_name = f"{base_name}.mp3"
+def capture_extension(
+    capture_format: str = CAPTURE_FORMAT, segment_mode: str = SEGMENT_MODE
+) -> str:
+    # The adaptive segmenter always writes WAV
+    if segment_mode != "adaptive" and capture_format in TRANSCRIPTION_FORMATS:
+        return TRANSCRIPTION_FORMATS[capture_format][1]
+    return "wav"
 
-        logger.info(f"  [{task_id}] 🎙️ [Seg {segment_index}] Compressing {wav_path}...")
-        compress_audio(wav_path, mp3_path)
 
-        if os.path.exists(mp3_path):
-            logger.info(
-                f"  [{task_id}] 🎙️ [Seg {segment_index}] Uploading {remote_name}..."
-            )
-            upload_recordings_to_gcs(task_id, mp3_path, remote_name)
-
-            logger.info(
-                f"  [{task_id}] 🎙️ [Seg {segment_index}] Transcribing with Gemini..."
-            )
-            transcript = gemini_transcription(mp3_path, task_id, segment_index)
-            logger.warning(
-                f"   [{task_id}] 🎙️ [Seg {segment_index}] Transcript result: {len(transcript)}"
-            )
-
-        else:
-            logger.error(f" [{task_id}] ❌ Failed to compress segment {segment_index}")
-
-    except Exception as e:
-        logger.error(f" [{task_id}] ❌ Error processing segment {segment_index}: {e}")
+def _segment_output_args(segment_seconds, pattern, segment_list=None):
+    args = [
+        "-f",
+        "segment",
+        "-segment_time",
+        str(segment_seconds),
+        "-reset_timestamps",
+        "1",
+    ]
+    if segment_list:
+        args += ["-segment_list", segment_list, "-segment_list_type", "csv"]
+    return args + [pattern]
+
+
+def ffmpg_audio_process(
+    audio_source,
+    audio_pattern,
+    ffmpeg_audio_log,
+    segment_seconds,
+    segment_list,
+    capture_format: str = CAPTURE_FORMAT,
+    archive_pattern: str | None = None,
+    adaptive: bool = False,
+):
+    """
+    Starts the segmented audio capture. Every closed segment is appended to
+    ``segment_list`` (csv: filename,start,end) for the SegmentWatcher.
 
+    With ``capture_format`` "mp3"/"opus" the segmenter writes 16 kHz mono
+    transcription-ready files directly. ``archive_pattern`` adds a second
+    lossless 48 kHz WAV output from the same input.
 
-def ffmpg_audio_process(audio_source, audio_pattern, ffmpeg_audio_log, segment_seconds):
+    With ``adaptive`` ffmpeg writes raw 48 kHz stereo PCM to stdout instead,
+    for libot.segmenter.AdaptiveSegmenter to cut at pauses.
+    """
     ffmpeg_env = os.environ.copy()
 
     cmd_audio = [
@@ -83,28 +106,148 @@ def ffmpg_audio_process(audio_source, audio_pattern, ffmpeg_audio_log, segment_s
         "1024",
         "-i",
         audio_source,
-        "-acodec",
-        "pcm_s16le",
-        "-ar",
-        "48000",
-        "-f",
-        "segment",
-        "-segment_time",
-        str(segment_seconds),
-        "-reset_timestamps",
-        "1",
-        audio_pattern,
     ]
+
+    if adaptive:
+        cmd_audio += [
+            "-map",
+            "0:a",
+            "-f",
+            "s16le",
+            "-acodec",
+            "pcm_s16le",
+            "-ar",
+            "48000",
+            "-ac",
+            "2",
+            "pipe:1",
+        ]
+    elif capture_format in TRANSCRIPTION_FORMATS:
+        codec, _, default_bitrate = TRANSCRIPTION_FORMATS[capture_format]
+        cmd_audio += [
+            "-map",
+            "0:a",
+            "-ac",
+            str(TRANSCRIPTION_CHANNELS),
+            "-ar",
+            str(TRANSCRIPTION_SAMPLE_RATE),
+            "-c:a",
+            codec,
+            "-b:a",
+            CAPTURE_BITRATE or default_bitrate,
+        ]
+    else:
+        cmd_audio += ["-map", "0:a", "-acodec", "pcm_s16le", "-ar", "48000"]
+    if not adaptive:
+        cmd_audio += _segment_output_args(
+            segment_seconds, audio_pattern, segment_list
+        )
+
+    if archive_pattern:
+        cmd_audio += ["-map", "0:a", "-acodec", "pcm_s16le", "-ar", "48000"]
+        cmd_audio += _segment_output_args(segment_seconds, archive_pattern)
+
     with open(ffmpeg_audio_log, "w") as f_log_a:
         ffmpeg_audio_process = subprocess.Popen(
-            cmd_audio, stdout=f_log_a, stderr=subprocess.STDOUT, env=ffmpeg_env
+            cmd_audio,
+            stdout=subprocess.PIPE if adaptive else f_log_a,
+            stderr=f_log_a if adaptive else subprocess.STDOUT,
+            env=ffmpeg_env,
         )
 
-    time.sleep(1)
-    if ffmpeg_audio_process.poll() is not None:
+    first_output = None if adaptive else audio_pattern % 0
+    _await_ffmpeg_startup(ffmpeg_audio_process, first_output)
+    return ffmpeg_audio_process
+
+
+def _await_ffmpeg_startup(proc, first_output=None, timeout=1.0, interval=0.05):
+    """
+    Returns as soon as ffmpeg has written its first output file, or after
+    ``timeout`` if it is still running. Raises if it exited during startup.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("ffmpeg audio failed startup")
+        if first_output and os.path.exists(first_output):
+            return
+        time.sleep(interval)
+    if proc.poll() is not None:
         raise RuntimeError("ffmpeg audio failed startup")
 
 
+class AudioCapture:
+    """
+    Audio side of a recording: sink routing, ffmpeg capture and segment
+    dispatch. ``start`` runs on a bootstrap thread so it overlaps with the
+    browser launch; the fields are filled in as each piece comes up, so
+    teardown can clean up whatever did start.
+    """
+
+    def __init__(
+        self,
+        task_id,
+        task_dir,
+        pipeline,
+        audio_pattern,
+        segment_list,
+        segment_seconds,
+        archive_pattern=None,
+        adaptive=False,
+        resources=None,
+        stream_props=None,
+    ):
+        self.task_id = task_id
+        self.task_dir = task_dir
+        self.pipeline = pipeline
+        self.audio_pattern = audio_pattern
+        self.segment_list = segment_list
+        self.segment_seconds = segment_seconds
+        self.archive_pattern = archive_pattern
+        self.adaptive = adaptive
+        self.resources = resources or shared_resources(task_id)
+        self.stream_props = stream_props
+        self.router = None
+        self.process = None
+        self.watcher = None
+        self.segmenter = None
+
+    def start(self, timeline, record_audio=True):
+        self.router = AudioRouter(
+            self.task_id, sink=self.resources.sink, match_props=self.stream_props
+        ).start()
+        if not record_audio:
+            return
+
+        if self.resources.isolated:
+            audio_source = self.resources.monitor
+        else:
+            with timeline.step("audio_source"):
+                audio_source = get_monitor_source()
+
+        self.watcher = SegmentWatcher(
+            self.task_id,
+            self.task_dir,
+            lambda path, idx, start, end: self.pipeline.submit(path, idx, start, end),
+            list_path=self.segment_list,
+        ).start()
+        with timeline.step("audio_capture"):
+            self.process = ffmpg_audio_process(
+                audio_source,
+                self.audio_pattern,
+                os.path.join(self.task_dir, "ffmpeg_audio.log"),
+                self.segment_seconds,
+                self.segment_list,
+                archive_pattern=self.archive_pattern,
+                adaptive=self.adaptive,
+            )
+        if self.adaptive:
+            self.segmenter = AdaptiveSegmenter(
+                self.task_id, self.task_dir, self.process.stdout, self.segment_list
+            ).start()
+        timeline.mark("capture_started")
+
+
 def record_task(
     meeting_url,
     max_duration,
@@ -112,41 +255,110 @@ def record_task(
     record_audio=True,
     record_video=True,
     segment_seconds: int = 300,
-):
+) -> bool:
+    """
+    Joins and records a meeting, then processes the audio and briefs it.
+    Returns True when the bot joined and recorded until the meeting (or
+    ``max_duration``) ended; False when it could not get resources, could
+    not join, or the recording hit a critical error.
+    """
     logger.info(f"[{task_id}] Starting recording process for \n{meeting_url}")
     task_dir = os.path.join(OUTPUT_DIR, task_id)
     os.makedirs(task_dir, exist_ok=True)
 
     output_video = os.path.join(task_dir, "recording.mp4")
-    audio_pattern = os.path.join(task_dir, "audio_%03d.wav")
+    audio_ext = capture_extension()
+    audio_pattern = os.path.join(task_dir, f"audio_%03d.{audio_ext}")
+    adaptive = SEGMENT_MODE == "adaptive"
+    archive_pattern = (
+        os.path.join(task_dir, "archive_%03d.wav")
+        if CAPTURE_ARCHIVE and audio_ext != "wav"
+        else None
+    )
+    segment_list = os.path.join(task_dir, SEGMENT_LIST_NAME)
 
     ffmpeg_video_log = os.path.join(task_dir, "ffmpeg_video.log")
-    ffmpeg_audio_log = os.path.join(task_dir, "ffmpeg_audio.log")
-
-    audio_source = get_monitor_source()
-    avatar_y4m = ensure_avatar_y4m()
 
+    timeline = StartupTimeline(task_id, task_dir)
+    try:
+        with timeline.step("resources"):
+            resources = allocate_resources(task_id)
+    except Exception as e:
+        logger.error(f"[{task_id}] Abortando: no hay recursos para la grabación: {e}")
+        return False
+
+    # Pooled browsers run on the container's display. Their audio is routed
+    # to the task's sink by stream tag, but x11grab only sees the task's own
+    # display, so an isolated task recording video launches Chrome there
+    pool = None if resources.isolated and record_video else get_pool()
+    warm_browser = None
+    manifest = pipeline = rolling = capture = None
     ffmpeg_video_process = None
-    ffmpeg_audio_process = None
-    stop_audio_enforcer = threading.Event()
     driver = None
-
-    next_audio_index_to_process = 0
-    processing_threads = []
+    joined = False
+    ok = False
+    bootstrap = ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix=f"bootstrap-{task_id}"
+    )
 
     try:
-        logger.info(f"[{task_id}] Lanzando Chrome...")
-        driver = build_driver(task_id, avatar_y4m, task_dir)
+        warm_browser = pool.acquire() if pool else None
+        # A pooled browser was launched before the task existed, so its
+        # streams are matched by the pool's tag instead of the task's
+        stream_props = warm_browser.stream_props if warm_browser else resources.stream_props
+
+        manifest = TaskManifest(task_id, task_dir) if record_audio else None
+        pipeline = SegmentPipeline(task_id, task_dir, manifest=manifest) if record_audio else None
+        rolling = RollingBriefing(task_id) if record_audio and ROLLING_BRIEFING else None
+        if rolling:
+            rolling.start()
+        capture = AudioCapture(
+            task_id,
+            task_dir,
+            pipeline,
+            audio_pattern,
+            segment_list,
+            segment_seconds,
+            archive_pattern=archive_pattern,
+            adaptive=adaptive,
+            resources=resources,
+            stream_props=stream_props,
+        )
 
-        logger.info(f"[{task_id}] Abriendo URL de reunión: {meeting_url}")
-        driver.get(meeting_url)
-        take_screenshot(driver, task_id, "OPENING")
-        _wait_dom_ready(driver, timeout=30)
+        # Audio discovery and capture don't depend on the browser: arm them
+        # while Chrome launches so no audio is lost once we are in.
+        audio_ready = bootstrap.submit(capture.start, timeline, record_audio)
 
-        if not join_meeting(driver, task_id):
+        if warm_browser:
+            logger.info(f"[{task_id}] ♨️ Usando Chrome precalentado del pool.")
+            driver = warm_browser.driver
+        else:
+            with timeline.step("avatar"):
+                avatar_y4m = ensure_avatar_y4m()
+
+            logger.info(f"[{task_id}] Lanzando Chrome...")
+            with timeline.step("chrome_launch"):
+                driver = build_driver(
+                    task_id,
+                    avatar_y4m,
+                    task_dir,
+                    profile_dir=resources.profile_dir,
+                    debug_port=resources.debug_port,
+                    env=resources.env(),
+                )
+
+        logger.info(f"[{task_id}] Abriendo URL de reunión: {meeting_url}")
+        with timeline.step("page_load"):
+            driver.get(meeting_url)
+            take_screenshot(driver, task_id, "OPENING")
+            _wait_dom_ready(driver, timeout=30)
+
+        with timeline.step("join"):
+            joined = join_meeting(driver, task_id)
+        if not joined:
             logger.error(f"[{task_id}] Abortando: no se pudo unir a la reunión.")
-            driver.quit()
-            return
+            return False
+        timeline.mark("joined")
 
         time.sleep(2)
         for _ in range(3):
@@ -156,18 +368,20 @@ def record_task(
                 break
             time.sleep(1)
 
-        t_ae = threading.Thread(
-            target=force_audio_routing, args=(task_id, stop_audio_enforcer)
-        )
-        t_ae.daemon = True
-        t_ae.start()
-
-        ffmpeg_env = os.environ.copy()
-        if record_audio:
-            ffmpg_audio_process(
-                audio_source, audio_pattern, ffmpeg_audio_log, segment_seconds
+        # Re-raises anything that went wrong arming the capture
+        audio_ready.result()
+        with timeline.step("audio_routing"):
+            routed = capture.router.wait_routed(AUDIO_ROUTING_TIMEOUT)
+        if routed:
+            logger.info(f"[{task_id}] 🔊 Audio routing confirmed.")
+        else:
+            logger.warning(
+                f"[{task_id}] ⚠️ No stream on the virtual sink after "
+                f"{AUDIO_ROUTING_TIMEOUT:.0f}s."
             )
+        timeline.save()
 
+        ffmpeg_env = os.environ.copy()
         if record_video:
             cmd_video = [
                 "ffmpeg",
@@ -184,7 +398,7 @@ def record_task(
                 "-thread_queue_size",
                 "1024",
                 "-i",
-                DISPLAY_NUM,
+                resources.display,
                 "-an",
                 "-c:v",
                 "libx264",
@@ -200,38 +414,11 @@ def record_task(
                 )
 
         start_time = time.time()
-        controls_missing_count = 0
+        monitor = MeetingMonitor(driver, task_id)
 
         while (time.time() - start_time) < max_duration:
-            if record_audio:
-                next_file_path = os.path.join(
-                    task_dir, f"audio_{next_audio_index_to_process + 1:03d}.wav"
-                )
-
-                if os.path.exists(next_file_path):
-                    ready_file_path = os.path.join(
-                        task_dir, f"audio_{next_audio_index_to_process:03d}.wav"
-                    )
-
-                    logger.info(
-                        f"[{task_id}] ⚡ Segmento completado detectado: {ready_file_path}"
-                    )
-
-                    t = threading.Thread(
-                        target=process_audio_segment,
-                        args=(
-                            task_id,
-                            ready_file_path,
-                            task_dir,
-                            next_audio_index_to_process,
-                        ),
-                    )
-                    t.start()
-                    processing_threads.append(t)
-                    next_audio_index_to_process += 1
-
             primary_proc = (
-                ffmpeg_audio_process if record_audio else ffmpeg_video_process
+                capture.process if record_audio else ffmpeg_video_process
             )
 
             if primary_proc and primary_proc.poll() is not None:
@@ -240,57 +427,26 @@ def record_task(
                 )
                 break
 
-            try:
-                found_phrase = driver.execute_script(
-                    CHECK_TEXT_PRESENCE_JS, EXIT_PHRASES
-                )
-            except Exception:
-                found_phrase = None
+            state = monitor.read()
 
-            if found_phrase:
+            if state["exit_phrase"]:
                 logger.info(
-                    f"[{task_id}] 🛑 Detectado texto de salida: '{found_phrase}'"
+                    f"[{task_id}] 🛑 Detectado texto de salida: '{state['exit_phrase']}'"
                 )
                 break
 
-            controls_visible = False
-            check_terms = ["Raise", "Levantar", "Chat", "Leave", "Salir"]
-            for text in check_terms:
-                try:
-                    if (
-                        driver.execute_script(
-                            FIND_AND_CLICK_JS, [text], "button", False
-                        )
-                        == "found"
-                    ):
-                        controls_visible = True
-                        break
-                except Exception:
-                    pass
-
-            if not controls_visible:
-                try:
-                    if driver.find_elements(By.ID, "hangup-button"):
-                        controls_visible = True
-                except Exception:
-                    pass
-
-            if controls_visible:
-                controls_missing_count = 0
-            else:
-                controls_missing_count += 1
-
-            if controls_missing_count >= 10:
-                logger.warning(f"[{task_id}] 🛑 Controles ausentes ~20s. Terminando.")
+            if monitor.controls_missing_for() >= CONTROLS_LOST_SECONDS:
+                logger.warning(
+                    f"[{task_id}] 🛑 Controles ausentes ~{CONTROLS_LOST_SECONDS}s. Terminando."
+                )
                 take_screenshot(driver, task_id, "controls_lost")
                 break
 
-            time.sleep(2)
+            time.sleep(MONITOR_INTERVAL_SECONDS)
 
         logger.info(f"[{task_id}] 🏁 Bucle de grabación terminado.")
-        
-        
-        
+        ok = True
+
     except Exception as e:
         logger.error(f"[{task_id}] Error crítico: {e}", exc_info=True)
         if driver:
@@ -298,9 +454,13 @@ def record_task(
 
     finally:
         logger.info(f"[{task_id}] 🏁 Finalizando grabación y limpiando...")
-        stop_audio_enforcer.set()
+        bootstrap.shutdown(wait=True)
+        if not timeline.saved:
+            timeline.save()
+        if capture and capture.router:
+            capture.router.stop()
 
-        for proc in [ffmpeg_audio_process, ffmpeg_video_process]:
+        for proc in [capture and capture.process, ffmpeg_video_process]:
             if proc and proc.poll() is None:
                 try:
                     os.kill(proc.pid, signal.SIGTERM)
@@ -308,45 +468,86 @@ def record_task(
                 except Exception:
                     proc.kill()
 
-        if driver:
+        if warm_browser:
+            # The pool resets or replaces it in the background
+            pool.release(warm_browser)
+        elif driver:
             try:
                 driver.quit()
             except Exception:
                 pass
 
-        shutil.rmtree(f"/tmp/profile_{task_id}", ignore_errors=True)
-
-        if record_audio:
-            for t in processing_threads:
-                if t.is_alive():
-                    t.join(timeout=30)
-
-            all_wavs = sorted(glob.glob(os.path.join(task_dir, "audio_*.wav")))
+        release_resources(resources)
+        release_ring(task_id)
+
+        if record_audio and not joined:
+            # Whatever was captured is lobby or ringing audio: nothing to
+            # transcribe or brief
+            if capture and capture.segmenter:
+                capture.segmenter.join(timeout=10)
+            if capture and capture.watcher:
+                capture.watcher.stop()
+            if pipeline:
+                pipeline.cancel()
+            if rolling:
+                rolling.stop()
+            release_store(task_id)
+            if manifest:
+                manifest.record("not_joined")
+                manifest.close()
+
+        elif record_audio:
+            # The segmenter closes the last segment once ffmpeg's pipe hits EOF
+            if capture.segmenter:
+                capture.segmenter.join(timeout=10)
+
+            # ffmpeg lists the last segment when it closes it on SIGTERM
+            if capture.watcher:
+                capture.watcher.stop()
+
+            # Fallback for segments the muxer never listed (e.g. ffmpeg was killed)
+            all_wavs = sorted(
+                glob.glob(os.path.join(task_dir, f"audio_*.{audio_ext}"))
+            )
 
             for wav_path in all_wavs:
                 try:
-                    idx_str = os.path.splitext(os.path.basename(wav_path))[0].split(
-                        "_"
-                    )[1]
-                    idx = int(idx_str)
-
-                    if idx >= next_audio_index_to_process:
-                        logger.info(
-                            f"[{task_id}] 🏁 Procesando segmento final/restante: {wav_path}"
-                        )
-                        process_audio_segment(task_id, wav_path, task_dir, idx)
-
-                    
+                    idx = segment_index(wav_path)
                 except Exception as e:
                     logger.warning(
                         f"[{task_id}] Error parsing filename {wav_path}: {e}"
                     )
-                    
-            handle_briefing(task_id)
+                    continue
 
+                if not pipeline.is_submitted(idx):
+                    logger.info(
+                        f"[{task_id}] 🏁 Procesando segmento final/restante: {wav_path}"
+                    )
+                    pipeline.submit(wav_path, idx)
+
+            if not pipeline.drain():
+                logger.warning(f"[{task_id}] ⚠️ Pipeline no terminó todos los segmentos.")
+
+            try:
+                handle_briefing(task_id, rolling)
+                manifest.record("briefed")
+            finally:
+                if rolling:
+                    rolling.stop()
+                release_store(task_id)
+                manifest.close()
+
+            if archive_pattern:
+                for archive_path in sorted(
+                    glob.glob(os.path.join(task_dir, "archive_*.wav"))
+                ):
+                    upload_recordings_to_gcs(
+                        task_id,
+                        archive_path,
+                        f"archive/{os.path.basename(archive_path)}",
+                    )
 
         if record_video and os.path.exists(output_video):
             upload_recordings_to_gcs(task_id, output_video, "video.mp4")
 
-        if EXIT_ON_FINISH:
-            os._exit(0)
+    return ok
@@ -0,0 +1,264 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from libot.logger import logger
+from libot.config import GCS_BUCKET, GCS_PREFIX, OUTPUT_DIR
+from libot.clients import get_bucket
+from libot.briefing import BRIEFING_NAME, deliver_briefing
+from libot.gcs import fetch_transcriptions_from_gcs
+from libot.gemini import BRIEFING_VERSION, CACHE_NAMESPACE, gemini_transcription, make_briefing
+from libot.manifest import MANIFEST_NAME, replay
+from libot.transcription_cache import CACHE_FOLDER
+from libot.transcripts import release_store
+from libot.vad import OffsetMap
+
+_AUDIO = re.compile(r"audio_(\d+)(?:_vad)?\.(mp3|ogg)$")
+
+
+@dataclass
+class TaskPlan:
+    task_id: str
+    audio: dict = field(default_factory=dict)
+    stale: list = field(default_factory=list)
+    offsets: dict = field(default_factory=dict)
+    brief: bool = False
+    # Folders without segment audio, transcripts or a manifest are not tasks
+    is_task: bool = False
+
+
+def _base(task_id: str) -> str:
+    return f"{GCS_PREFIX}/{task_id}" if GCS_PREFIX else task_id
+
+
+def list_tasks(bucket) -> list[str]:
+    """
+    Folders directly under GCS_PREFIX, except the shared transcription
+    cache. ``plan_task`` tells which of them really are tasks.
+    """
+    root = f"{GCS_PREFIX}/" if GCS_PREFIX else ""
+    blobs = bucket.list_blobs(prefix=root, delimiter="/")
+    for _ in blobs:  # prefixes are only filled while pages are read
+        pass
+    tasks = [p[len(root):].rstrip("/") for p in blobs.prefixes]
+    return sorted(t for t in tasks if t and t != CACHE_FOLDER)
+
+
+def plan_task(bucket, task_id: str, transcribe=True, brief=True, force=False) -> TaskPlan:
+    """
+    Works out what is out of date for a task from its objects' metadata:
+    transcripts missing or written by another model/prompt/schema, and a
+    briefing older than its transcripts or written with another briefing
+    prompt. Timestamps are not compared between audio and transcripts:
+    live runs upload and transcribe concurrently, and a cache hit can
+    store the transcript before its audio.
+    """
+    base = _base(task_id)
+    plan = TaskPlan(task_id)
+    transcripts = {}
+    briefing = None
+    for blob in bucket.list_blobs(prefix=f"{base}/"):
+        name = blob.name[len(base) + 1:]
+        match = _AUDIO.fullmatch(name)
+        if match:
+            plan.audio[int(match.group(1))] = blob
+        elif name.startswith("transcriptions/") and name.endswith(".json"):
+            try:
+                transcripts[int(name[:-5].rsplit("_", 1)[1])] = blob
+            except (IndexError, ValueError):
+                pass
+        elif name == BRIEFING_NAME:
+            briefing = blob
+        elif name == MANIFEST_NAME:
+            plan.is_task = True
+            if not transcribe:
+                continue
+            state = replay(blob.download_as_text().splitlines())
+            for idx, seg in state.segments.items():
+                if seg.get("compressed", "offsets"):
+                    plan.offsets[idx] = seg.get("compressed", "offsets")
+
+    plan.is_task = plan.is_task or bool(plan.audio or transcripts)
+    if transcribe:
+        for idx in sorted(plan.audio):
+            transcript = transcripts.get(idx)
+            if (
+                force
+                or transcript is None
+                or (transcript.metadata or {}).get("transcript_version") != CACHE_NAMESPACE
+            ):
+                plan.stale.append(idx)
+
+    if brief and (plan.audio or transcripts):
+        newest = max((t.updated for t in transcripts.values() if t.updated), default=None)
+        plan.brief = (
+            force
+            or bool(plan.stale)
+            or briefing is None
+            or (briefing.metadata or {}).get("briefing_version") != BRIEFING_VERSION
+            or (newest is not None and briefing.updated is not None and briefing.updated < newest)
+        )
+    return plan
+
+
+class Progress:
+    """
+    Running counts and throughput, logged as every unit of work finishes.
+    """
+
+    def __init__(self, segments: int, briefs: int):
+        self.segments = segments
+        self.briefs = briefs
+        self.done = 0
+        self.failed = 0
+        self.briefed = 0
+        self.brief_failed = 0
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def segment(self, ok: bool):
+        with self._lock:
+            self.done += 1
+            self.failed += not ok
+        self.log()
+
+    def brief(self, ok: bool):
+        with self._lock:
+            self.briefed += 1
+            self.brief_failed += not ok
+        self.log()
+
+    def log(self):
+        elapsed = max(time.monotonic() - self._start, 1e-6)
+        rate = self.done * 60 / elapsed
+        left = self.segments - self.done
+        eta = f", ETA {left / rate:.1f} min" if rate and left else ""
+        logger.info(
+            f"♻️ Segments {self.done}/{self.segments} ({self.failed} failed), "
+            f"briefings {self.briefed}/{self.briefs} ({self.brief_failed} failed), "
+            f"{rate:.1f} seg/min{eta}"
+        )
+
+    def summary(self) -> dict:
+        return {
+            "segments": self.done,
+            "segments_failed": self.failed,
+            "briefings": self.briefed,
+            "briefings_failed": self.brief_failed,
+            "seconds": round(time.monotonic() - self._start, 1),
+        }
+
+
+def _transcribe(task_id: str, idx: int, blob, offsets: str | None, force: bool = False) -> bool:
+    work_dir = os.path.join(OUTPUT_DIR, task_id, "reprocess")
+    os.makedirs(work_dir, exist_ok=True)
+    path = os.path.join(work_dir, os.path.basename(blob.name))
+    try:
+        blob.download_to_filename(path)
+        offset_map = OffsetMap.from_json(offsets) if offsets else None
+        # Forced runs ask the model again instead of reusing the cached transcript
+        return gemini_transcription(path, task_id, idx, offset_map, use_cache=not force) is not None
+    except Exception as e:
+        logger.error(f"[{task_id}] ❌ Re-transcribing Seg {idx} failed: {e}")
+        return False
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _brief(task_id: str, send: bool) -> bool:
+    try:
+        transcript = fetch_transcriptions_from_gcs(task_id)
+        if not transcript:
+            logger.warning(f"[{task_id}] ♻️ No transcript to brief")
+            return False
+        briefing_object = make_briefing(task_id, transcript=transcript)
+        if briefing_object is None:
+            return False
+        deliver_briefing(task_id, briefing_object, send=send)
+        return True
+    except Exception as e:
+        logger.error(f"[{task_id}] ❌ Re-briefing failed: {e}")
+        return False
+    finally:
+        release_store(task_id)
+
+
+def reprocess(
+    tasks: list[str] | None = None,
+    transcribe: bool = True,
+    brief: bool = True,
+    force: bool = False,
+    workers: int = 8,
+    send: bool = False,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Re-transcribes and re-briefs historical tasks whose outputs are out of
+    date. Segments of every task share one thread pool; Gemini requests
+    all go through the process-wide scheduler, so its rate limit applies
+    to the whole batch. A task is briefed once its segments are done.
+    """
+    if not GCS_BUCKET:
+        raise SystemExit("GCS_BUCKET is required")
+    bucket = get_bucket(GCS_BUCKET)
+    tasks = tasks or list_tasks(bucket)
+    logger.info(f"♻️ Planning {len(tasks)} tasks")
+
+    plans = []
+    found = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="plan") as pool:
+        for plan in pool.map(lambda t: plan_task(bucket, t, transcribe, brief, force), tasks):
+            if not plan.is_task:
+                logger.info(f"[{plan.task_id}] ♻️ Not a task folder, skipping")
+                continue
+            found += 1
+            if plan.stale or plan.brief:
+                plans.append(plan)
+                logger.info(
+                    f"[{plan.task_id}] ♻️ {len(plan.stale)}/{len(plan.audio)} segments to "
+                    f"transcribe{', briefing' if plan.brief else ''}"
+                )
+    progress = Progress(sum(len(p.stale) for p in plans), sum(p.brief for p in plans))
+    logger.info(
+        f"♻️ {found - len(plans)} tasks up to date, {progress.segments} segments and "
+        f"{progress.briefs} briefings to redo"
+    )
+    if dry_run:
+        return progress.summary()
+
+    remaining = {p.task_id: len(p.stale) for p in plans}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="reprocess") as pool:
+        jobs = {}
+        for plan in plans:
+            if not plan.stale and plan.brief:
+                jobs[pool.submit(_brief, plan.task_id, send)] = (plan, None)
+            for idx in plan.stale:
+                future = pool.submit(
+                    _transcribe, plan.task_id, idx, plan.audio[idx], plan.offsets.get(idx), force
+                )
+                jobs[future] = (plan, idx)
+
+        pending = set(jobs)
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                plan, idx = jobs.pop(future)
+                if idx is None:
+                    progress.brief(future.result())
+                    continue
+                progress.segment(future.result())
+                remaining[plan.task_id] -= 1
+                if remaining[plan.task_id] == 0:
+                    release_store(plan.task_id)
+                    if plan.brief:
+                        brief_job = pool.submit(_brief, plan.task_id, send)
+                        jobs[brief_job] = (plan, None)
+                        pending.add(brief_job)
+
+    summary = progress.summary()
+    logger.info(f"♻️ Reprocessing finished: {summary}")
+    return summary
@@ -0,0 +1,221 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+
+from libot.logger import logger
+from libot.config import (
+    DISPLAY_NUM,
+    TASK_SLOTS,
+    TASK_DISPLAY_BASE,
+    TASK_DEBUG_PORT_BASE,
+)
+from libot.audio import PACTL_ENV
+
+SHARED_SINK = "VirtualSpeaker"
+SHARED_DEBUG_PORT = 9222
+# Pulse client property that tags every stream a task's Chrome opens
+STREAM_TAG = "scribe.task"
+
+
+@dataclass
+class TaskResources:
+    """
+    The display, audio sink, DevTools port and profile a recording runs on.
+    """
+
+    task_id: str
+    display: str
+    sink: str
+    debug_port: int
+    profile_dir: str
+    slot: int | None = None
+    xvfb: subprocess.Popen | None = None
+    sink_module: str | None = None
+    stream_props: dict = field(default_factory=dict)
+
+    @property
+    def isolated(self) -> bool:
+        return self.slot is not None
+
+    @property
+    def monitor(self) -> str:
+        return f"{self.sink}.monitor"
+
+    def env(self) -> dict:
+        """
+        Environment for processes of this task (chromedriver/Chrome, ffmpeg).
+        """
+        env = os.environ.copy()
+        env["DISPLAY"] = self.display
+        if self.isolated:
+            env["PULSE_SINK"] = self.sink
+            env["PULSE_PROP"] = " ".join(f"{k}={v}" for k, v in self.stream_props.items())
+        return env
+
+
+def shared_resources(task_id: str) -> TaskResources:
+    """
+    Single-meeting layout set up by entrypoint.sh (Cloud Run job).
+    """
+    return TaskResources(
+        task_id=task_id,
+        display=DISPLAY_NUM,
+        sink=SHARED_SINK,
+        debug_port=SHARED_DEBUG_PORT,
+        profile_dir=f"/tmp/profile_{task_id}",
+    )
+
+
+def _pactl(*args) -> str:
+    result = subprocess.run(
+        ["pactl", *args], capture_output=True, text=True, env=PACTL_ENV
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"pactl {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+class ResourceAllocator:
+    """
+    Hands out per-task slots so several meetings can record in one
+    container. Slot ``i`` owns Xvfb display ``:base+i``, a ``Scribe_i``
+    null sink (and its monitor), DevTools port ``port_base+i`` and the
+    task's profile directory. Everything is torn down on ``release``.
+    """
+
+    def __init__(
+        self,
+        slots: int = TASK_SLOTS,
+        display_base: int = TASK_DISPLAY_BASE,
+        port_base: int = TASK_DEBUG_PORT_BASE,
+    ):
+        self.slots = slots
+        self.display_base = display_base
+        self.port_base = port_base
+        self._lock = threading.Lock()
+        self._used = {}
+
+    def free_slots(self) -> int:
+        with self._lock:
+            return self.slots - len(self._used)
+
+    def _claim(self, task_id: str) -> int:
+        with self._lock:
+            for slot in range(self.slots):
+                if slot not in self._used:
+                    self._used[slot] = task_id
+                    return slot
+        raise RuntimeError(f"No free recording slots ({self.slots} in use)")
+
+    def allocate(self, task_id: str) -> TaskResources:
+        slot = self._claim(task_id)
+        res = TaskResources(
+            task_id=task_id,
+            display=f":{self.display_base + slot}",
+            sink=f"Scribe_{slot}",
+            debug_port=self.port_base + slot,
+            profile_dir=f"/tmp/profile_{task_id}",
+            slot=slot,
+            stream_props={STREAM_TAG: task_id},
+        )
+        try:
+            res.xvfb = self._start_xvfb(res.display)
+            res.sink_module = self._load_sink(res.sink)
+        except Exception:
+            self.release(res)
+            raise
+        logger.info(
+            f"[{task_id}] 🧩 Slot {slot}: display={res.display} sink={res.sink} "
+            f"port={res.debug_port}"
+        )
+        return res
+
+    def release(self, res: TaskResources):
+        if res.xvfb and res.xvfb.poll() is None:
+            res.xvfb.terminate()
+            try:
+                res.xvfb.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                res.xvfb.kill()
+        if res.sink_module:
+            try:
+                _pactl("unload-module", res.sink_module)
+            except Exception as e:
+                logger.warning(f"[{res.task_id}] Could not unload {res.sink}: {e}")
+        shutil.rmtree(res.profile_dir, ignore_errors=True)
+        with self._lock:
+            self._used.pop(res.slot, None)
+
+    def _start_xvfb(self, display: str, timeout: float = 5.0) -> subprocess.Popen:
+        number = display.lstrip(":")
+        for stale in (f"/tmp/.X{number}-lock", f"/tmp/.X11-unix/X{number}"):
+            if os.path.exists(stale):
+                os.remove(stale)
+
+        proc = subprocess.Popen(
+            ["Xvfb", display, "-screen", "0", "1920x1080x24", "-nolisten", "tcp", "-noreset"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        socket = f"/tmp/.X11-unix/X{number}"
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"Xvfb {display} exited on startup")
+            if os.path.exists(socket):
+                return proc
+            time.sleep(0.05)
+        proc.kill()
+        raise RuntimeError(f"Xvfb {display} did not start in {timeout:.0f}s")
+
+    def _load_sink(self, sink: str) -> str:
+        # A crashed task can leave its sink loaded; drop it so the name is free
+        for line in _pactl("list", "modules", "short").splitlines():
+            parts = line.split("\t")
+            if len(parts) > 2 and f"sink_name={sink}" in parts[2].split():
+                _pactl("unload-module", parts[0])
+
+        module = _pactl(
+            "load-module",
+            "module-null-sink",
+            f"sink_name={sink}",
+            f"sink_properties=device.description={sink}",
+        )
+        _pactl("set-sink-mute", sink, "0")
+        _pactl("set-sink-volume", sink, "100%")
+        return module
+
+
+_allocator: ResourceAllocator | None = None
+
+
+def init_allocator(slots: int = TASK_SLOTS) -> ResourceAllocator | None:
+    """
+    Enables per-task isolation (REST API mode). 0 slots keeps the shared
+    single-meeting layout.
+    """
+    global _allocator
+    if slots > 0 and _allocator is None:
+        _allocator = ResourceAllocator(slots=slots)
+        logger.info(f"🧩 Per-task isolation enabled ({slots} slots)")
+    return _allocator
+
+
+def get_allocator() -> ResourceAllocator | None:
+    return _allocator
+
+
+def allocate_resources(task_id: str) -> TaskResources:
+    allocator = get_allocator()
+    return allocator.allocate(task_id) if allocator else shared_resources(task_id)
+
+
+def release_resources(res: TaskResources):
+    allocator = get_allocator()
+    if allocator and res.isolated:
+        allocator.release(res)
+    else:
+        shutil.rmtree(res.profile_dir, ignore_errors=True)
@@ -0,0 +1,180 @@
+import glob
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from libot.logger import logger
+from libot.config import GCS_BUCKET, OUTPUT_DIR, PIPELINE_TRANSCRIBE_WORKERS
+from libot.briefing import handle_briefing
+from libot.gcs import download_from_gcs
+from libot.manifest import ManifestState, TaskManifest, load_manifest
+from libot.pipeline import (
+    Segment,
+    compress_segment,
+    record_compressed,
+    transcribe_segment,
+    upload_segment,
+)
+from libot.transcript_merge import decode_document
+from libot.transcription_cache import file_key
+from libot.transcripts import get_store, release_store
+from libot.vad import OffsetMap
+
+# Raw captures as ffmpeg names them (audio_007.wav), not derived files
+_SOURCE = re.compile(r"audio_(\d+)\.(wav|mp3|ogg)$")
+
+
+def _local_sources(task_dir: str) -> dict:
+    """
+    Captured segments on disk, preferring the raw WAV over a compressed
+    copy with the same index.
+    """
+    sources = {}
+    for path in sorted(glob.glob(os.path.join(task_dir, "audio_*"))):
+        match = _SOURCE.search(os.path.basename(path))
+        if match:
+            idx = int(match.group(1))
+            if idx not in sources or path.endswith(".wav"):
+                sources[idx] = path
+    return sources
+
+
+def _load_transcript(task_id: str, idx: int) -> str | None:
+    name = f"{task_id}_{idx}.json"
+    path = os.path.join(OUTPUT_DIR, task_id, "transcriptions", name)
+    if not os.path.exists(path) and not download_from_gcs(task_id, f"transcriptions/{name}", path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return decode_document(f.read())
+    except ValueError:
+        return None
+
+
+def _compressed_audio(task_id, task_dir, seg, segment, manifest) -> str | None:
+    """
+    The segment's compressed file: the local copy if its checksum still
+    matches, else the uploaded one, else compressed again from the capture.
+    """
+    name = seg.get("compressed", "audio")
+    if name:
+        path = os.path.join(task_dir, name)
+        if os.path.exists(path) and file_key(path) == seg.get("compressed", "sha256"):
+            return path
+        remote = seg.get("uploaded", "remote")
+        if remote and download_from_gcs(task_id, remote, os.path.join(task_dir, remote)):
+            return os.path.join(task_dir, remote)
+
+    if not segment.source_path or not os.path.exists(segment.source_path):
+        return None
+    segment.audio_path = compress_segment(segment)
+    if segment.dropped:
+        manifest.record("dropped", segment.index)
+    elif segment.audio_path:
+        record_compressed(manifest, segment)
+    return segment.audio_path
+
+
+def _finish_segment(task_id, task_dir, seg, source, manifest, store):
+    """
+    Runs the stages the manifest does not show as done for one segment.
+    """
+    idx = seg.index
+    # Without a bucket there is nothing to upload (see SegmentPipeline._upload)
+    uploaded = seg.has("uploaded") or not GCS_BUCKET
+    try:
+        transcript = _load_transcript(task_id, idx) if seg.has("transcribed") else None
+        if transcript is not None:
+            store.add(idx, transcript)
+        if uploaded and transcript is not None:
+            return
+
+        segment = Segment(
+            task_id,
+            idx,
+            source,
+            task_dir,
+            start=seg.get("captured", "start"),
+            end=seg.get("captured", "end"),
+        )
+        offsets = seg.get("compressed", "offsets")
+        if offsets:
+            segment.offset_map = OffsetMap.from_json(offsets)
+
+        segment.audio_path = _compressed_audio(task_id, task_dir, seg, segment, manifest)
+        if segment.dropped:
+            return
+        if not segment.audio_path:
+            logger.warning(f"[{task_id}] ♻️ Seg {idx}: no audio left to recover")
+            if transcript is None:
+                manifest.record("lost", idx)
+            return
+
+        if not uploaded:
+            if upload_segment(segment):
+                manifest.record("uploaded", idx, remote=segment.remote_name)
+        if transcript is None:
+            result = transcribe_segment(segment)
+            if result:
+                manifest.record("transcribed", idx, chars=len(result))
+            else:
+                manifest.record("failed", idx, step="transcribe")
+    except Exception as e:
+        logger.error(f"[{task_id}] ❌ Resuming Seg {idx} failed: {e}")
+        manifest.record("failed", idx, step="resume", error=str(e))
+    finally:
+        store.resolve(idx)
+
+
+def resume_task(task_id: str, workers: int = PIPELINE_TRANSCRIBE_WORKERS) -> bool:
+    """
+    Finishes a task that died half-way: replays its manifest (local or the
+    GCS mirror) and only compresses, uploads, transcribes and briefs what
+    is missing. Returns False when there is nothing to resume from.
+    """
+    task_dir = os.path.join(OUTPUT_DIR, task_id)
+    state = load_manifest(task_id, task_dir)
+    sources = _local_sources(task_dir)
+    if state is None and not sources:
+        logger.error(f"[{task_id}] ♻️ No manifest or local segments to resume from")
+        return False
+
+    if state is not None and "not_joined" in state.events:
+        logger.info(f"[{task_id}] ♻️ The bot never joined the meeting, nothing to resume")
+        return True
+
+    manifest = TaskManifest(task_id, task_dir)
+    store = get_store(task_id)
+    try:
+        if state is None:
+            state = ManifestState()
+        # Captures the segment watcher never got to list
+        for idx, path in sources.items():
+            if idx not in state.segments:
+                manifest.record("captured", idx, source=os.path.basename(path))
+                state.segment(idx).stages["captured"] = {"source": os.path.basename(path)}
+
+        pending = []
+        for seg in sorted(state.segments.values(), key=lambda s: s.index):
+            if seg.has("dropped") or seg.has("lost"):
+                continue
+            store.expect(seg.index, seg.get("captured", "start"))
+            pending.append(seg)
+
+        logger.info(f"[{task_id}] ♻️ Resuming {len(pending)} segments")
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="resume") as pool:
+            for seg in pending:
+                source = sources.get(seg.index)
+                if source is None and seg.get("captured", "source"):
+                    source = os.path.join(task_dir, seg.get("captured", "source"))
+                pool.submit(_finish_segment, task_id, task_dir, seg, source, manifest, store)
+
+        if "briefed" in state.events:
+            logger.info(f"[{task_id}] ♻️ Briefing already sent")
+        elif store.items():
+            handle_briefing(task_id)
+            manifest.record("briefed")
+        return True
+    finally:
+        release_store(task_id)
+        manifest.close()
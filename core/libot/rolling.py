@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+
+from libot.logger import logger
+from libot.config import OUTPUT_DIR, ROLLING_BRIEFING_TIMEOUT
+from libot.gemini import update_meeting_state
+from libot.transcripts import get_store
+from libot.transcript_merge import merge_transcript
+
+
+def empty_state() -> dict:
+    return {"summary": "", "decisions": [], "action_items": [], "open_questions": []}
+
+
+class RollingBriefing:
+    """
+    Meeting state (summary so far, decisions, action items with owners)
+    kept up to date while the meeting runs.
+
+    Every transcript that lands in the task's TranscriptStore is folded
+    into the state by a small model call, in segment order, on a single
+    background thread. At the end of the meeting only the last segments
+    are left to fold, so the briefing is rendered from a compact state
+    whatever the meeting length.
+    """
+
+    def __init__(self, task_id: str, store=None, update=update_meeting_state):
+        self.task_id = task_id
+        self.store = store or get_store(task_id)
+        self.update = update
+        self.state = empty_state()
+        self.folded = set()
+        self.failed = False
+        self._wake = threading.Event()
+        self._stopping = False
+        self._idle = threading.Condition()
+        self._busy = False
+        self._path = os.path.join(OUTPUT_DIR, task_id, "briefing_state.json")
+        self._thread = threading.Thread(
+            target=self._run, name=f"rolling-{task_id}", daemon=True
+        )
+
+    def start(self):
+        self.store.subscribe(self._wake.set)
+        self._thread.start()
+
+    def _ready(self) -> list[tuple[int, str]]:
+        """
+        Transcripts that can be folded now: those below the first segment
+        still in flight, so the summary follows the meeting's order.
+        """
+        missing = self.store.missing()
+        floor = missing[0] if missing else float("inf")
+        return [
+            (idx, text)
+            for idx, text in self.store.items()
+            if idx < floor and idx not in self.folded
+        ]
+
+    def _fold(self, idx: int, text: str):
+        start = time.monotonic()
+        segment = merge_transcript([(idx, text)], self.store.offsets())
+        self.state = self.update(self.task_id, self.state, segment)
+        self.folded.add(idx)
+        logger.info(
+            f"[{self.task_id}] 🧾 Seg {idx} added to the rolling briefing "
+            f"in {time.monotonic() - start:.1f}s"
+        )
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            with open(self._path, "w") as f:
+                json.dump(self.state, f, ensure_ascii=False)
+        except OSError as e:
+            logger.warning(f"[{self.task_id}] Could not save rolling briefing state: {e}")
+
+    def _run(self):
+        while not self._stopping and not self.failed:
+            self._wake.wait()
+            self._wake.clear()
+            with self._idle:
+                self._busy = True
+            try:
+                for idx, text in self._ready():
+                    if self._stopping:
+                        break
+                    self._fold(idx, text)
+            except Exception as e:
+                # The end-of-meeting briefing falls back to the full transcript
+                logger.error(f"[{self.task_id}] ❌ Rolling briefing update failed: {e}")
+                self.failed = True
+            finally:
+                with self._idle:
+                    self._busy = False
+                    self._idle.notify_all()
+
+    def _caught_up(self) -> bool:
+        if not self.store.complete():
+            return False
+        return all(idx in self.folded for idx, _ in self.store.items())
+
+    def finish(self, timeout: float = ROLLING_BRIEFING_TIMEOUT) -> bool:
+        """
+        Waits until every transcript is folded. Returns True when the state
+        covers the whole meeting and can replace the full transcript.
+        """
+        deadline = time.monotonic() + timeout
+        self._wake.set()
+        with self._idle:
+            while not self.failed and (self._busy or not self._caught_up()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._idle.wait(min(remaining, 1.0))
+                self._wake.set()
+        done = not self.failed and self._caught_up() and bool(self.folded)
+        if not done:
+            logger.warning(
+                f"[{self.task_id}] 🧾 Rolling briefing incomplete "
+                f"({len(self.folded)} segments folded, failed={self.failed})"
+            )
+        return done
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout=5)
@@ -1,14 +1,23 @@
-import threading
 import uuid
 from datetime import datetime
 from flask import Blueprint, request, jsonify, send_file
 
 from libot.config import SEGMENT_SECONDS
 from libot.recorder import record_task
+from libot.admission import get_controller
 
 api = Blueprint("api", __name__)
 
 
+def _parse_start_time(value):
+    """
+    ISO 8601 meeting start time -> epoch seconds (None if not given).
+    """
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
 @api.route("/", methods=["POST"])
 def trigger_bot():
     date_now = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -17,12 +26,18 @@ def trigger_bot():
     if not data or "url" not in data:
         return jsonify({"error": "Missing 'url'"}), 400
 
+    try:
+        start_at = _parse_start_time(data.get("start_time"))
+    except ValueError:
+        return jsonify({"error": "Invalid 'start_time'"}), 400
+
     task_id = date_now + "_" + str(uuid.uuid4())[:8]
     duration = int(data.get("duration", 3600))
 
-    t = threading.Thread(
-        target=record_task,
-        args=(
+    record = get_controller().submit(
+        task_id,
+        data["url"],
+        lambda: record_task(
             data["url"],
             duration,
             task_id,
@@ -30,8 +45,21 @@ def trigger_bot():
             data.get("record_video", False),
             data.get("segment_seconds", SEGMENT_SECONDS),
         ),
+        start_at=start_at,
     )
-    t.daemon = True
-    t.start()
 
-    return jsonify({"status": "started", "task_id": task_id}), 202
+    if record.status == "rejected":
+        return jsonify({"error": "Recorder at capacity", "task_id": task_id}), 429
+
+    body = {"status": record.status, "task_id": task_id}
+    if record.queue_position is not None:
+        body["queue_position"] = record.queue_position
+    return jsonify(body), 202
+
+
+@api.route("/tasks/<task_id>", methods=["GET"])
+def task_status(task_id):
+    record = get_controller().registry.get(task_id)
+    if not record:
+        return jsonify({"error": "Unknown task"}), 404
+    return jsonify(record.to_dict()), 200
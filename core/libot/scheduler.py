@@ -0,0 +1,238 @@
+import random
+import re
+import threading
+import time
+
+import httpx
+from google.genai import errors
+
+from libot.logger import logger
+from libot.config import (
+    GEMINI_RATE_PER_MINUTE,
+    GEMINI_BURST,
+    GEMINI_MAX_CONCURRENT,
+    GEMINI_MAX_ATTEMPTS,
+    GEMINI_BACKOFF_BASE,
+    GEMINI_BACKOFF_MAX,
+    GEMINI_DEADLINE_SECONDS,
+)
+
+
+class TokenBucket:
+    """
+    Request rate limiter: ``rate`` tokens per second, up to ``burst`` saved.
+    """
+
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def wait_time(self) -> float:
+        """
+        Takes a token if one is available (returns 0), otherwise returns
+        how long to wait before trying again.
+        """
+        with self._lock:
+            now = self.clock()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._refill(now)
+            # Tolerance so float refills (0.1 * 10 = 0.999...) don't spin
+            if self._tokens >= 1 - 1e-9:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, deadline: float | None = None, sleep=time.sleep) -> bool:
+        while True:
+            wait = self.wait_time()
+            if wait == 0:
+                return True
+            if deadline is not None and self.clock() + wait > deadline:
+                return False
+            sleep(wait)
+
+    def penalize(self, seconds: float):
+        """
+        Stops handing out tokens for ``seconds`` (after a 429), so every
+        caller slows down, not only the one that was throttled.
+        """
+        with self._lock:
+            now = self.clock()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = now + seconds
+
+
+class RetryBudget:
+    """
+    Attempts and deadline shared by every request made for one segment.
+    """
+
+    def __init__(
+        self,
+        attempts: int = GEMINI_MAX_ATTEMPTS,
+        deadline_seconds: float = GEMINI_DEADLINE_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.attempts = attempts
+        self.deadline = clock() + deadline_seconds
+        self.clock = clock
+
+    def remaining(self) -> float:
+        return self.deadline - self.clock()
+
+
+def is_retryable(e: Exception) -> bool:
+    if isinstance(e, errors.APIError):
+        return e.code in (408, 429) or e.code >= 500
+    return isinstance(e, (httpx.TransportError, TimeoutError, ConnectionError))
+
+
+def retry_after(e: Exception) -> float | None:
+    """
+    Server-suggested delay: Retry-After header or the RetryInfo detail
+    Gemini attaches to RESOURCE_EXHAUSTED errors.
+    """
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+
+    details = getattr(e, "details", None)
+    if isinstance(details, dict):
+        for detail in details.get("error", {}).get("details", []) or []:
+            delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+            match = re.fullmatch(r"([\d.]+)s", delay or "")
+            if match:
+                return float(match.group(1))
+    return None
+
+
+class TranscriptionScheduler:
+    """
+    Gate for every Gemini request of the process.
+
+    Requests go through a token bucket and a bounded number of concurrent
+    slots. Retryable failures (429, 5xx, timeouts) are retried with
+    exponential backoff and full jitter, honouring the server's retry
+    delay, until the caller's RetryBudget runs out of attempts or the
+    next wait would pass its deadline. A 429 also pauses the bucket for
+    everyone.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = GEMINI_RATE_PER_MINUTE,
+        burst: int = GEMINI_BURST,
+        max_concurrent: int = GEMINI_MAX_CONCURRENT,
+        backoff_base: float = GEMINI_BACKOFF_BASE,
+        backoff_max: float = GEMINI_BACKOFF_MAX,
+        sleep=time.sleep,
+        clock=time.monotonic,
+    ):
+        self.bucket = TokenBucket(rate_per_minute / 60.0, burst, clock)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.clock = clock
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrent))
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failed = 0
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def call(self, fn, budget: RetryBudget | None = None, label: str = "gemini"):
+        """
+        Runs ``fn()`` under the rate limit, retrying within ``budget``.
+        """
+        budget = budget or RetryBudget(clock=self.clock)
+        attempt = 0
+        while True:
+            if not self.bucket.acquire(budget.deadline, sleep=self.sleep):
+                self._count("failed")
+                raise TimeoutError(f"{label}: deadline reached waiting for the rate limiter")
+            if not self._slots.acquire(timeout=max(0.0, budget.remaining())):
+                self._count("failed")
+                raise TimeoutError(f"{label}: deadline reached waiting for a free slot")
+            try:
+                self._count("requests")
+                budget.attempts -= 1
+                return fn()
+            except Exception as e:
+                if not is_retryable(e):
+                    self._count("failed")
+                    raise
+                error = e
+            finally:
+                self._slots.release()
+
+            throttled = getattr(error, "code", None) == 429
+            delay = max(self.backoff(attempt), retry_after(error) or 0.0)
+            if throttled:
+                self._count("throttled")
+                self.bucket.penalize(delay)
+            if budget.attempts <= 0 or self.clock() + delay >= budget.deadline:
+                self._count("failed")
+                logger.error(f"{label}: giving up after {attempt + 1} attempts: {error}")
+                raise error
+
+            self._count("retries")
+            logger.warning(f"{label}: {error} - retrying in {delay:.1f}s")
+            self.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "failed": self.failed,
+            }
+
+
+_scheduler: TranscriptionScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> TranscriptionScheduler:
+    """
+    Process-wide scheduler, shared by every segment of every task.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TranscriptionScheduler()
+        return _scheduler
+
+
+def set_scheduler(scheduler: TranscriptionScheduler):
+    """
+    Replaces the process-wide scheduler (e.g. a batch job with its own limits).
+    """
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = scheduler
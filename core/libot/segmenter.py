@@ -0,0 +1,181 @@
+import audioop
+import math
+import os
+import threading
+import wave
+
+from libot.logger import logger
+from libot.config import (
+    SEGMENT_WINDOW,
+    SEGMENT_EARLY_WINDOW,
+    SEGMENT_EARLY_COUNT,
+    SEGMENT_PAUSE_DBFS,
+    SEGMENT_PAUSE_SECONDS,
+)
+
+ANALYSIS_MS = 100
+SAMPLE_WIDTH = 2
+
+
+def parse_window(value: str) -> tuple[float, float]:
+    """
+    "240-330" -> (240.0, 330.0)
+    """
+    low, _, high = value.partition("-")
+    low, high = float(low), float(high or low)
+    if high < low:
+        raise ValueError(f"Invalid segment window: {value}")
+    return low, high
+
+
+class SegmentSchedule:
+    """
+    Segment length window per segment index: short segments first for
+    near-real-time transcripts, then the regular window.
+    """
+
+    def __init__(
+        self,
+        window=SEGMENT_WINDOW,
+        early_window=SEGMENT_EARLY_WINDOW,
+        early_count=SEGMENT_EARLY_COUNT,
+    ):
+        self.window = parse_window(window) if isinstance(window, str) else window
+        self.early_window = (
+            parse_window(early_window) if isinstance(early_window, str) else early_window
+        )
+        self.early_count = early_count
+
+    def window_for(self, index: int) -> tuple[float, float]:
+        return self.early_window if index < self.early_count else self.window
+
+
+class AdaptiveSegmenter:
+    """
+    Splits ffmpeg's raw PCM capture into ``audio_NNN.wav`` files, ending each
+    one at the first pause once it is inside its length window, or at the
+    window's upper bound if nobody pauses.
+
+    Closed segments are appended to the csv segment list in the same
+    ``filename,start,end`` format as ffmpeg's segment muxer, so the
+    SegmentWatcher and the finalize glob work unchanged.
+    """
+
+    def __init__(
+        self,
+        task_id: str,
+        task_dir: str,
+        stream,
+        list_path: str,
+        rate: int = 48000,
+        channels: int = 2,
+        schedule: SegmentSchedule | None = None,
+        pause_dbfs: float = SEGMENT_PAUSE_DBFS,
+        pause_seconds: float = SEGMENT_PAUSE_SECONDS,
+    ):
+        self.task_id = task_id
+        self.task_dir = task_dir
+        self.stream = stream
+        self.list_path = list_path
+        self.rate = rate
+        self.channels = channels
+        self.schedule = schedule or SegmentSchedule()
+        self.pause_rms = 32768 * math.pow(10, pause_dbfs / 20)
+        self.pause_blocks = max(1, round(pause_seconds * 1000 / ANALYSIS_MS))
+
+        self.block_bytes = rate * ANALYSIS_MS // 1000 * channels * SAMPLE_WIDTH
+        self.index = 0
+        self._writer = None
+        self._seg_frames = 0
+        self._seg_start = 0.0
+        self._quiet_blocks = 0
+        self._thread = threading.Thread(
+            target=self._run, name=f"segmenter-{task_id}", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def join(self, timeout: float | None = None):
+        self._thread.join(timeout=timeout)
+
+    def _path(self, index: int) -> str:
+        return os.path.join(self.task_dir, f"audio_{index:03d}.wav")
+
+    def _open(self):
+        self._writer = wave.open(self._path(self.index), "wb")
+        self._writer.setnchannels(self.channels)
+        self._writer.setsampwidth(SAMPLE_WIDTH)
+        self._writer.setframerate(self.rate)
+        self._seg_frames = 0
+        self._quiet_blocks = 0
+
+    def _close(self):
+        if not self._writer:
+            return
+        self._writer.close()
+        self._writer = None
+        duration = self._seg_frames / self.rate
+        end = self._seg_start + duration
+        with open(self.list_path, "a") as f:
+            f.write(f"audio_{self.index:03d}.wav,{self._seg_start:.6f},{end:.6f}\n")
+        logger.info(
+            f"[{self.task_id}] ✂️ Segmento {self.index} cerrado a los {duration:.1f}s"
+        )
+        self._seg_start = end
+        self.index += 1
+
+    def _should_cut(self) -> bool:
+        low, high = self.schedule.window_for(self.index)
+        elapsed = self._seg_frames / self.rate
+        if elapsed >= high:
+            return True
+        return elapsed >= low and self._quiet_blocks >= self.pause_blocks
+
+    def feed(self, data: bytes):
+        """
+        Writes one analysis block, cutting before it if a pause just ended
+        the current segment.
+        """
+        if self._writer is None:
+            self._open()
+        if self._should_cut():
+            self._close()
+            self._open()
+
+        frame_bytes = self.channels * SAMPLE_WIDTH
+        data = data[: len(data) - len(data) % frame_bytes]
+        if audioop.rms(data, SAMPLE_WIDTH) < self.pause_rms:
+            self._quiet_blocks += 1
+        else:
+            self._quiet_blocks = 0
+        self._writer.writeframes(data)
+        self._seg_frames += len(data) // frame_bytes
+
+    def _run(self):
+        logger.info(
+            f"[{self.task_id}] ✂️ Adaptive segmenter started "
+            f"(early {self.schedule.early_window} x{self.schedule.early_count}, "
+            f"then {self.schedule.window})"
+        )
+        pending = b""
+        try:
+            while True:
+                chunk = self.stream.read(self.block_bytes - len(pending))
+                if not chunk:
+                    break
+                pending += chunk
+                if len(pending) >= self.block_bytes:
+                    self.feed(pending)
+                    pending = b""
+            if pending:
+                self.feed(pending)
+        except Exception as e:
+            logger.error(f"[{self.task_id}] ❌ Adaptive segmenter error: {e}")
+        finally:
+            if self._writer and self._seg_frames:
+                self._close()
+            elif self._writer:
+                self._writer.close()
+                os.remove(self._path(self.index))
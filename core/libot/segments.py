@@ -0,0 +1,110 @@
+import csv
+import os
+import threading
+
+from libot.logger import logger
+
+SEGMENT_LIST_NAME = "segments.csv"
+
+
+def segment_index(path: str) -> int:
+    """
+    audio_007.wav -> 7
+    """
+    return int(os.path.splitext(os.path.basename(path))[0].split("_")[1])
+
+
+class SegmentWatcher:
+    """
+    Dispatches audio segments as soon as ffmpeg's segment muxer closes them.
+
+    ffmpeg appends one ``filename,start,end`` line to ``-segment_list`` each
+    time it finishes a segment, so the list file is the muxer's own
+    completion signal. The watcher tails it from its own thread, independent
+    of the browser-probing loop.
+    """
+
+    def __init__(
+        self,
+        task_id: str,
+        task_dir: str,
+        on_segment,
+        list_path: str | None = None,
+        poll_interval: float = 0.25,
+    ):
+        self.task_id = task_id
+        self.task_dir = task_dir
+        self.on_segment = on_segment
+        self.list_path = list_path or os.path.join(task_dir, SEGMENT_LIST_NAME)
+        self.poll_interval = poll_interval
+        self._offset = 0
+        self._partial = ""
+        self._seen = set()
+        self._stop = threading.Event()
+        self._scan_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name=f"segwatch-{task_id}", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop watching and pick up any segment ffmpeg closed while shutting down.
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._scan()
+
+    def _run(self):
+        logger.info(f"[{self.task_id}] 👀 Segment watcher started on {self.list_path}")
+        while not self._stop.is_set():
+            try:
+                self._scan()
+            except Exception as e:
+                logger.warning(f"[{self.task_id}] Segment watcher error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _scan(self):
+        with self._scan_lock:
+            try:
+                if os.path.getsize(self.list_path) <= self._offset:
+                    return
+                with open(self.list_path, "r") as f:
+                    f.seek(self._offset)
+                    chunk = f.read()
+                    self._offset = f.tell()
+            except FileNotFoundError:
+                return
+
+            data = self._partial + chunk
+            lines = data.split("\n")
+            # The last element is either "" or a line ffmpeg is still writing
+            self._partial = lines.pop()
+
+            for row in csv.reader(lines):
+                if row:
+                    self._dispatch(row)
+
+    def _dispatch(self, row):
+        name = row[0]
+        start = float(row[1]) if len(row) > 1 and row[1] else None
+        end = float(row[2]) if len(row) > 2 and row[2] else None
+        path = name if os.path.isabs(name) else os.path.join(self.task_dir, name)
+        try:
+            idx = segment_index(path)
+        except (IndexError, ValueError):
+            logger.warning(f"[{self.task_id}] Unexpected segment name: {name}")
+            return
+        if idx in self._seen:
+            return
+        self._seen.add(idx)
+
+        logger.info(f"[{self.task_id}] ⚡ Segmento completado detectado: {path}")
+        try:
+            self.on_segment(path, idx, start, end)
+        except Exception as e:
+            logger.error(f"[{self.task_id}] ❌ Error dispatching segment {idx}: {e}")
@@ -0,0 +1,140 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from libot.logger import logger
+from libot.config import SEGMENT_SECONDS
+
+_CONVERSATION = re.compile(r'\{\s*"conversation"\s*:\s*\[')
+_SEPARATORS = " \t\r\n,"
+_decoder = json.JSONDecoder()
+
+
+@dataclass
+class Turn:
+    """
+    One speaker turn on the meeting timeline (``start`` in seconds from
+    the beginning of the recording, None when unknown).
+    """
+
+    speaker: str
+    text: str
+    start: float | None = None
+    segment: int | None = None
+
+
+def transcript_index(name: str) -> int:
+    """
+    Segment index of a transcript file, e.g. ``task_12.json`` -> 12.
+    """
+    return int(os.path.splitext(os.path.basename(name))[0].rsplit("_", 1)[1])
+
+
+def decode_document(document) -> str:
+    """
+    Transcription files hold the model's JSON text dumped once more as a
+    JSON string; both forms are accepted.
+    """
+    if isinstance(document, bytes):
+        document = document.decode("utf-8")
+    if document.lstrip().startswith('"'):
+        document = json.loads(document)
+    return document
+
+
+def iter_conversation(document) -> Iterator[dict]:
+    """
+    Yields the turns of a ``{"conversation": [...]}`` document one by one
+    without building the whole list.
+    """
+    text = decode_document(document)
+    match = _CONVERSATION.match(text.lstrip())
+    if not match:
+        # Unusual key order or layout: fall back to a full parse
+        data = json.loads(text)
+        yield from (data.get("conversation") or []) if isinstance(data, dict) else []
+        return
+
+    pos = len(text) - len(text.lstrip()) + match.end()
+    while True:
+        while pos < len(text) and text[pos] in _SEPARATORS:
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            return
+        turn, pos = _decoder.raw_decode(text, pos)
+        if isinstance(turn, dict):
+            yield turn
+
+
+def iter_turns(
+    documents: Iterable[tuple[int, str]],
+    offsets: dict | None = None,
+    segment_seconds: float = float(SEGMENT_SECONDS),
+) -> Iterator[Turn]:
+    """
+    Turns of every segment on the meeting timeline. ``documents`` must come
+    in segment order; a segment starts at ``offsets[idx]`` when known,
+    otherwise at ``idx * segment_seconds``.
+    """
+    offsets = offsets or {}
+    for idx, document in documents:
+        offset = offsets.get(idx)
+        if offset is None:
+            offset = idx * segment_seconds
+        try:
+            for turn in iter_conversation(document):
+                text = str(turn.get("text") or "").strip()
+                if not text:
+                    continue
+                start = turn.get("start")
+                yield Turn(
+                    speaker=str(turn.get("speaker") or "").strip(),
+                    text=text,
+                    start=offset + start if isinstance(start, (int, float)) else None,
+                    segment=idx,
+                )
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"📝 Skipping unreadable transcript of segment {idx}: {e}")
+
+
+def coalesce(turns: Iterable[Turn]) -> Iterator[Turn]:
+    """
+    Merges consecutive turns of the same speaker, keeping the first start.
+    """
+    current = None
+    for turn in turns:
+        if current is not None and turn.speaker == current.speaker:
+            current.text = f"{current.text} {turn.text}"
+            continue
+        if current is not None:
+            yield current
+        current = Turn(turn.speaker, turn.text, turn.start, turn.segment)
+    if current is not None:
+        yield current
+
+
+def _timestamp(seconds: float | None) -> str:
+    if seconds is None:
+        return ""
+    seconds = int(seconds)
+    return f"[{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}] "
+
+
+def render(turns: Iterable[Turn]) -> Iterator[str]:
+    for turn in turns:
+        speaker = f"{turn.speaker}: " if turn.speaker else ""
+        yield f"{_timestamp(turn.start)}{speaker}{turn.text}"
+
+
+def merge_transcript(
+    documents: Iterable[tuple[int, str]],
+    offsets: dict | None = None,
+    segment_seconds: float = float(SEGMENT_SECONDS),
+) -> str:
+    """
+    Compact plain-text transcript of the meeting, one line per turn:
+    ``[hh:mm:ss] Speaker: text``. Documents are consumed one at a time.
+    """
+    return "\n".join(render(coalesce(iter_turns(documents, offsets, segment_seconds))))
@@ -0,0 +1,179 @@
+import hashlib
+import os
+import shutil
+import threading
+
+from libot.logger import logger
+from libot.config import (
+    OUTPUT_DIR,
+    GCS_BUCKET,
+    GCS_PREFIX,
+    TRANSCRIPTION_CACHE_MAX_MB,
+    TRANSCRIPTION_CACHE_SHARED,
+)
+from libot.clients import get_bucket
+
+READ_BLOCK = 2**20
+# Folder of the shared tier under GCS_PREFIX
+CACHE_FOLDER = "transcription_cache"
+
+
+def cache_namespace(*parts: str) -> str:
+    """
+    Short hash of everything besides the audio that shapes a transcript
+    (model, prompt, schema). Changing any of them starts a new namespace.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def file_key(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Content-addressed cache of segment transcripts.
+
+    Entries are keyed by the SHA-256 of the compressed segment inside a
+    namespace derived from the model and prompt/schema. The local tier
+    lives under OUTPUT_DIR and is trimmed to ``max_bytes`` (least recently
+    used first); the shared tier is a GCS prefix, so retries and
+    reprocessing on other machines hit it too. Local entries from other
+    namespaces are dropped when the cache is created.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        root: str = os.path.join(OUTPUT_DIR, ".transcription_cache"),
+        max_bytes: int = TRANSCRIPTION_CACHE_MAX_MB * 2**20,
+        bucket=None,
+        prefix: str = f"{GCS_PREFIX}/{CACHE_FOLDER}" if GCS_PREFIX else CACHE_FOLDER,
+    ):
+        self.namespace = namespace
+        self.root = root
+        self.dir = os.path.join(root, namespace)
+        self.max_bytes = max_bytes
+        self.bucket = bucket
+        self.prefix = f"{prefix}/{namespace}"
+        self._lock = threading.Lock()
+        os.makedirs(self.dir, exist_ok=True)
+        self.invalidate_stale()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.dir, f"{key}.json")
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)  # recency for eviction
+            return text
+        except FileNotFoundError:
+            pass
+
+        if self.bucket is None:
+            return None
+        try:
+            blob = self.bucket.blob(f"{self.prefix}/{key}.json")
+            if not blob.exists():
+                return None
+            text = blob.download_as_bytes().decode("utf-8")
+        except Exception as e:
+            logger.warning(f"🗃️ Shared transcription cache unavailable: {e}")
+            return None
+        self._write_local(key, text)
+        return text
+
+    def put(self, key: str, text: str):
+        self._write_local(key, text)
+        if self.bucket is None:
+            return
+        try:
+            self.bucket.blob(f"{self.prefix}/{key}.json").upload_from_string(
+                text, content_type="application/json"
+            )
+        except Exception as e:
+            logger.warning(f"🗃️ Could not store transcript in the shared cache: {e}")
+
+    def _write_local(self, key: str, text: str):
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        """
+        Deletes the least recently used local entries beyond ``max_bytes``.
+        """
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.dir):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+
+    def invalidate_stale(self):
+        """
+        Drops local entries written under another model or schema.
+        """
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and entry.name != self.namespace:
+                logger.info(f"🗃️ Dropping stale transcription cache {entry.name}")
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def invalidate_shared(self):
+        """
+        Deletes every shared entry outside the current namespace.
+        """
+        if self.bucket is None:
+            return
+        base = self.prefix.rsplit("/", 1)[0] + "/"
+        stale = [
+            blob
+            for blob in self.bucket.list_blobs(prefix=base)
+            if not blob.name.startswith(self.prefix + "/")
+        ]
+        if stale:
+            self.bucket.delete_blobs(stale, on_error=lambda blob: None)
+            logger.info(f"🗃️ Deleted {len(stale)} stale shared cache entries")
+
+    def clear(self):
+        """
+        Empties the local tier of the current namespace.
+        """
+        shutil.rmtree(self.dir, ignore_errors=True)
+        os.makedirs(self.dir, exist_ok=True)
+
+
+_cache: TranscriptionCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache(namespace: str) -> TranscriptionCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None or _cache.namespace != namespace:
+            bucket = get_bucket(GCS_BUCKET) if GCS_BUCKET and TRANSCRIPTION_CACHE_SHARED else None
+            _cache = TranscriptionCache(namespace, bucket=bucket)
+        return _cache
@@ -0,0 +1,98 @@
+import threading
+
+from libot.transcript_merge import merge_transcript
+
+
+class TranscriptStore:
+    """
+    Segment transcripts of one task, filled as each transcription lands.
+
+    The pipeline registers every segment it expects a transcript for and
+    resolves the ones that will never have one (silent or failed), so the
+    briefing can tell whether the local data is complete without asking GCS.
+    """
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self._lock = threading.Lock()
+        self._texts = {}
+        self._expected = set()
+        self._resolved = set()
+        self._offsets = {}
+        self._listeners = []
+
+    def subscribe(self, callback):
+        """
+        Calls ``callback()`` whenever a segment is added or resolved.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def _notify(self):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback()
+
+    def expect(self, idx: int, start: float | None = None):
+        """
+        Registers a segment; ``start`` is its offset in the recording.
+        """
+        with self._lock:
+            self._expected.add(idx)
+            if start is not None:
+                self._offsets[idx] = start
+
+    def resolve(self, idx: int):
+        """
+        Marks a segment that will not produce a transcript.
+        """
+        with self._lock:
+            self._resolved.add(idx)
+        self._notify()
+
+    def add(self, idx: int, text: str):
+        with self._lock:
+            self._texts[idx] = text
+            self._resolved.add(idx)
+        self._notify()
+
+    def missing(self) -> list[int]:
+        with self._lock:
+            return sorted(self._expected - self._resolved)
+
+    def complete(self) -> bool:
+        """
+        True when every expected segment is accounted for. A store with no
+        expectations (e.g. after a restart) is never complete.
+        """
+        with self._lock:
+            return bool(self._expected) and self._expected <= self._resolved
+
+    def items(self) -> list[tuple[int, str]]:
+        with self._lock:
+            return sorted(self._texts.items())
+
+    def offsets(self) -> dict:
+        with self._lock:
+            return dict(self._offsets)
+
+    def transcript(self) -> str:
+        return merge_transcript(self.items(), self.offsets())
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(task_id: str) -> TranscriptStore:
+    with _stores_lock:
+        store = _stores.get(task_id)
+        if store is None:
+            store = _stores[task_id] = TranscriptStore(task_id)
+        return store
+
+
+def release_store(task_id: str):
+    with _stores_lock:
+        _stores.pop(task_id, None)
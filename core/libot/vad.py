@@ -0,0 +1,231 @@
+import json
+import subprocess
+import wave
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import numpy as np
+
+from libot import audiobuf
+from libot.compress import (
+    TRANSCRIPTION_SAMPLE_RATE,
+    is_transcription_ready,
+)
+from libot.config import (
+    VAD_THRESHOLD_DBFS,
+    VAD_MIN_SILENCE_SECONDS,
+    VAD_PADDING_SECONDS,
+    VAD_MIN_SPEECH_SECONDS,
+)
+
+VAD_FRAME_MS = 30
+# Segments are read this many VAD frames at a time (~3 s)
+BLOCK_VAD_FRAMES = 100
+# Below this share of removable silence the segment is sent untouched
+MIN_TRIM_RATIO = 0.1
+
+
+class OffsetMap:
+    """
+    Maps times in a trimmed segment back to the original segment.
+
+    Each span is (trimmed_start, original_start, duration) in seconds.
+    """
+
+    def __init__(self, spans=None):
+        self.spans = list(spans or [])
+
+    def to_original(self, t: float) -> float:
+        for trimmed_start, original_start, duration in self.spans:
+            if t < trimmed_start + duration:
+                return original_start + max(0.0, t - trimmed_start)
+        if not self.spans:
+            return t
+        trimmed_start, original_start, duration = self.spans[-1]
+        return original_start + (t - trimmed_start)
+
+    def to_json(self) -> str:
+        return json.dumps({"spans": self.spans})
+
+    @classmethod
+    def from_json(cls, data: str) -> "OffsetMap":
+        return cls([tuple(s) for s in json.loads(data)["spans"]])
+
+    @classmethod
+    def from_regions(cls, regions) -> "OffsetMap":
+        spans, cursor = [], 0.0
+        for start, end in regions:
+            spans.append((cursor, start, end - start))
+            cursor += end - start
+        return cls(spans)
+
+
+@dataclass
+class VadResult:
+    duration: float
+    regions: list = field(default_factory=list)
+    trimmed_path: str | None = None
+    offset_map: OffsetMap | None = None
+
+    @property
+    def speech_seconds(self) -> float:
+        return sum(end - start for start, end in self.regions)
+
+    @property
+    def silent(self) -> bool:
+        return self.speech_seconds < VAD_MIN_SPEECH_SECONDS
+
+
+class _Source:
+    """
+    A segment read block by block: WAVs through the libot.audiobuf memory
+    map at their own rate, compressed captures decoded by ffmpeg to 16 kHz
+    mono as a stream. Blocks are int16 (frames, channels) arrays.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.wav = None if is_transcription_ready(path) else audiobuf.open_wav(path)
+        self.rate = self.wav.rate if self.wav else TRANSCRIPTION_SAMPLE_RATE
+        self.channels = self.wav.channels if self.wav else 1
+
+    def blocks(self, block_frames: int) -> Iterator[np.ndarray]:
+        if self.wav is not None:
+            yield from self.wav.iter_blocks(block_frames)
+            return
+
+        proc = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-i",
+                self.path,
+                "-f",
+                "s16le",
+                "-ac",
+                "1",
+                "-ar",
+                str(TRANSCRIPTION_SAMPLE_RATE),
+                "pipe:1",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while data := proc.stdout.read(block_frames * 2):
+                yield np.frombuffer(data[: len(data) - len(data) % 2], dtype="<i2").reshape(-1, 1)
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, "ffmpeg")
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+
+
+def frame_levels(source: _Source, frame: int) -> tuple[np.ndarray, int]:
+    """
+    dBFS of every ``frame``-sample VAD frame and the segment's length in
+    samples. Only the per-frame levels are kept, never the audio.
+    """
+    levels, frames = [], 0
+    for block in source.blocks(frame * BLOCK_VAD_FRAMES):
+        frames += len(block)
+        levels.append(audiobuf.rms_windows(audiobuf.to_mono(block), frame))
+    if not levels:
+        return np.zeros(0), 0
+    return audiobuf.to_dbfs(np.concatenate(levels)), frames
+
+
+def detect_speech(
+    samples: np.ndarray,
+    rate: int = TRANSCRIPTION_SAMPLE_RATE,
+    threshold_dbfs: float = VAD_THRESHOLD_DBFS,
+    min_silence: float = VAD_MIN_SILENCE_SECONDS,
+    padding: float = VAD_PADDING_SECONDS,
+) -> list:
+    """
+    Energy-based voice activity detection.
+
+    Returns (start, end) speech regions in seconds. Gaps shorter than
+    ``min_silence`` are bridged and every region is padded by ``padding``.
+    """
+    frame = rate * VAD_FRAME_MS // 1000
+    db = audiobuf.to_dbfs(audiobuf.rms_windows(samples, frame))
+    return speech_regions(db, len(samples) / rate, threshold_dbfs, min_silence, padding)
+
+
+def speech_regions(
+    db: np.ndarray,
+    duration: float,
+    threshold_dbfs: float = VAD_THRESHOLD_DBFS,
+    min_silence: float = VAD_MIN_SILENCE_SECONDS,
+    padding: float = VAD_PADDING_SECONDS,
+) -> list:
+    """
+    Speech regions from per-frame levels (one every VAD_FRAME_MS).
+    """
+    voiced = np.flatnonzero(db > threshold_dbfs)
+    if not len(voiced):
+        return []
+
+    frame_s = VAD_FRAME_MS / 1000
+    # Split voiced frames into runs wherever the gap is long enough
+    breaks = np.flatnonzero(np.diff(voiced) * frame_s > min_silence)
+    starts = np.concatenate([[voiced[0]], voiced[breaks + 1]])
+    ends = np.concatenate([voiced[breaks], [voiced[-1]]]) + 1
+
+    regions = []
+    for s, e in zip(starts * frame_s, ends * frame_s):
+        s, e = max(0.0, s - padding), min(duration, e + padding)
+        if regions and s <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], e)
+        else:
+            regions.append((float(s), float(e)))
+    return regions
+
+
+def _write_regions(source: _Source, regions, out_path: str):
+    """
+    Copies the speech regions of the source into a WAV of the same rate
+    and channels, one block at a time.
+    """
+    rate = source.rate
+    spans = [(int(start * rate), int(end * rate)) for start, end in regions]
+    with wave.open(out_path, "wb") as w:
+        w.setnchannels(source.channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        pos = 0
+        for block in source.blocks(rate * BLOCK_VAD_FRAMES * VAD_FRAME_MS // 1000):
+            end = pos + len(block)
+            for start, stop in spans:
+                lo, hi = max(start, pos), min(stop, end)
+                if lo < hi:
+                    w.writeframes(block[lo - pos : hi - pos].astype("<i2").tobytes())
+            pos = end
+
+
+def gate_segment(path: str, trimmed_path: str) -> VadResult:
+    """
+    Runs VAD on a segment. Fully silent segments come back with ``silent``
+    set; segments with enough removable silence get a trimmed WAV (same
+    rate and channels as the source) at ``trimmed_path`` plus the OffsetMap
+    back to the original timing.
+    """
+    source = _Source(path)
+    db, frames = frame_levels(source, source.rate * VAD_FRAME_MS // 1000)
+    result = VadResult(duration=frames / source.rate if source.rate else 0.0)
+    result.regions = speech_regions(db, result.duration)
+
+    if result.silent or not result.duration:
+        return result
+
+    removed = result.duration - result.speech_seconds
+    if removed / result.duration >= MIN_TRIM_RATIO:
+        _write_regions(source, result.regions, trimmed_path)
+        result.trimmed_path = trimmed_path
+        result.offset_map = OffsetMap.from_regions(result.regions)
+    return result
@@ -0,0 +1,64 @@
+"""
+Re-transcribes and re-briefs historical meetings stored under GCS_PREFIX,
+skipping tasks whose outputs are already up to date.
+
+    GCS_BUCKET=my-bucket uv run reprocess_main.py [--tasks T ...] [--only transcribe|brief]
+        [--workers N] [--rate-per-minute N] [--force] [--dry-run] [--send-email]
+        [--invalidate-cache]
+
+Honours STORAGE_EMULATOR_HOST (local GCS) and GEMINI_BASE_URL (e.g.
+tests/fake_gemini.py).
+"""
+
+import argparse
+import os
+
+# libot.config refuses to import without a meeting URL
+os.environ.setdefault("MEETING_URL", "https://teams.microsoft.com/l/meetup-join/reprocess")
+
+from libot.config import GEMINI_RATE_PER_MINUTE
+from libot.gemini import CACHE_NAMESPACE
+from libot.reprocess import reprocess
+from libot.scheduler import TranscriptionScheduler, set_scheduler
+from libot.transcription_cache import get_cache
+
+
+def reprocess_main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", nargs="*", help="task ids (default: every task in the bucket)")
+    parser.add_argument("--only", choices=["transcribe", "brief"], help="run a single stage")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate-per-minute", type=float, default=GEMINI_RATE_PER_MINUTE,
+                        help="Gemini requests per minute for the whole batch")
+    parser.add_argument("--force", action="store_true", help="redo up-to-date outputs too")
+    parser.add_argument("--dry-run", action="store_true", help="only report what is out of date")
+    parser.add_argument("--send-email", action="store_true", help="email the new briefings")
+    parser.add_argument(
+        "--invalidate-cache",
+        action="store_true",
+        help="first delete transcription cache entries (local and shared) of other models/prompts",
+    )
+    args = parser.parse_args()
+
+    if args.invalidate_cache:
+        cache = get_cache(CACHE_NAMESPACE)
+        cache.invalidate_stale()
+        cache.invalidate_shared()
+
+    set_scheduler(
+        TranscriptionScheduler(rate_per_minute=args.rate_per_minute, max_concurrent=args.workers)
+    )
+    summary = reprocess(
+        tasks=args.tasks,
+        transcribe=args.only in (None, "transcribe"),
+        brief=args.only in (None, "brief"),
+        force=args.force,
+        workers=args.workers,
+        send=args.send_email,
+        dry_run=args.dry_run,
+    )
+    print(summary)
+
+
+if __name__ == "__main__":
+    reprocess_main()
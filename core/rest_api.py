@@ -1,6 +1,8 @@
 import os
 from flask import Flask
 from libot.routes import api
+from libot.browser_pool import init_pool
+from libot.resources import init_allocator
 from libot.config import DISPLAY_NUM
 from libot.logger import logger
 
@@ -23,6 +25,8 @@ def start_app():
     logger.info("-" * 80)
     logger.info(f"🚀 Service starting on port {PORT}")
     logger.info("-" * 80)
+    init_allocator()
+    init_pool()
     app.run(host="0.0.0.0", port=PORT)
 
 
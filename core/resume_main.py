@@ -0,0 +1,18 @@
+from libot.logger import _log_end_job, _log_start_job
+from libot.resume import resume_task
+from libot.config import TASK_ID
+
+
+def resume_main():
+    """
+    Finishes a crashed task (TASK_ID) from its manifest.
+    """
+    _log_start_job(TASK_ID)
+
+    resume_task(TASK_ID)
+
+    _log_end_job(TASK_ID)
+
+
+if __name__ == "__main__":
+    resume_main()
@@ -1,6 +1,12 @@
+import os
+import tempfile
 from pathlib import Path
 import pytest
 
+# libot.config needs these at import time
+os.environ.setdefault("MEETING_URL", "https://teams.microsoft.com/l/meetup-join/test")
+os.environ.setdefault("OUTPUT_DIR", tempfile.mkdtemp(prefix="libot_tests_"))
+
 
 @pytest.fixture(scope="session")
 def fixtures_dir() -> Path:
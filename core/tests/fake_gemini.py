@@ -0,0 +1,173 @@
+"""
+Minimal stand-in for the Gemini API (file upload + generateContent) that
+can inject errors and latency. Point the client at it with GEMINI_BASE_URL.
+
+    python tests/fake_gemini.py [port] [error_rate] [latency_s]
+"""
+
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_TRANSCRIPT = {"conversation": [{"speaker": "A", "text": "fake transcript", "start": 0}]}
+
+
+def _error_body(code: int, retry_delay: float) -> dict:
+    status = "RESOURCE_EXHAUSTED" if code == 429 else "UNAVAILABLE"
+    return {
+        "error": {
+            "code": code,
+            "message": f"injected {code}",
+            "status": status,
+            "details": [
+                {
+                    "@type": "type.googleapis.com/google.rpc.RetryInfo",
+                    "retryDelay": f"{retry_delay}s",
+                }
+            ],
+        }
+    }
+
+
+class FakeGemini:
+    """
+    ``fail_next`` is a list of status codes returned (in order) by the next
+    requests; ``error_rate`` injects 429s at random; ``latency`` delays
+    every response. ``respond(request_json)`` builds the model's text.
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_delay = 0.01
+        self.fail_next = []
+        self.respond = lambda request: json.dumps(DEFAULT_TRANSCRIPT)
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._random = random.Random(seed)
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGemini":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _injected_error(self) -> int | None:
+        with self._lock:
+            if self.fail_next:
+                return self.fail_next.pop(0)
+            if self.error_rate and self._random.random() < self.error_rate:
+                return 429
+        return None
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, code: int, body: dict, headers: dict | None = None):
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with fake._lock:
+                    fake.requests.append(self.path)
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                # Counted before the response goes out, as the client can
+                # send its next request as soon as it reads this one
+                try:
+                    if fake.latency:
+                        time.sleep(fake.latency)
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+                self._route(body)
+
+            def _route(self, body: bytes):
+                path = self.path.split("?")[0]
+                # Chunk transfers of an upload session are never failed
+                if path.startswith("/upload-session/"):
+                    command = self.headers.get("X-Goog-Upload-Command", "")
+                    if "finalize" not in command:
+                        self._send(200, {}, {"x-goog-upload-status": "active"})
+                        return
+                    name = f"files/{path.rsplit('/', 1)[-1]}"
+                    self._send(
+                        200,
+                        {
+                            "file": {
+                                "name": name,
+                                "uri": f"{fake.url}/v1beta/{name}",
+                                "mimeType": "audio/mpeg",
+                                "state": "ACTIVE",
+                            }
+                        },
+                        {"x-goog-upload-status": "final"},
+                    )
+                    return
+
+                code = fake._injected_error()
+                if code:
+                    self._send(code, _error_body(code, fake.retry_delay))
+                    return
+
+                if path.endswith("/files") and path.startswith("/upload/"):
+                    session = f"{fake.url}/upload-session/{next(fake._ids)}"
+                    self._send(200, {}, {"x-goog-upload-url": session})
+                elif path.endswith(":generateContent"):
+                    text = fake.respond(json.loads(body or b"{}"))
+                    self._send(
+                        200,
+                        {
+                            "candidates": [
+                                {
+                                    "content": {"role": "model", "parts": [{"text": text}]},
+                                    "finishReason": "STOP",
+                                }
+                            ]
+                        },
+                    )
+                else:
+                    self._send(404, {"error": {"code": 404, "message": path, "status": "NOT_FOUND"}})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8089
+    error_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    fake = FakeGemini(port, latency=latency, error_rate=error_rate).start()
+    print(f"Fake Gemini on {fake.url} (error_rate={error_rate}, latency={latency}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
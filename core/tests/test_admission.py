@@ -0,0 +1,157 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from libot import admission
+from libot.admission import AdmissionController, CpuUsage, measure_headroom
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def blocking_runner(order, name, release):
+    def run():
+        order.append(name)
+        release.wait(5)
+
+    return run
+
+
+def test_queues_over_limit_by_start_time_and_rejects_when_full() -> None:
+    controller = AdmissionController(max_concurrent=1, queue_size=2, headroom=lambda: 10)
+    release = threading.Event()
+    order = []
+
+    first = controller.submit("a", "url", blocking_runner(order, "a", release))
+    late = controller.submit("late", "url", blocking_runner(order, "late", release), start_at=2000)
+    early = controller.submit("early", "url", blocking_runner(order, "early", release), start_at=1000)
+    rejected = controller.submit("x", "url", blocking_runner(order, "x", release))
+
+    assert first.status == "running"
+    assert (early.status, early.queue_position) == ("queued", 1)
+    assert (late.status, late.queue_position) == ("queued", 2)
+    assert rejected.status == "rejected"
+    assert controller.registry.get("late") is late
+
+    release.set()
+    assert wait_for(lambda: late.status == "finished")
+    assert order == ["a", "early", "late"]
+    assert late.queue_position is None
+
+
+def test_no_headroom_keeps_tasks_queued(monkeypatch) -> None:
+    monkeypatch.setattr(admission, "get_allocator", lambda: SimpleNamespace(slots=4))
+    headroom = {"value": 0}
+    controller = AdmissionController(
+        max_concurrent=4, queue_size=4, headroom=lambda: headroom["value"]
+    )
+    release = threading.Event()
+    ran = threading.Event()
+
+    # An idle service takes one task whatever the headroom says
+    first = controller.submit("a", "url", lambda: release.wait(5))
+    record = controller.submit("b", "url", ran.set)
+    assert first.status == "running"
+    assert record.status == "queued"
+
+    headroom["value"] = 2
+    controller.submit("c", "url", lambda: None)
+    assert wait_for(ran.is_set)
+    release.set()
+
+
+def test_shared_layout_records_one_task_at_a_time(monkeypatch) -> None:
+    monkeypatch.setattr(admission, "get_allocator", lambda: None)
+    controller = AdmissionController(max_concurrent=4, queue_size=4, headroom=lambda: 10)
+    release = threading.Event()
+
+    first = controller.submit("a", "url", lambda: release.wait(5))
+    second = controller.submit("b", "url", lambda: None)
+    assert (first.status, second.status) == ("running", "queued")
+
+    release.set()
+    assert wait_for(lambda: second.status == "finished")
+
+
+def test_cpu_usage_is_the_cgroup_counter_delta(tmp_path, monkeypatch) -> None:
+    stat = tmp_path / "cpu.stat"
+    clock = {"now": 100.0}
+    monkeypatch.setattr(admission.time, "monotonic", lambda: clock["now"])
+    usage = CpuUsage(str(stat))
+
+    stat.write_text("usage_usec 5000000\nuser_usec 4000000\n")
+    assert usage() == 0.0
+    # 3 cores busy for 2 seconds
+    clock["now"] += 2
+    stat.write_text("usage_usec 11000000\nuser_usec 9000000\n")
+    assert usage() == 3.0
+    # Too soon for a new sample: keep the last reading
+    clock["now"] += 0.1
+    stat.write_text("usage_usec 11050000\n")
+    assert usage() == 3.0
+
+    assert CpuUsage(str(tmp_path / "missing"))() is None
+
+
+def test_headroom_compares_container_usage_with_its_quota(monkeypatch) -> None:
+    monkeypatch.setattr(admission, "cpu_capacity", lambda: 4.0)
+    monkeypatch.setattr(admission, "memory_available_mb", lambda: 8192)
+    # The host's load average is not this container's
+    monkeypatch.setattr(admission.os, "getloadavg", lambda: (64.0, 64.0, 64.0))
+
+    assert measure_headroom(1.0, 1024, cpu_usage=lambda: 1.5) == 2
+    assert measure_headroom(1.0, 1024, cpu_usage=lambda: 5.0) == 0
+    assert measure_headroom(1.0, 1024, cpu_usage=lambda: None) == 0
+
+
+def test_failed_runner_is_recorded() -> None:
+    controller = AdmissionController(max_concurrent=1, queue_size=1, headroom=lambda: 1)
+
+    def boom():
+        raise RuntimeError("chrome died")
+
+    record = controller.submit("a", "url", boom)
+    assert wait_for(lambda: record.status == "failed")
+    assert record.error == "chrome died"
+
+
+def test_runner_reporting_failure_is_recorded() -> None:
+    controller = AdmissionController(max_concurrent=1, queue_size=1, headroom=lambda: 1)
+
+    # record_task logs its own errors (e.g. the join failed) and returns False
+    record = controller.submit("a", "url", lambda: False)
+    assert wait_for(lambda: record.status == "failed")
+    assert record.error
+
+
+def test_trigger_and_task_status_routes(monkeypatch) -> None:
+    from flask import Flask
+    from libot import routes
+
+    controller = AdmissionController(max_concurrent=1, queue_size=1, headroom=lambda: 0)
+    monkeypatch.setattr(routes, "get_controller", lambda: controller)
+    monkeypatch.setattr(routes, "record_task", lambda *args: True)
+    release = threading.Event()
+    controller.submit("busy", "url", lambda: release.wait(5))
+    app = Flask(__name__)
+    app.register_blueprint(routes.api)
+    client = app.test_client()
+
+    resp = client.post("/", json={"url": "https://meeting", "start_time": "2030-01-01T10:00:00Z"})
+    assert resp.status_code == 202
+    body = resp.get_json()
+    assert (body["status"], body["queue_position"]) == ("queued", 1)
+
+    status = client.get(f"/tasks/{body['task_id']}").get_json()
+    assert status["status"] == "queued"
+    assert status["start_at"] == 1893492000.0
+
+    assert client.post("/", json={"url": "https://other"}).status_code == 429
+    assert client.get("/tasks/unknown").status_code == 404
+    release.set()
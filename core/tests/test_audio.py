@@ -0,0 +1,120 @@
+import subprocess
+
+from libot import audio
+from libot.audio import AudioRouter, parse_sink_inputs
+
+SINK_INPUTS = """Sink Input #12
+\tDriver: protocol-native.c
+\tOwner Module: 9
+\tClient: 31
+\tSink: 0
+\tMute: yes
+\tVolume: front-left: 42000 /  64% / -11.63 dB,   front-right: 42000 /  64% / -11.63 dB
+\t        balance 0.00
+\tProperties:
+\t\tapplication.name = "Chromium"
+\t\tmedia.name = "Playback"
+Sink Input #13
+\tDriver: protocol-native.c
+\tSink: 1
+\tMute: no
+\tVolume: front-left: 65536 / 100% / 0.00 dB,   front-right: 65536 / 100% / 0.00 dB
+\tProperties:
+\t\tapplication.name = "Chromium"
+"""
+
+SINKS = "0\tauto_null\tmodule-null-sink.c\ts16le 2ch 44100Hz\tIDLE\n1\tVirtualSpeaker\tmodule-null-sink.c\ts16le 2ch 48000Hz\tRUNNING\n"
+
+
+def test_parse_sink_inputs() -> None:
+    streams = parse_sink_inputs(SINK_INPUTS)
+    assert set(streams) == {"12", "13"}
+    assert streams["12"]["sink"] == "0"
+    assert streams["12"]["mute"] is True
+    assert streams["12"]["volumes"] == [64, 64]
+    assert streams["12"]["props"]["application.name"] == "Chromium"
+    assert streams["13"]["volumes"] == [100, 100]
+
+
+def test_router_only_fixes_what_is_off(monkeypatch) -> None:
+    calls = []
+
+    def fake_pactl(*args, capture=False):
+        calls.append(args)
+        out = {"sinks": SINKS, "sink-inputs": SINK_INPUTS}.get(args[1], "")
+        return subprocess.CompletedProcess(args, 0, stdout=out)
+
+    monkeypatch.setattr(audio, "_pactl", fake_pactl)
+    router = AudioRouter("task")
+    router.sync()
+
+    actions = [c for c in calls if c[0] != "list"]
+    assert actions == [
+        ("move-sink-input", "12", "VirtualSpeaker"),
+        ("set-sink-input-mute", "12", "0"),
+        ("set-sink-input-volume", "12", "100%"),
+    ]
+    assert router.routed.is_set()
+
+
+def test_router_acts_on_new_stream_events_only(monkeypatch) -> None:
+    calls = []
+    returncode = {"move-sink-input": 1}
+
+    def fake_pactl(*args, capture=False):
+        calls.append(args)
+        return subprocess.CompletedProcess(args, returncode.get(args[0], 0), stdout="")
+
+    monkeypatch.setattr(audio, "_pactl", fake_pactl)
+    router = AudioRouter("task")
+
+    router.handle_event("Event 'change' on sink-input #20\n")
+    router.handle_event("Event 'new' on source-output #21\n")
+    assert calls == []
+
+    # A failed move leaves the router unrouted
+    router.handle_event("Event 'new' on sink-input #20\n")
+    assert ("move-sink-input", "20", "VirtualSpeaker") in calls
+    assert not router.routed.is_set()
+
+    returncode.clear()
+    calls.clear()
+    router.handle_event("Event 'new' on sink-input #22\n")
+    assert calls == [
+        ("move-sink-input", "22", "VirtualSpeaker"),
+        ("set-sink-input-mute", "22", "0"),
+        ("set-sink-input-volume", "22", "100%"),
+    ]
+    assert router.routed.is_set()
+
+
+def test_router_undoes_drift_on_owned_streams(monkeypatch) -> None:
+    calls = []
+    listing = {"sink-inputs": SINK_INPUTS}
+
+    def fake_pactl(*args, capture=False):
+        calls.append(args)
+        out = {"sinks": SINKS, **listing}.get(args[1], "")
+        return subprocess.CompletedProcess(args, 0, stdout=out)
+
+    monkeypatch.setattr(audio, "_pactl", fake_pactl)
+    router = AudioRouter("task")
+    router.sync()
+
+    # Nothing drifted: the change is only re-checked
+    calls.clear()
+    router.handle_event("Event 'change' on sink-input #13\n")
+    assert [c for c in calls if c[0] != "list"] == []
+
+    # Something moved #13 back to the null sink
+    listing["sink-inputs"] = SINK_INPUTS.replace("Sink: 1", "Sink: 0")
+    calls.clear()
+    router.handle_event("Event 'change' on sink-input #13\n")
+    assert [c for c in calls if c[0] != "list"] == [("move-sink-input", "13", "VirtualSpeaker")]
+
+    # Streams the router never routed, or that are gone, are left alone
+    calls.clear()
+    router.handle_event("Event 'change' on sink-input #30\n")
+    router.handle_event("Event 'remove' on sink-input #13\n")
+    router.handle_event("Event 'change' on sink-input #13\n")
+    assert calls == []
@@ -0,0 +1,79 @@
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from libot import audiobuf
+
+
+def _write_wav(path: Path, frames: np.ndarray, rate: int = 48000) -> None:
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(frames.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(frames.astype("<i2").tobytes())
+
+
+def _tone(freq: float, seconds: float, rate: int, amplitude: float = 8000.0):
+    t = np.arange(int(seconds * rate)) / rate
+    return amplitude * np.sin(2 * np.pi * freq * t)
+
+
+def test_open_wav_maps_whole_frames(tmp_path: Path) -> None:
+    path = tmp_path / "audio_000.wav"
+    frames = np.stack([np.arange(100), -np.arange(100)], axis=1)
+    _write_wav(path, frames)
+    # A torn write leaves half a frame at the end
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+
+    buf = audiobuf.open_wav(str(path))
+
+    assert buf.channels == 2
+    assert buf.frames == 100
+    assert isinstance(buf.samples, np.memmap)
+    np.testing.assert_array_equal(buf.samples, frames)
+
+
+def test_to_mono_averages_channels() -> None:
+    stereo = np.array([[100, 300], [-200, 0]], dtype="<i2")
+    np.testing.assert_allclose(audiobuf.to_mono(stereo), [200.0, -100.0])
+
+
+@pytest.mark.parametrize("in_rate, out_rate", [(48000, 16000), (44100, 16000)])
+def test_resample_keeps_passband_and_length(in_rate: int, out_rate: int) -> None:
+    signal = _tone(440, 1.0, in_rate) + _tone(11000, 1.0, in_rate)
+
+    out = audiobuf.resample(signal, in_rate, out_rate)
+
+    assert len(out) == -(-len(signal) * out_rate // in_rate)
+    spectrum = np.abs(np.fft.rfft(out))
+    freqs = np.fft.rfftfreq(len(out), 1 / out_rate)
+    assert freqs[np.argmax(spectrum)] == pytest.approx(440, abs=2)
+    # 11 kHz is above the new Nyquist and must not alias back in
+    alias = out_rate - 11000
+    assert spectrum[np.argmin(np.abs(freqs - alias))] < 0.01 * spectrum.max()
+
+
+def test_streaming_resampler_matches_one_shot() -> None:
+    signal = _tone(300, 0.5, 48000)
+    resampler = audiobuf.PolyphaseResampler(48000, 16000)
+
+    parts = [resampler.process(signal[i : i + 1001]) for i in range(0, len(signal), 1001)]
+    parts.append(resampler.flush())
+
+    np.testing.assert_allclose(
+        np.concatenate(parts), audiobuf.resample(signal, 48000, 16000), atol=1e-2
+    )
+
+
+def test_level_windows() -> None:
+    signal = np.concatenate([np.zeros(1600), np.full(1600, 1000.0), np.ones(10)])
+
+    rms = audiobuf.rms_windows(signal, 1600)
+    peak = audiobuf.peak_windows(signal, 1600)
+
+    np.testing.assert_allclose(rms, [0.0, 1000.0])
+    np.testing.assert_allclose(peak, [0.0, 1000.0])
+    assert audiobuf.to_dbfs(rms)[0] == -np.inf
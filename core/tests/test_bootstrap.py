@@ -0,0 +1,34 @@
+import json
+import threading
+
+import pytest
+
+from libot.bootstrap import StartupTimeline
+
+
+def test_timeline_records_overlapping_steps(tmp_path) -> None:
+    timeline = StartupTimeline("task", str(tmp_path))
+
+    def background():
+        with timeline.step("audio_source"):
+            pass
+
+    t = threading.Thread(target=background, name="bootstrap-0")
+    with timeline.step("chrome_launch"):
+        t.start()
+        t.join()
+    with pytest.raises(RuntimeError):
+        with timeline.step("join"):
+            raise RuntimeError("boom")
+    timeline.mark("joined")
+    timeline.mark("joined")
+    timeline.save()
+
+    data = json.loads((tmp_path / "startup_timeline.json").read_text())
+    steps = {s["name"]: s for s in data["steps"]}
+    assert steps["audio_source"]["thread"] == "bootstrap-0"
+    assert steps["chrome_launch"]["start"] <= steps["audio_source"]["start"]
+    assert steps["chrome_launch"]["end"] >= steps["audio_source"]["end"]
+    assert steps["join"]["ok"] is False
+    assert list(data["marks"]) == ["joined"]
+    assert timeline.saved
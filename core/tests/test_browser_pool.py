@@ -0,0 +1,89 @@
+import time
+
+from libot.browser_pool import BrowserPool, WarmBrowser
+
+
+class FakeDriver:
+    def __init__(self):
+        self.current_url = "about:blank"
+        self.window_handles = ["main"]
+        self.quit_called = False
+        self.switch_to = self
+        self.cdp = []
+
+    def window(self, handle):
+        pass
+
+    def get(self, url):
+        self.current_url = url
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params.get("origin")))
+        return {}
+
+    def quit(self):
+        self.quit_called = True
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def make_pool(tmp_path, monkeypatch, **kwargs):
+    pool = BrowserPool(warm_url="", pool_dir=str(tmp_path), **kwargs)
+    launched = []
+
+    def fake_launch():
+        browser = WarmBrowser(FakeDriver(), str(tmp_path / f"slot{len(launched)}"))
+        launched.append(browser)
+        return browser
+
+    monkeypatch.setattr(pool, "_launch", fake_launch)
+    return pool, launched
+
+
+def test_pool_refills_after_acquire_and_replaces_on_release(tmp_path, monkeypatch) -> None:
+    pool, launched = make_pool(tmp_path, monkeypatch, size=1, max_uses=1)
+    pool.start()
+    assert wait_for(lambda: pool.idle() == 1)
+
+    browser = pool.acquire()
+    assert browser is launched[0]
+    assert wait_for(lambda: pool.idle() == 1)
+
+    pool.release(browser)
+    assert wait_for(lambda: browser.driver.quit_called)
+    assert pool.idle() == 1
+    pool.stop()
+
+
+def test_pool_recycles_browser_with_uses_left(tmp_path, monkeypatch) -> None:
+    pool, _ = make_pool(tmp_path, monkeypatch, size=1, max_uses=3)
+    browser = WarmBrowser(FakeDriver(), str(tmp_path / "used"))
+    browser.uses = 1
+    browser.driver.current_url = "https://meeting"
+
+    pool._recycle(browser)
+
+    assert pool.acquire() is browser
+    assert browser.uses == 2
+    assert not browser.driver.quit_called
+    assert browser.driver.current_url == "about:blank"
+
+
+def test_reset_clears_cookies_and_meeting_storage(tmp_path, monkeypatch) -> None:
+    pool, _ = make_pool(tmp_path, monkeypatch, size=1, max_uses=3)
+    driver = FakeDriver()
+    driver.current_url = "https://teams.microsoft.com/v2/?meetingjoin=true"
+
+    assert pool._reset(WarmBrowser(driver, str(tmp_path / "used")))
+
+    assert driver.cdp[0] == ("Network.clearBrowserCookies", None)
+    cleared = {origin for cmd, origin in driver.cdp if cmd == "Storage.clearDataForOrigin"}
+    assert "https://teams.microsoft.com" in cleared
+    assert "https://login.microsoftonline.com" in cleared
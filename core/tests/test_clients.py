@@ -0,0 +1,31 @@
+import pytest
+
+from libot import clients
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    clients.reset_clients()
+    yield
+    clients.reset_clients()
+
+
+def test_storage_client_is_shared_and_pooled(monkeypatch) -> None:
+    monkeypatch.setenv("STORAGE_EMULATOR_HOST", "http://127.0.0.1:4443")
+
+    client = clients.get_storage_client()
+    assert clients.get_storage_client() is client
+    assert clients.get_bucket("b") is clients.get_bucket("b")
+
+    adapter = client._http.get_adapter("https://storage.googleapis.com")
+    assert adapter._pool_maxsize == clients.HTTP_POOL_SIZE
+
+
+def test_gemini_client_needs_key_and_is_shared(monkeypatch) -> None:
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    assert clients.get_gemini_client() is None
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    client = clients.get_gemini_client()
+    assert client is not None
+    assert clients.get_gemini_client() is client
@@ -1,7 +1,16 @@
+import io
+import math
 import os
+import struct
+import wave
 from pathlib import Path
 from pydub import AudioSegment
-from libot.compress import compress_audio
+from libot.compress import (
+    compress_audio,
+    is_transcription_ready,
+    _ensure_whole_frames,
+    _stream_pcm,
+)
 
 import pytest
 
@@ -61,3 +70,47 @@ def test_compress_audio_bitrate_afecta_tamaño(
     size_192k = os.path.getsize(out_192k)
 
     assert size_64k < size_192k
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/tmp/task/audio_000.wav", False),
+        ("/tmp/task/audio_000.mp3", True),
+        ("/tmp/task/audio_000.ogg", True),
+        ("/tmp/task/AUDIO_001.MP3", True),
+    ],
+)
+def test_is_transcription_ready(path: str, expected: bool) -> None:
+    assert is_transcription_ready(path) is expected
+
+
+def _write_stereo_wav(path: Path, seconds: float, rate: int = 48000) -> None:
+    frames = b"".join(
+        struct.pack(
+            "<hh",
+            int(8000 * math.sin(2 * math.pi * 440 * i / rate)),
+            int(8000 * math.sin(2 * math.pi * 660 * i / rate)),
+        )
+        for i in range(int(seconds * rate))
+    )
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(frames)
+
+
+def test_stream_pcm_matches_pydub_downmix_and_resample(tmp_path: Path) -> None:
+    input_path = tmp_path / "audio_000.wav"
+    _write_stereo_wav(input_path, seconds=2.5)
+
+    expected = _ensure_whole_frames(AudioSegment.from_file(input_path))
+    expected = expected.set_channels(1).set_frame_rate(16000)
+
+    streamed = io.BytesIO()
+    with wave.open(str(input_path), "rb") as wav:
+        # Small blocks so the resampler state crosses many boundaries
+        _stream_pcm(wav, streamed, block_frames=1234)
+
+    assert streamed.getvalue() == expected.raw_data
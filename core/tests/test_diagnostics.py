@@ -0,0 +1,49 @@
+import base64
+import os
+
+from libot.diagnostics import ScreenshotRing, failure_reason
+
+
+class FakeDriver:
+    def __init__(self):
+        self.cdp_calls = []
+
+    def execute_script(self, script):
+        return [1920, 1080]
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_calls.append(params)
+        return {"data": base64.b64encode(b"jpeg-bytes").decode()}
+
+    def get_screenshot_as_png(self):
+        return b"png-bytes"
+
+
+def test_failure_reason() -> None:
+    assert failure_reason("1700000000_login_wall") == "login_wall"
+    assert failure_reason("controls_lost") == "controls_lost"
+    assert failure_reason("1700000000_loop") is None
+
+
+def test_ring_keeps_last_n_and_rate_caps(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr("libot.diagnostics.OUTPUT_DIR", str(tmp_path))
+    driver = FakeDriver()
+    ring = ScreenshotRing("task", size=3, min_interval=60, scale=0.5)
+
+    assert ring.capture(driver, "first")
+    assert not ring.capture(driver, "too_soon")
+    for i in range(4):
+        ring.capture(driver, f"forced_{i}", force=True)
+
+    assert driver.cdp_calls[0]["clip"]["scale"] == 0.5
+    assert list(tmp_path.iterdir()) == []
+
+    paths = ring.persist("fail_timeout", upload=False)
+
+    assert [os.path.basename(p).split("_", 2)[2] for p in paths] == [
+        "forced_1.jpg",
+        "forced_2.jpg",
+        "forced_3.jpg",
+    ]
+    assert open(paths[0], "rb").read() == b"jpeg-bytes"
+    assert ring.persist("fail_timeout", upload=False) == []
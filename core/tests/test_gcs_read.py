@@ -0,0 +1,90 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+
+from libot import gcs
+
+
+class FakeBlob:
+    def __init__(self, name, data, generation=1):
+        self.name = name
+        self.data = data
+        self.size = len(data)
+        self.generation = generation
+
+    def download_as_bytes(self):
+        # Later objects finish first, so order can only come from the reader
+        time.sleep(0.02 / (1 + len(self.name) % 5))
+        FakeBucket.active.append(threading.current_thread().name)
+        return self.data
+
+    def open(self, mode):
+        return io.BytesIO(self.data)
+
+
+class FakeBucket:
+    active = []
+
+    def __init__(self, blobs):
+        self.blobs = blobs
+
+    def list_blobs(self, prefix=None):
+        return [b for b in self.blobs if b.name.startswith(prefix or "")]
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    blobs = [FakeBlob(f"t/obj_{i}.json", f"secret-{i}".encode(), generation=i) for i in range(20)]
+    blobs += [FakeBlob("t/", b""), FakeBlob("t/notes.txt", b"x"), FakeBlob("t/big.json", b"B" * 64)]
+    bucket = FakeBucket(blobs)
+    FakeBucket.active = []
+    monkeypatch.setattr(gcs, "get_bucket", lambda name: bucket)
+    return bucket
+
+
+def test_reads_concurrently_in_a_stable_order(bucket, caplog) -> None:
+    with caplog.at_level("DEBUG"):
+        files = list(gcs.iter_bucket_files_bytes("b", prefix="t/", suffixes=".json", workers=4))
+
+    names = [name for name, _ in files]
+    assert names == sorted(names)
+    assert "t/notes.txt" not in names and "t/" not in names
+    assert dict(files)["t/obj_3.json"] == b"secret-3"
+    assert len(set(FakeBucket.active)) > 1
+    assert "secret" not in caplog.text
+
+
+def test_filters_by_generation_and_key(bucket) -> None:
+    files = list(
+        gcs.iter_bucket_files_bytes(
+            "b",
+            prefix="t/obj_",
+            min_generation=15,
+            key=lambda name: -int(name[6:-5]),
+        )
+    )
+    assert [name for name, _ in files] == [f"t/obj_{i}.json" for i in range(19, 14, -1)]
+
+
+def test_large_objects_are_streamed(bucket) -> None:
+    files = dict(gcs.iter_bucket_files_bytes("b", prefix="t/big", stream_threshold=32))
+    stream = files["t/big.json"]
+    assert not isinstance(stream, bytes)
+    assert stream.read() == b"B" * 64
+    assert FakeBucket.active == []
+
+
+def test_transcript_is_merged_in_segment_order(bucket, monkeypatch) -> None:
+    monkeypatch.setattr(gcs, "GCS_BUCKET", "b")
+    monkeypatch.setattr(gcs, "GCS_PREFIX", "")
+    for idx in (10, 2, 1):
+        turn = {"speaker": f"S{idx}", "text": f"seg{idx}", "start": 0}
+        document = json.dumps(json.dumps({"conversation": [turn]})).encode()
+        bucket.blobs.append(FakeBlob(f"task/transcriptions/task_{idx}.json", document))
+    bucket.blobs.append(FakeBlob("task/transcriptions/summary.json", b"{}"))
+
+    lines = gcs.fetch_transcriptions_from_gcs("task").splitlines()
+    assert [line.rsplit(" ", 1)[1] for line in lines] == ["seg1", "seg2", "seg10"]
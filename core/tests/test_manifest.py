@@ -0,0 +1,87 @@
+import json
+
+from libot import resume
+from libot.manifest import MANIFEST_NAME, TaskManifest, replay
+from libot.transcription_cache import file_key
+
+
+def _transcript(text: str) -> str:
+    return json.dumps({"conversation": [{"speaker": "A", "text": text, "start": 0}]})
+
+
+def test_manifest_survives_a_torn_line(tmp_path) -> None:
+    manifest = TaskManifest("t", str(tmp_path), mirror_interval=3600)
+    manifest.record("captured", 0, source="audio_000.wav", start=0.0)
+    manifest.record("compressed", 0, audio="audio_000.mp3", sha256="abc")
+    manifest.close()
+    with open(tmp_path / MANIFEST_NAME, "a") as f:
+        f.write('{"ts": 1, "stage": "uplo')  # crash mid-write
+
+    manifest = TaskManifest("t", str(tmp_path), mirror_interval=3600)
+    manifest.record("briefed")
+    manifest.close()
+
+    with open(tmp_path / MANIFEST_NAME) as f:
+        state = replay(f)
+    assert set(state.segments[0].stages) == {"captured", "compressed"}
+    assert state.segments[0].get("compressed", "sha256") == "abc"
+    assert "briefed" in state.events
+
+
+def test_resume_only_runs_missing_stages(monkeypatch, tmp_path) -> None:
+    task_id = "resume_task"
+    monkeypatch.setattr(resume, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(resume, "GCS_BUCKET", "bucket")
+    task_dir = tmp_path / task_id
+    (task_dir / "transcriptions").mkdir(parents=True)
+
+    # 0: finished, 1: uploaded but not transcribed, 2: only captured, 3: silent
+    mp3 = task_dir / "audio_001.mp3"
+    mp3.write_bytes(b"\xff\xfb" * 64)
+    (task_dir / "audio_002.wav").write_bytes(b"RIFF")
+    (task_dir / "transcriptions" / f"{task_id}_0.json").write_text(json.dumps(_transcript("zero")))
+    manifest = TaskManifest(task_id, str(task_dir), mirror_interval=3600)
+    for idx in range(4):
+        manifest.record("captured", idx, source=f"audio_{idx:03d}.wav", start=idx * 300.0)
+    manifest.record("compressed", 0, audio="audio_000.mp3", sha256="gone")
+    manifest.record("uploaded", 0, remote="audio_000.mp3")
+    manifest.record("transcribed", 0, chars=10)
+    manifest.record("compressed", 1, audio="audio_001.mp3", sha256=file_key(str(mp3)))
+    manifest.record("uploaded", 1, remote="audio_001.mp3")
+    manifest.record("dropped", 3)
+    manifest.close()
+
+    calls = []
+
+    def compress(segment):
+        calls.append(("compress", segment.index))
+        path = task_dir / f"audio_{segment.index:03d}.mp3"
+        path.write_bytes(b"\xff\xfb")
+        return str(path)
+
+    def transcribe(segment):
+        calls.append(("transcribe", segment.index))
+        text = _transcript(f"seg{segment.index}")
+        # as persist_transcription does
+        (task_dir / "transcriptions" / f"{task_id}_{segment.index}.json").write_text(json.dumps(text))
+        resume.get_store(task_id).add(segment.index, text)
+        return text
+
+    briefed = []
+    monkeypatch.setattr(resume, "compress_segment", compress)
+    monkeypatch.setattr(resume, "upload_segment", lambda s: calls.append(("upload", s.index)) or True)
+    monkeypatch.setattr(resume, "transcribe_segment", transcribe)
+    monkeypatch.setattr(resume, "download_from_gcs", lambda *args: False)
+    monkeypatch.setattr(
+        resume, "handle_briefing", lambda t: briefed.append(resume.get_store(t).transcript())
+    )
+
+    assert resume.resume_task(task_id)
+    assert sorted(calls) == [
+        ("compress", 2), ("transcribe", 1), ("transcribe", 2), ("upload", 2)
+    ]
+    assert briefed == ["[00:00:00] A: zero seg1 seg2"]
+
+    calls.clear()
+    assert resume.resume_task(task_id)
+    assert calls == [] and len(briefed) == 1
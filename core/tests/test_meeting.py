@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+
+from libot import meeting
+from libot.meeting import join_meeting
+
+# What the pre-join probe sees on Teams' pre-join screen: its "Chat" and
+# "People" buttons match the generic in-meeting labels
+PREJOIN = {
+    "loginWall": False,
+    "buttons": {"join": "button"},
+    "nameField": False,
+    "callControls": False,
+    "inMeeting": True,
+}
+IN_CALL = {"loginWall": False, "buttons": {}, "callControls": True, "inMeeting": True}
+
+
+class FakeDriver:
+    def __init__(self, probes):
+        self.probes = list(probes)
+
+    def execute_script(self, script, *args):
+        # The last probe repeats, as a page that stopped changing would
+        return self.probes.pop(0) if len(self.probes) > 1 else self.probes[0]
+
+
+@pytest.fixture
+def clicks(monkeypatch):
+    clicked = []
+    clock = {"now": 0.0}
+
+    def sleep(seconds):
+        clock["now"] += seconds
+
+    def safe_click(driver, tag, texts, task_id):
+        clicked.append(texts[0])
+        return True
+
+    monkeypatch.setattr(meeting, "time", SimpleNamespace(time=lambda: clock["now"], sleep=sleep))
+    monkeypatch.setattr(meeting, "take_screenshot", lambda *a, **kw: None)
+    monkeypatch.setattr(meeting, "safe_click", safe_click)
+    return clicked
+
+
+def test_generic_labels_before_join_are_not_the_meeting(clicks) -> None:
+    driver = FakeDriver([PREJOIN, IN_CALL])
+
+    assert join_meeting(driver, "task", max_wait=30)
+    assert clicks == ["Join now"]
+
+
+def test_prejoin_screen_alone_never_counts_as_joined(clicks) -> None:
+    prejoin = {**PREJOIN, "buttons": {}}
+
+    assert not join_meeting(FakeDriver([prejoin]), "task", max_wait=5)
+    assert clicks == []
+
+
+def test_login_wall_aborts_the_join(clicks) -> None:
+    login = {**PREJOIN, "loginWall": True}
+
+    assert not join_meeting(FakeDriver([login]), "task", max_wait=30)
+    assert clicks == []
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+from libot import monitor
+from libot.js_scripts import CHECK_TEXT_PRESENCE_JS, FIND_AND_CLICK_JS, MEETING_MONITOR_JS
+from libot.monitor import MeetingMonitor
+from libot.recorder import CONTROLS_LOST_SECONDS
+
+
+class FakeDriver:
+    """
+    Answers the in-page monitor with ``state`` (raised if it is an
+    exception) and the legacy probes with ``phrase`` and ``controls``.
+    """
+
+    def __init__(self, state=None, phrase=None, controls=(), hangup=False):
+        self.state = state
+        self.phrase = phrase
+        self.controls = set(controls)
+        self.hangup = hangup
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        if script is MEETING_MONITOR_JS:
+            if isinstance(self.state, Exception):
+                raise self.state
+            return self.state
+        if script is CHECK_TEXT_PRESENCE_JS:
+            return self.phrase
+        if script is FIND_AND_CLICK_JS:
+            return "found" if args[0][0] in self.controls else "not_found"
+        raise AssertionError("unexpected script")
+
+    def find_elements(self, by, value):
+        return ["hangup"] if self.hangup and value == "hangup-button" else []
+
+
+def test_maps_the_in_page_monitor_state() -> None:
+    driver = FakeDriver({"exitPhrase": "meeting ended", "controlsVisible": 1})
+
+    assert MeetingMonitor(driver, "task").read() == {
+        "exit_phrase": "meeting ended",
+        "controls_visible": True,
+    }
+    driver.state = {"exitPhrase": None, "controlsVisible": False}
+    assert MeetingMonitor(driver, "task").read() == {
+        "exit_phrase": None,
+        "controls_visible": False,
+    }
+    assert set(driver.scripts) == {MEETING_MONITOR_JS}
+
+
+def test_falls_back_to_legacy_probes() -> None:
+    # The monitor script raised (e.g. a navigation in progress)
+    driver = FakeDriver(
+        RuntimeError("no such window"), phrase="you were removed", controls={"Chat"}
+    )
+    assert MeetingMonitor(driver, "task").read() == {
+        "exit_phrase": "you were removed",
+        "controls_visible": True,
+    }
+
+    # The monitor returned nothing; only the hangup button is there
+    driver = FakeDriver(None, hangup=True)
+    assert MeetingMonitor(driver, "task").read() == {
+        "exit_phrase": None,
+        "controls_visible": True,
+    }
+    assert CHECK_TEXT_PRESENCE_JS in driver.scripts
+
+
+def test_controls_missing_is_measured_in_time(monkeypatch) -> None:
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(monitor, "time", SimpleNamespace(monotonic=lambda: clock["now"]))
+    driver = FakeDriver({"exitPhrase": None, "controlsVisible": True})
+    meeting = MeetingMonitor(driver, "task")
+
+    # However many polls fit in it, only elapsed time counts
+    driver.state = {"exitPhrase": None, "controlsVisible": False}
+    for _ in range(40):
+        meeting.read()
+        clock["now"] += 0.25
+    assert meeting.controls_missing_for() == 10.0
+    assert meeting.controls_missing_for() < CONTROLS_LOST_SECONDS
+
+    clock["now"] += 10
+    assert meeting.controls_missing_for() >= CONTROLS_LOST_SECONDS
+
+    driver.state = {"exitPhrase": None, "controlsVisible": True}
+    meeting.read()
+    assert meeting.controls_missing_for() == 0
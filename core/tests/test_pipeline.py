@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+
+from libot import pipeline
+from libot.pipeline import SegmentPipeline
+from libot.transcripts import release_store
+
+
+class FakeManifest:
+    def __init__(self):
+        self.entries = []
+
+    def record(self, stage, seg=None, **details):
+        self.entries.append((stage, seg))
+
+
+@pytest.fixture
+def stages(monkeypatch, tmp_path):
+    """
+    Pipeline stages replaced by controllable fakes; every segment
+    "compresses" to its own source path.
+    """
+    monkeypatch.setattr(pipeline, "GCS_BUCKET", "bucket")
+    monkeypatch.setattr(pipeline, "record_compressed", lambda manifest, segment: None)
+    fakes = {
+        "compress": lambda segment: segment.source_path,
+        "upload": lambda segment: True,
+        "transcribe": lambda segment: '{"conversation": []}',
+    }
+    monkeypatch.setattr(pipeline, "compress_segment", lambda s: fakes["compress"](s))
+    monkeypatch.setattr(pipeline, "upload_segment", lambda s: fakes["upload"](s))
+    monkeypatch.setattr(pipeline, "transcribe_segment", lambda s: fakes["transcribe"](s))
+    yield fakes
+    release_store("pipeline_task")
+
+
+def _pipeline(tmp_path, **kwargs):
+    return SegmentPipeline("pipeline_task", str(tmp_path), **kwargs)
+
+
+def test_full_queue_blocks_the_producer(stages, tmp_path) -> None:
+    release = threading.Event()
+    stages["compress"] = lambda segment: release.wait(5) and segment.source_path
+    p = _pipeline(tmp_path, queue_size=1, compress_workers=1)
+
+    p.submit("audio_000.wav", 0)  # taken by the worker
+    p.submit("audio_001.wav", 1)  # fills the queue
+    blocked = threading.Thread(target=p.submit, args=("audio_002.wav", 2), kwargs={"block_warn_s": 0.05})
+    blocked.start()
+    blocked.join(0.3)
+    assert blocked.is_alive()
+
+    release.set()
+    blocked.join(5)
+    assert not blocked.is_alive()
+    assert p.drain(timeout=5)
+    assert p.stats()["done"] == 3
+
+
+def test_upload_and_transcription_run_concurrently(stages, tmp_path) -> None:
+    both = threading.Barrier(2, timeout=2)
+    stages["upload"] = lambda segment: both.wait() is not None
+    stages["transcribe"] = lambda segment: both.wait() is not None and "{}"
+    p = _pipeline(tmp_path, upload_workers=1, transcribe_workers=1)
+
+    p.submit("audio_000.wav", 0)
+    assert p.drain(timeout=5)
+    stats = p.stats()
+    assert stats["upload"]["failed"] == stats["transcribe"]["failed"] == 0
+
+
+def test_branch_failures_are_counted_and_recorded(stages, tmp_path) -> None:
+    def upload(segment):
+        raise RuntimeError("boom")
+
+    stages["upload"] = upload
+    stages["transcribe"] = lambda segment: None if segment.index == 1 else "{}"
+    manifest = FakeManifest()
+    p = _pipeline(tmp_path, manifest=manifest)
+
+    p.submit("audio_000.wav", 0)
+    p.submit("audio_001.wav", 1)
+    assert p.drain(timeout=5)
+    stats = p.stats()
+    assert stats["upload"]["failed"] == 2
+    assert stats["transcribe"]["failed"] == 1
+    assert ("failed", 1) in manifest.entries
+    assert ("transcribed", 0) in manifest.entries
+    assert stats["done"] == stats["submitted"] == 2
+
+
+def test_upload_without_bucket_is_skipped(stages, monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(pipeline, "GCS_BUCKET", None)
+    manifest = FakeManifest()
+    p = _pipeline(tmp_path, manifest=manifest)
+
+    p.submit("audio_000.wav", 0)
+    assert p.drain(timeout=5)
+    assert p.stats()["upload"]["failed"] == 0
+    assert ("skipped", 0) in manifest.entries
+    assert ("failed", 0) not in manifest.entries
+
+
+def test_drain_waits_for_compress_before_stopping_the_branches(stages, tmp_path) -> None:
+    stages["compress"] = lambda segment: time.sleep(0.5) or segment.source_path
+    p = _pipeline(tmp_path, compress_workers=1)
+    p.submit("audio_000.wav", 0)
+
+    assert not p.drain(timeout=0.1)
+    # The branches were left running, so the late segment still gets through
+    deadline = time.monotonic() + 5
+    while p.stats()["done"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert p.stats()["transcribe"]["processed"] == 1
+
+    slow = _pipeline(tmp_path, compress_workers=1)
+    slow.submit("audio_001.wav", 1)
+    assert slow.drain(timeout=5)
+
+
+def test_cancel_discards_pending_segments(stages, tmp_path) -> None:
+    release = threading.Event()
+    transcribed = []
+    stages["compress"] = lambda segment: release.wait(5) and segment.source_path
+    stages["transcribe"] = lambda segment: transcribed.append(segment.index) or "{}"
+    p = _pipeline(tmp_path, compress_workers=1)
+    for idx in range(3):
+        p.submit(f"audio_{idx:03d}.wav", idx)
+
+    threading.Timer(0.1, release.set).start()
+    assert p.cancel(timeout=5)
+    assert transcribed == []
+    assert not p.submit("audio_003.wav", 3)
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+import pytest
+
+from libot import recorder
+from libot.admission import AdmissionController
+from libot.browser_pool import WarmBrowser
+from libot.resources import TaskResources
+
+
+class FakeDriver:
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+class FakeRouter:
+    def __init__(self, task_id, sink=None, match_props=None):
+        pass
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def wait_routed(self, timeout):
+        return True
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    """
+    Stubs Chrome, PulseAudio and the meeting UI so record_task runs its
+    real setup and cleanup in-process; ``joins`` maps task_id to a callable
+    standing in for join_meeting.
+    """
+    joins = {}
+    exits = []
+    monkeypatch.setattr(os, "_exit", exits.append)
+    monkeypatch.setattr(recorder, "AudioRouter", FakeRouter)
+    monkeypatch.setattr(recorder, "ensure_avatar_y4m", lambda: "avatar.y4m")
+    monkeypatch.setattr(recorder, "build_driver", lambda *a, **kw: FakeDriver())
+    monkeypatch.setattr(recorder, "take_screenshot", lambda *a, **kw: None)
+    monkeypatch.setattr(recorder, "_wait_dom_ready", lambda *a, **kw: None)
+    monkeypatch.setattr(recorder, "safe_click", lambda *a, **kw: False)
+    monkeypatch.setattr(
+        recorder, "join_meeting", lambda driver, task_id: joins[task_id]()
+    )
+    return joins, exits
+
+
+def wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def record(task_id):
+    return recorder.record_task(
+        "https://meeting", 0, task_id, record_audio=False, record_video=False
+    )
+
+
+def test_finishing_a_task_leaves_the_process_running(fake_session) -> None:
+    joins, exits = fake_session
+    first_done = threading.Event()
+    joins["first"] = lambda: False
+    joins["second"] = lambda: first_done.wait(5)
+    results = {}
+
+    def run(task_id, done=None):
+        results[task_id] = record(task_id)
+        if done:
+            done.set()
+
+    threads = [
+        threading.Thread(target=run, args=("second",)),
+        threading.Thread(target=run, args=("first", first_done)),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+
+    assert results == {"first": False, "second": True}
+    assert exits == []
+
+
+def test_registry_records_what_record_task_returned(fake_session) -> None:
+    joins, _ = fake_session
+    joins["joined"] = lambda: True
+    joins["lobby"] = lambda: False
+    controller = AdmissionController(max_concurrent=2, queue_size=2, headroom=lambda: 10)
+
+    joined = controller.submit("joined", "url", lambda: record("joined"))
+    lobby = controller.submit("lobby", "url", lambda: record("lobby"))
+
+    assert wait_for(lambda: joined.status == "finished")
+    assert wait_for(lambda: lobby.status == "failed")
+    assert lobby.error
+
+
+def test_isolated_tasks_use_the_pool_unless_recording_video(
+    fake_session, monkeypatch, tmp_path
+) -> None:
+    joins, _ = fake_session
+    launched = []
+    released = []
+
+    class FakePool:
+        def acquire(self):
+            return WarmBrowser(FakeDriver(), str(tmp_path), {"scribe.browser": "warm"})
+
+        def release(self, browser):
+            released.append(browser)
+
+    monkeypatch.setattr(recorder, "get_pool", FakePool)
+    def slot_resources(task_id):
+        return TaskResources(task_id, ":100", "Scribe_0", 9300, str(tmp_path / task_id), slot=0)
+
+    def build_driver(*args, env, **kwargs):
+        launched.append(env["DISPLAY"])
+        return FakeDriver()
+
+    monkeypatch.setattr(recorder, "allocate_resources", slot_resources)
+    monkeypatch.setattr(recorder, "release_resources", lambda res: None)
+    monkeypatch.setattr(recorder, "build_driver", build_driver)
+    joins["audio"] = joins["video"] = lambda: False
+
+    recorder.record_task("https://meeting", 0, "audio", record_audio=False, record_video=False)
+    assert (len(released), launched) == (1, [])
+
+    recorder.record_task("https://meeting", 0, "video", record_audio=False, record_video=True)
+    assert (len(released), launched) == (1, [":100"])
@@ -0,0 +1,149 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from libot import gemini, reprocess
+from libot.briefing import BRIEFING_NAME
+from libot.gemini import BRIEFING_VERSION, CACHE_NAMESPACE
+from libot.manifest import MANIFEST_NAME
+from libot.transcripts import release_store
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeBlob:
+    def __init__(self, name, updated=T0, metadata=None, text=""):
+        self.name = name
+        self.updated = updated
+        self.metadata = metadata
+        self.text = text
+
+    def download_as_text(self):
+        return self.text
+
+
+class FakeListing(list):
+    prefixes = ()
+
+
+class FakeBucket:
+    def __init__(self, blobs):
+        self.blobs = {blob.name: blob for blob in blobs}
+
+    def list_blobs(self, prefix="", delimiter=None):
+        names = sorted(n for n in self.blobs if n.startswith(prefix))
+        nested = {n for n in names if delimiter and delimiter in n[len(prefix):]}
+        listing = FakeListing(self.blobs[n] for n in names if n not in nested)
+        listing.prefixes = sorted(
+            {prefix + n[len(prefix):].split(delimiter)[0] + delimiter for n in nested}
+        )
+        return listing
+
+
+def _bucket():
+    later = T0 + timedelta(hours=1)
+    current = {"transcript_version": CACHE_NAMESPACE}
+    manifest = json.dumps({"stage": "compressed", "seg": 1, "offsets": "[[0, 0, 10]]"})
+    return FakeBucket(
+        [
+            # done: transcripts and briefing current (the audio upload may
+            # finish after the transcript is stored)
+            FakeBlob("done/audio_000.mp3", later + timedelta(minutes=1)),
+            FakeBlob("done/transcriptions/done_0.json", later, current),
+            FakeBlob(f"done/{BRIEFING_NAME}", later, {"briefing_version": BRIEFING_VERSION}),
+            # old: one transcript from another prompt, one missing, briefing from before
+            FakeBlob("old/audio_000.mp3"),
+            FakeBlob("old/audio_001_vad.mp3"),
+            FakeBlob("old/transcriptions/old_0.json", later, {"transcript_version": "other"}),
+            FakeBlob(f"old/{MANIFEST_NAME}", text=manifest),
+            FakeBlob(f"old/{BRIEFING_NAME}", later, {"briefing_version": BRIEFING_VERSION}),
+            # brief: transcripts current, briefing older than them
+            FakeBlob("brief/audio_000.mp3"),
+            FakeBlob("brief/transcriptions/brief_0.json", later, current),
+            FakeBlob(f"brief/{BRIEFING_NAME}", T0, {"briefing_version": BRIEFING_VERSION}),
+            FakeBlob("transcription_cache/abc/def.json"),
+            FakeBlob("bench_clients/shared_0.bin"),
+        ]
+    )
+
+
+def test_plan_skips_up_to_date_outputs(monkeypatch) -> None:
+    monkeypatch.setattr(reprocess, "GCS_PREFIX", "")
+    bucket = _bucket()
+    assert reprocess.list_tasks(bucket) == ["bench_clients", "brief", "done", "old"]
+    assert not reprocess.plan_task(bucket, "bench_clients").is_task
+
+    done = reprocess.plan_task(bucket, "done")
+    assert (done.stale, done.brief) == ([], False)
+
+    old = reprocess.plan_task(bucket, "old")
+    assert old.stale == [0, 1]
+    assert old.offsets == {1: "[[0, 0, 10]]"}
+    assert old.brief
+
+    brief = reprocess.plan_task(bucket, "brief")
+    assert (brief.stale, brief.brief) == ([], True)
+
+    assert reprocess.plan_task(bucket, "done", force=True).stale == [0]
+    assert not reprocess.plan_task(bucket, "old", brief=False).brief
+
+
+def test_reprocess_briefs_each_task_after_its_segments(monkeypatch) -> None:
+    monkeypatch.setattr(reprocess, "GCS_PREFIX", "")
+    monkeypatch.setattr(reprocess, "GCS_BUCKET", "bucket")
+    bucket = _bucket()
+    monkeypatch.setattr(reprocess, "get_bucket", lambda name: bucket)
+
+    events = []
+
+    def transcribe(task_id, idx, blob, offsets, force):
+        events.append((task_id, idx))
+        return idx != 1
+
+    def brief(task_id, send):
+        events.append((task_id, "brief"))
+        return True
+
+    monkeypatch.setattr(reprocess, "_transcribe", transcribe)
+    monkeypatch.setattr(reprocess, "_brief", brief)
+
+    assert reprocess.reprocess(dry_run=True)["segments"] == 0
+    assert events == []
+
+    summary = reprocess.reprocess(workers=2)
+    assert summary["segments"] == 2
+    assert summary["segments_failed"] == 1
+    assert summary["briefings"] == 2
+    assert ("done", "brief") not in events
+    assert events.index(("old", "brief")) > max(events.index(("old", 0)), events.index(("old", 1)))
+
+
+def test_forced_run_calls_the_model_despite_a_cached_transcript(monkeypatch, tmp_path) -> None:
+    cached = json.dumps({"conversation": [{"speaker": "A", "text": "cached", "start": 0}]})
+    fresh = json.dumps({"conversation": [{"speaker": "A", "text": "fresh", "start": 0}]})
+    calls = []
+
+    class Cache:
+        def get(self, key):
+            return cached
+
+        def put(self, key, text):
+            calls.append(("put", text))
+
+    class AudioBlob(FakeBlob):
+        def download_to_filename(self, path):
+            with open(path, "wb") as f:
+                f.write(b"\xff\xfb" * 64)
+
+    monkeypatch.setattr(reprocess, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(gemini, "TRANSCRIPTION_CACHE", True)
+    monkeypatch.setattr(gemini, "get_cache", lambda namespace: Cache())
+    monkeypatch.setattr(gemini, "_transcribe", lambda *args: calls.append("model") or fresh)
+    monkeypatch.setattr(gemini, "persist_transcription", lambda *args: None)
+
+    blob = AudioBlob("forced/audio_000.mp3")
+    assert reprocess._transcribe("forced", 0, blob, None)
+    assert calls == []
+
+    assert reprocess._transcribe("forced", 0, blob, None, force=True)
+    assert calls == ["model", ("put", fresh)]
+    release_store("forced")
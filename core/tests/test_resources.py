@@ -0,0 +1,45 @@
+import pytest
+
+from libot.resources import ResourceAllocator, shared_resources
+
+
+@pytest.fixture
+def allocator(monkeypatch, tmp_path):
+    allocator = ResourceAllocator(slots=2, display_base=100, port_base=9300)
+    released = []
+    monkeypatch.setattr(allocator, "_start_xvfb", lambda display: None)
+    monkeypatch.setattr(allocator, "_load_sink", lambda sink: f"mod-{sink}")
+    monkeypatch.setattr(
+        "libot.resources._pactl", lambda *args: released.append(args) or ""
+    )
+    allocator.released = released
+    return allocator
+
+
+def test_slots_are_isolated_and_reused(allocator) -> None:
+    a = allocator.allocate("task_a")
+    b = allocator.allocate("task_b")
+
+    assert (a.display, a.sink, a.debug_port) == (":100", "Scribe_0", 9300)
+    assert (b.display, b.sink, b.debug_port) == (":101", "Scribe_1", 9301)
+    assert b.monitor == "Scribe_1.monitor"
+    assert b.profile_dir == "/tmp/profile_task_b"
+
+    env = a.env()
+    assert env["DISPLAY"] == ":100"
+    assert env["PULSE_SINK"] == "Scribe_0"
+    assert env["PULSE_PROP"] == "scribe.task=task_a"
+
+    with pytest.raises(RuntimeError):
+        allocator.allocate("task_c")
+
+    allocator.release(a)
+    assert ("unload-module", "mod-Scribe_0") in allocator.released
+    assert allocator.allocate("task_c").sink == "Scribe_0"
+
+
+def test_shared_resources_keep_single_meeting_layout() -> None:
+    res = shared_resources("task")
+    assert not res.isolated
+    assert (res.display, res.sink, res.debug_port) == (":99", "VirtualSpeaker", 9222)
+    assert "PULSE_SINK" not in res.env()
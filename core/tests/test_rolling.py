@@ -0,0 +1,75 @@
+import json
+
+from libot import briefing
+from libot.rolling import RollingBriefing
+from libot.transcripts import TranscriptStore
+
+
+def _doc(text: str) -> str:
+    return json.dumps({"conversation": [{"speaker": "A", "text": text, "start": 1}]})
+
+
+def _fake_update(calls):
+    def update(task_id, state, text):
+        said = text.split(": ", 1)[1]
+        calls.append(said)
+        return {**state, "summary": (state["summary"] + " " + said).strip()}
+
+    return update
+
+
+def test_segments_are_folded_in_order_as_they_settle() -> None:
+    store = TranscriptStore("rolling_task")
+    calls = []
+    rolling = RollingBriefing("rolling_task", store, update=_fake_update(calls))
+    rolling.start()
+    try:
+        for idx in (0, 1, 2):
+            store.expect(idx)
+        # Segment 2 lands first but waits for 0 and 1
+        store.add(2, _doc("two"))
+        store.resolve(1)  # silent
+        assert not rolling.finish(timeout=0.3)
+        assert calls == []
+
+        store.add(0, _doc("zero"))
+        assert rolling.finish(timeout=5)
+        assert calls == ["zero", "two"]
+        assert rolling.state["summary"] == "zero two"
+    finally:
+        rolling.stop()
+
+
+def test_briefing_renders_from_state_or_falls_back(monkeypatch, tmp_path) -> None:
+    rendered, full = [], []
+    monkeypatch.setattr(
+        briefing, "render_briefing",
+        lambda task_id, state: rendered.append(state) or json.dumps({"subject": "s", "htmlBody": "h"}),
+    )
+    monkeypatch.setattr(
+        briefing, "make_briefing",
+        lambda task_id, transcript: full.append(transcript) or json.dumps({"subject": "s", "htmlBody": "h"}),
+    )
+    monkeypatch.setattr(briefing, "load_transcript", lambda task_id: "full transcript")
+    monkeypatch.setattr(briefing, "send_email", lambda briefing, subject: None)
+
+    store = TranscriptStore("rolling_ok")
+    rolling = RollingBriefing("rolling_ok", store, update=_fake_update([]))
+    rolling.start()
+    store.expect(0)
+    store.add(0, _doc("zero"))
+    briefing.handle_briefing("rolling_ok", rolling)
+    rolling.stop()
+    assert rendered == [{**rolling.state}] and full == []
+
+    def broken(task_id, state, text):
+        raise RuntimeError("quota")
+
+    store = TranscriptStore("rolling_failed")
+    rolling = RollingBriefing("rolling_failed", store, update=broken)
+    rolling.start()
+    store.expect(0)
+    store.add(0, _doc("zero"))
+    briefing.handle_briefing("rolling_failed", rolling)
+    rolling.stop()
+    assert full == ["full transcript"]
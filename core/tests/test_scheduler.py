@@ -0,0 +1,110 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from google.genai import errors
+
+from fake_gemini import FakeGemini
+from libot import clients, gemini
+from libot.scheduler import RetryBudget, TokenBucket, TranscriptionScheduler
+from libot.transcripts import get_store, release_store
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def _throttled():
+    return errors.ClientError(
+        429,
+        {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "details": [
+            {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "7s"}
+        ]}},
+    )
+
+
+def test_token_bucket_spends_burst_then_paces() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=3, clock=clock)
+    assert [bucket.wait_time() for _ in range(3)] == [0, 0, 0]
+    assert bucket.wait_time() == pytest.approx(0.5)
+    assert bucket.acquire(sleep=clock.sleep)
+    assert clock.now == pytest.approx(0.5)
+
+    bucket.penalize(10)
+    assert not bucket.acquire(deadline=clock.now + 5, sleep=clock.sleep)
+
+
+def test_scheduler_retries_throttling_within_budget() -> None:
+    clock = FakeClock()
+    scheduler = TranscriptionScheduler(60, 10, 2, 1, 30, sleep=clock.sleep, clock=clock)
+    outcomes = [_throttled(), errors.ServerError(503, {}), "ok"]
+
+    def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert scheduler.call(flaky, RetryBudget(5, 600, clock=clock)) == "ok"
+    assert scheduler.stats() == {"requests": 3, "retries": 2, "throttled": 1, "failed": 0}
+    # The server's retry delay is honoured
+    assert clock.now >= 7
+
+
+def test_scheduler_gives_up_on_budget_and_bad_requests() -> None:
+    clock = FakeClock()
+    scheduler = TranscriptionScheduler(600, 10, 2, 1, 30, sleep=clock.sleep, clock=clock)
+
+    def always_throttled():
+        raise _throttled()
+
+    with pytest.raises(errors.ClientError):
+        scheduler.call(always_throttled, RetryBudget(10, 20, clock=clock))
+    # The next 7s wait would pass the 20s deadline
+    assert clock.now < 20
+
+    def bad_request():
+        raise errors.ClientError(400, {})
+
+    with pytest.raises(errors.ClientError):
+        scheduler.call(bad_request, RetryBudget(10, 600, clock=clock))
+    assert scheduler.stats()["failed"] == 2
+
+
+def test_transcription_survives_injected_errors(monkeypatch) -> None:
+    fake = FakeGemini(latency=0.05).start()
+    fake.fail_next = [429, 503, 429]
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setattr(clients, "GEMINI_BASE_URL", fake.url)
+    clients.reset_clients()
+    scheduler = TranscriptionScheduler(6000, 10, 2, 0.01, 0.05)
+    monkeypatch.setattr(gemini, "get_scheduler", lambda: scheduler)
+    monkeypatch.setattr(gemini, "persist_transcription", lambda *args: None)
+    monkeypatch.setattr(gemini, "TRANSCRIPTION_CACHE", False)
+
+    audio = gemini.OUTPUT_DIR + "/fake_segment.mp3"
+    with open(audio, "wb") as f:
+        f.write(b"\xff\xfb" * 512)
+
+    try:
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(
+                pool.map(lambda idx: gemini.gemini_transcription(audio, "sched_task", idx), range(6))
+            )
+    finally:
+        fake.stop()
+        clients.reset_clients()
+
+    assert all(json.loads(r)["conversation"] for r in results)
+    assert [idx for idx, _ in get_store("sched_task").items()] == list(range(6))
+    assert scheduler.stats()["throttled"] == 2
+    assert fake.max_in_flight <= 2
+    release_store("sched_task")
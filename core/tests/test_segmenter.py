@@ -0,0 +1,71 @@
+import io
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from libot.segmenter import AdaptiveSegmenter, SegmentSchedule, parse_window
+from libot.segments import SegmentWatcher
+
+RATE = 8000
+
+
+def _pcm(*parts) -> bytes:
+    """
+    parts: ("speech" | "pause", seconds) -> interleaved stereo s16le
+    """
+    chunks = []
+    for kind, seconds in parts:
+        t = np.arange(int(seconds * RATE)) / RATE
+        mono = 8000 * np.sin(2 * np.pi * 200 * t) if kind == "speech" else 0 * t
+        chunks.append(np.repeat(mono, 2))
+    return np.concatenate(chunks).astype("<i2").tobytes()
+
+
+def _duration(path: Path) -> float:
+    with wave.open(str(path), "rb") as w:
+        return w.getnframes() / w.getframerate()
+
+
+def test_parse_window() -> None:
+    assert parse_window("240-330") == (240.0, 330.0)
+    assert parse_window("60") == (60.0, 60.0)
+    with pytest.raises(ValueError):
+        parse_window("330-240")
+
+
+def test_cuts_at_first_pause_inside_window(tmp_path: Path) -> None:
+    stream = io.BytesIO(
+        _pcm(
+            ("speech", 0.5),
+            ("pause", 0.5),  # before the early window opens: ignored
+            ("speech", 1.5),
+            ("pause", 0.5),  # first pause inside 2-4 s -> cut
+            ("speech", 7.0),  # no pause: hard cut at 6 s
+            ("speech", 1.0),
+        )
+    )
+    list_path = tmp_path / "segments.csv"
+    segmenter = AdaptiveSegmenter(
+        "task",
+        str(tmp_path),
+        stream,
+        str(list_path),
+        rate=RATE,
+        schedule=SegmentSchedule(window=(3, 6), early_window=(2, 4), early_count=1),
+        pause_seconds=0.3,
+    ).start()
+    segmenter.join(timeout=10)
+
+    assert _duration(tmp_path / "audio_000.wav") == pytest.approx(2.8, abs=0.11)
+    assert _duration(tmp_path / "audio_001.wav") == pytest.approx(6.0, abs=0.11)
+    assert (tmp_path / "audio_002.wav").exists()
+
+    seen = []
+    watcher = SegmentWatcher(
+        "task", str(tmp_path), lambda *args: seen.append(args), str(list_path)
+    )
+    watcher.stop()
+    assert [s[1] for s in seen] == [0, 1, 2]
+    assert seen[1][2] == pytest.approx(seen[0][3])
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from libot.segments import SegmentWatcher, segment_index
+
+
+def test_segment_index() -> None:
+    assert segment_index("/tmp/task/audio_007.wav") == 7
+    assert segment_index("audio_120.mp3") == 120
+
+
+def test_watcher_dispatches_closed_segments_once(tmp_path: Path) -> None:
+    seen = []
+    list_path = tmp_path / "segments.csv"
+    watcher = SegmentWatcher(
+        "task", str(tmp_path), lambda *args: seen.append(args), str(list_path)
+    )
+
+    list_path.write_text("audio_000.wav,0.000000,300.000000\naudio_001.wav,300.0")
+    watcher._scan()
+    assert seen == [(str(tmp_path / "audio_000.wav"), 0, 0.0, 300.0)]
+
+    # ffmpeg finishes the half-written line and closes the next segment
+    with open(list_path, "a") as f:
+        f.write("00000,600.000000\naudio_000.wav,0.0,300.0\n")
+    watcher.stop()
+
+    assert [s[1] for s in seen] == [0, 1]
+    assert seen[1][2:] == (300.0, 600.0)
@@ -0,0 +1,41 @@
+import json
+
+from libot.transcript_merge import (
+    iter_conversation,
+    merge_transcript,
+    transcript_index,
+)
+
+
+def _doc(*turns) -> str:
+    return json.dumps(
+        {"conversation": [{"speaker": s, "text": t, "start": start} for s, t, start in turns]}
+    )
+
+
+def test_files_are_ordered_numerically() -> None:
+    names = ["t/transcriptions/task_10.json", "t/transcriptions/task_2.json", "task_1.json"]
+    assert sorted(names, key=transcript_index) == [names[2], names[1], names[0]]
+
+
+def test_double_encoded_documents_are_streamed() -> None:
+    document = _doc(("A", 'says "hi", [ok]', 0), ("B", "answers", 3.5))
+    stored = json.dumps(document)  # as persist_transcription writes it
+    assert [t["text"] for t in iter_conversation(stored)] == ['says "hi", [ok]', "answers"]
+    assert [t["speaker"] for t in iter_conversation(document.encode())] == ["A", "B"]
+    assert list(iter_conversation('{"conversation": []}')) == []
+
+
+def test_merge_offsets_and_coalesces_turns() -> None:
+    documents = [
+        (0, json.dumps(_doc(("A", "hello", 0), ("A", "everyone", 2), ("B", "hi", 5)))),
+        (1, _doc(("B", "so", 1), ("A", "next point", 70))),
+        (2, "not json"),
+        (3, _doc(("A", "", 0))),
+    ]
+    text = merge_transcript(iter(documents), offsets={1: 300.0}, segment_seconds=300)
+    assert text.splitlines() == [
+        "[00:00:00] A: hello everyone",
+        "[00:00:05] B: hi so",
+        "[00:06:10] A: next point",
+    ]
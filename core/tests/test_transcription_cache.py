@@ -0,0 +1,90 @@
+import json
+import os
+
+from libot import gemini
+from libot.transcription_cache import TranscriptionCache, cache_namespace, file_key
+from libot.transcripts import release_store
+
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+
+    def exists(self):
+        return self.name in self.bucket.objects
+
+    def download_as_bytes(self):
+        return self.bucket.objects[self.name]
+
+    def upload_from_string(self, data, content_type=None):
+        self.bucket.objects[self.name] = data.encode() if isinstance(data, str) else data
+
+
+class FakeBucket:
+    def __init__(self):
+        self.objects = {}
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def list_blobs(self, prefix=""):
+        return [FakeBlob(self, n) for n in list(self.objects) if n.startswith(prefix)]
+
+    def delete_blobs(self, blobs, on_error=None):
+        for blob in blobs:
+            self.objects.pop(blob.name, None)
+
+
+def test_namespaces_isolate_model_and_schema_changes(tmp_path) -> None:
+    assert cache_namespace("model-a", "prompt") != cache_namespace("model-b", "prompt")
+
+    old = TranscriptionCache("old", root=str(tmp_path))
+    old.put("k", "old transcript")
+    assert old.get("k") == "old transcript"
+
+    new = TranscriptionCache("new", root=str(tmp_path))
+    assert new.get("k") is None
+    assert os.listdir(tmp_path) == ["new"]
+
+
+def test_local_tier_evicts_least_recently_used(tmp_path) -> None:
+    cache = TranscriptionCache("ns", root=str(tmp_path), max_bytes=250)
+    for i, key in enumerate("abc"):
+        cache.put(key, "x" * 100)
+        os.utime(cache._path(key), (i, i))
+    cache.evict()
+    assert cache.get("a") is None
+    assert cache.get("b") and cache.get("c")
+
+
+def test_shared_tier_fills_local_and_drops_stale_namespaces(tmp_path) -> None:
+    bucket = FakeBucket()
+    bucket.objects["transcription_cache/old/k.json"] = b"stale"
+    first = TranscriptionCache("ns", root=str(tmp_path / "a"), bucket=bucket)
+    first.put("k", "shared transcript")
+
+    other_machine = TranscriptionCache("ns", root=str(tmp_path / "b"), bucket=bucket)
+    assert other_machine.get("k") == "shared transcript"
+    assert os.path.exists(other_machine._path("k"))
+
+    other_machine.invalidate_shared()
+    assert list(bucket.objects) == ["transcription_cache/ns/k.json"]
+
+
+def test_cache_hit_skips_gemini(monkeypatch, tmp_path) -> None:
+    cache = TranscriptionCache("hit", root=str(tmp_path / "cache"))
+    calls = []
+    transcript = json.dumps({"conversation": [{"speaker": "A", "text": "hi", "start": 0}]})
+    monkeypatch.setattr(gemini, "TRANSCRIPTION_CACHE", True)
+    monkeypatch.setattr(gemini, "get_cache", lambda namespace: cache)
+    monkeypatch.setattr(gemini, "_transcribe", lambda *args: calls.append(args) or transcript)
+    monkeypatch.setattr(gemini, "persist_transcription", lambda *args: None)
+
+    audio = tmp_path / "seg.mp3"
+    audio.write_bytes(b"\xff\xfb" * 256)
+    assert gemini.gemini_transcription(str(audio), "cache_task", 0) == transcript
+    assert gemini.gemini_transcription(str(audio), "cache_task", 1) == transcript
+    assert len(calls) == 1
+    assert cache.get(file_key(str(audio))) == transcript
+    release_store("cache_task")
@@ -0,0 +1,38 @@
+from libot import briefing
+from libot.transcripts import TranscriptStore, get_store, release_store
+
+
+def test_store_completes_when_every_segment_is_settled() -> None:
+    store = TranscriptStore("task")
+    assert not store.complete()
+
+    for idx in (0, 1, 2, 10):
+        store.expect(idx)
+    store.add(10, '{"conversation": [{"speaker": "B", "text": "ten"}]}')
+    store.add(2, '{"conversation": [{"speaker": "A", "text": "two"}]}')
+    store.resolve(0)  # silent segment
+    assert store.missing() == [1]
+    assert not store.complete()
+
+    store.resolve(1)
+    assert store.complete()
+    assert [idx for idx, _ in store.items()] == [2, 10]
+    assert store.transcript().index("two") < store.transcript().index("ten")
+
+
+def test_briefing_uses_local_store_and_falls_back_to_gcs(monkeypatch) -> None:
+    fetched = []
+    monkeypatch.setattr(
+        briefing, "fetch_transcriptions_from_gcs", lambda task_id: fetched.append(task_id) or "gcs"
+    )
+
+    store = get_store("local_task")
+    store.expect(0)
+    store.add(0, '{"conversation": [{"speaker": "A", "text": "local"}]}')
+    assert briefing.load_transcript("local_task") == "A: local"
+    assert fetched == []
+
+    assert briefing.load_transcript("restarted_task") == "gcs"
+    assert fetched == ["restarted_task"]
+    release_store("local_task")
+    release_store("restarted_task")
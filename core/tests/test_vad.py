@@ -0,0 +1,81 @@
+import wave
+
+import numpy as np
+import pytest
+
+from libot.vad import OffsetMap, detect_speech, gate_segment
+
+RATE = 16000
+
+
+def _speech(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return 8000 * np.sin(2 * np.pi * 220 * t)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * RATE))
+
+
+def test_detect_speech_bridges_short_gaps_and_pads() -> None:
+    samples = np.concatenate(
+        [_silence(5), _speech(3), _silence(1), _speech(2), _silence(10), _speech(1)]
+    )
+
+    regions = detect_speech(samples, RATE, min_silence=2.0, padding=0.5)
+
+    assert len(regions) == 2
+    assert regions[0] == pytest.approx((4.5, 11.5), abs=0.05)
+    assert regions[1] == pytest.approx((20.5, 22.0), abs=0.05)
+
+
+def test_detect_speech_on_silence() -> None:
+    assert detect_speech(_silence(30), RATE) == []
+
+
+def test_offset_map_places_trimmed_times_on_original_timeline() -> None:
+    offsets = OffsetMap.from_regions([(4.5, 11.5), (20.5, 22.0)])
+
+    assert offsets.to_original(0.0) == pytest.approx(4.5)
+    assert offsets.to_original(6.9) == pytest.approx(11.4)
+    assert offsets.to_original(7.5) == pytest.approx(21.0)
+    assert OffsetMap.from_json(offsets.to_json()).spans == offsets.spans
+
+
+def test_gate_segment_trims_long_silences(tmp_path) -> None:
+    source = tmp_path / "audio_000.wav"
+    samples = np.concatenate([_silence(20), _speech(5), _silence(20)])
+    with wave.open(str(source), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(samples.astype("<i2").tobytes())
+
+    result = gate_segment(str(source), str(tmp_path / "audio_000_vad.wav"))
+
+    assert not result.silent
+    assert result.trimmed_path
+    with wave.open(result.trimmed_path, "rb") as w:
+        assert w.getnframes() / RATE == pytest.approx(6.0, abs=0.1)
+    assert result.offset_map.to_original(0.0) == pytest.approx(19.5, abs=0.05)
+
+
+def test_gate_segment_reads_stereo_wav_at_source_rate(tmp_path) -> None:
+    rate = 48000
+    t = np.arange(5 * rate) / rate
+    speech = 8000 * np.sin(2 * np.pi * 220 * t)
+    mono = np.concatenate([np.zeros(30 * rate), speech, np.zeros(10 * rate)])
+    source = tmp_path / "audio_000.wav"
+    with wave.open(str(source), "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.stack([mono, mono], axis=1).astype("<i2").tobytes())
+
+    result = gate_segment(str(source), str(tmp_path / "audio_000_vad.wav"))
+
+    assert result.duration == pytest.approx(45.0)
+    assert result.regions[0] == pytest.approx((29.5, 35.5), abs=0.05)
+    with wave.open(result.trimmed_path, "rb") as w:
+        assert (w.getnchannels(), w.getframerate()) == (2, rate)
+        assert w.getnframes() / rate == pytest.approx(6.0, abs=0.1)